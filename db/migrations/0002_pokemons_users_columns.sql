@@ -0,0 +1,8 @@
+-- Columns older databases may be missing when schema_pg.sql was only partially applied.
+ALTER TABLE pokemons ADD COLUMN IF NOT EXISTS hp_now INTEGER;
+ALTER TABLE pokemons ADD COLUMN IF NOT EXISTS moves_pp JSONB;
+ALTER TABLE pokemons ADD COLUMN IF NOT EXISTS shiny INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE pokemons ADD COLUMN IF NOT EXISTS is_hidden_ability INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE pokemons ADD COLUMN IF NOT EXISTS exp INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE pokemons ADD COLUMN IF NOT EXISTS exp_group TEXT NOT NULL DEFAULT 'medium_fast';
+ALTER TABLE users ADD COLUMN IF NOT EXISTS user_gender TEXT;
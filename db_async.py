@@ -1,17 +1,21 @@
 # db_async.py
-# Async SQLite helper for your bot
+# Async DB helper for your bot
 
 import os
-import aiosqlite
 
-# Set MYUU_DB env var if you want a custom path; defaults to myuu.db in the repo
-DB_PATH = os.getenv("MYUU_DB", "myuu.db")
+# Connections come from lib.db (cloud PostgreSQL, or DB_BACKEND=local), so these reads see
+# the same data as the rest of the bot. Set MYUU_DB to a path to use a legacy SQLite file instead.
+DB_PATH = os.getenv("MYUU_DB")
 
-async def connect() -> aiosqlite.Connection:
-    con = await aiosqlite.connect(DB_PATH)
-    con.row_factory = aiosqlite.Row
-    await con.execute("PRAGMA foreign_keys = ON;")
-    return con
+async def connect():
+    if DB_PATH:
+        import aiosqlite
+        con = await aiosqlite.connect(DB_PATH)
+        con.row_factory = aiosqlite.Row
+        await con.execute("PRAGMA foreign_keys = ON;")
+        return con
+    from lib import db
+    return await db.connect()
 
 # Optional convenience helpers (used by some examples)
 async def get_pokedex_by_id(pid: int):
@@ -0,0 +1,160 @@
+"""
+In-memory prefix completion for slash-command autocomplete (species, moves, items).
+
+Discord calls an autocomplete handler on every keystroke and drops the answer after
+~3 s; a LIKE query per keystroke spends most of that on the DB round trip.
+PrefixIndex answers from memory:
+
+- each value is indexed under its normalized text (lowercase, non-alphanumerics
+  dropped: "Choice Scarf" -> "choicescarf"), under each later word of it ("scarf"),
+  and under its aliases (item display names, move abbreviations, dex numbers,
+  "alolan raichu" for raichu-alola)
+- the keys are one sorted list, i.e. an implicit trie: everything under a prefix is
+  a contiguous range found with two bisects, so there are no per-node dicts and
+  the index is a few flat lists
+- ranking: exact key, then whole-name prefixes before later-word matches, then the
+  order values were given in (dex order for species, name order otherwise)
+
+The bot's completers are built from the pokedex/moves/items dumps when the cache is
+warmed (build_completers()) and kept in db_cache (get_completer()).
+"""
+from __future__ import annotations
+
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .fuzzy_index import FORM_ALIASES, MOVE_ABBREVIATIONS
+
+# (value, label)
+Completion = Tuple[str, str]
+
+# Completer kind -> the table its values come from (for invalidation)
+COMPLETER_KINDS = {
+    "species": "pokedex",
+    "moves": "moves",
+    "items": "items",
+}
+
+# Past this many keys under one prefix (a one-letter query), rank only the first ones
+_SCAN_CAP = 4096
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def prefix_keys(text: Any) -> List[str]:
+    """Keys text is found under: the whole normalized text, then each later word onwards."""
+    words = _WORD.findall(str(text or "").lower())
+    return ["".join(words[i:]) for i in range(len(words))]
+
+
+class PrefixIndex:
+    """Read-only prefix completer over (value, label) pairs; build once, query per keystroke."""
+
+    __slots__ = ("values", "labels", "_pos", "_keys", "_refs", "_later")
+
+    def __init__(self, entries: Iterable[Tuple[str, str]], aliases: Optional[Mapping[str, str]] = None):
+        """
+        entries: (value, label) in preference order; keys come from the value.
+        aliases: extra text -> value (aliases of unknown values are ignored).
+        """
+        self.values: List[str] = []
+        self.labels: List[str] = []
+        self._pos: Dict[str, int] = {}
+        found: Dict[Tuple[str, int], bool] = {}  # (key, entry) -> is a later word
+
+        def add(text: Any, entry: int) -> None:
+            for n, key in enumerate(prefix_keys(text)):
+                if key and found.get((key, entry), True):
+                    found[(key, entry)] = n > 0
+
+        for value, label in entries:
+            if not value or value in self._pos:
+                continue
+            self._pos[value] = len(self.values)
+            self.values.append(value)
+            self.labels.append(label or value)
+            add(value, self._pos[value])
+        for alias, value in (aliases or {}).items():
+            if value in self._pos:
+                add(alias, self._pos[value])
+
+        ordered = sorted(found.items())
+        self._keys: List[str] = [key for (key, _), _ in ordered]
+        self._refs = array("I", (entry for (_, entry), _ in ordered))
+        self._later = bytearray(later for _, later in ordered)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def label(self, value: str) -> str:
+        i = self._pos.get(value)
+        return value if i is None else self.labels[i]
+
+    def complete(self, prefix: str, limit: int = 25) -> List[Completion]:
+        """Best `limit` (value, label) pairs whose keys start with prefix; the first ones if prefix is empty."""
+        q = "".join(_WORD.findall((prefix or "").lower()))
+        if not q:
+            return list(zip(self.values[:limit], self.labels[:limit]))
+        keys = self._keys
+        lo = bisect_left(keys, q)
+        hi = min(bisect_left(keys, q + "\x7f", lo), lo + _SCAN_CAP)
+        best: Dict[int, Tuple[bool, int, int]] = {}
+        for j in range(lo, hi):
+            entry = self._refs[j]
+            rank = (keys[j] != q, self._later[j], entry)
+            if rank < best.get(entry, (True, 2, entry)):
+                best[entry] = rank
+        return [(self.values[e], self.labels[e]) for e in heapq.nsmallest(limit, best, key=best.__getitem__)]
+
+
+def _title(name: str, sep: str) -> str:
+    return sep.join(p.capitalize() for p in name.split("-"))
+
+
+# Regional form key -> the adjective players type ("alola" -> "alolan")
+_FORM_ADJECTIVES = {form: word for word, form in FORM_ALIASES.items() if word != form}
+
+
+def species_completer(rows: Iterable[Mapping[str, Any]]) -> PrefixIndex:
+    """Pokedex names in dex order, labelled "Raichu-Alola"; dex numbers and "alolan raichu" as aliases."""
+    rows = sorted((r for r in rows if r.get("name")), key=lambda r: (r.get("id") is None, r.get("id") or 0))
+    aliases: Dict[str, str] = {}
+    for r in rows:
+        name = str(r["name"])
+        if r.get("id") is not None:
+            aliases.setdefault(str(r["id"]), name)
+        parts = name.lower().split("-")
+        for i, part in enumerate(parts[1:], 1):
+            if part in _FORM_ADJECTIVES:
+                rest = parts[:i] + parts[i + 1:]
+                aliases.setdefault(" ".join([_FORM_ADJECTIVES[part]] + rest), name)
+                aliases.setdefault(" ".join([part] + rest), name)
+    return PrefixIndex(((str(r["name"]), _title(str(r["name"]), "-")) for r in rows), aliases)
+
+
+def move_completer(rows: Iterable[Mapping[str, Any]]) -> PrefixIndex:
+    """Move names in name order, labelled "Thunder Wave"; MOVE_ABBREVIATIONS as aliases."""
+    names = sorted({str(r["name"]) for r in rows if r.get("name")})
+    return PrefixIndex(((n, _title(n, " ")) for n in names), MOVE_ABBREVIATIONS)
+
+
+def item_completer(rows: Iterable[Mapping[str, Any]]) -> PrefixIndex:
+    """Item ids in display-name order, labelled with the display name (found by either)."""
+    rows = [r for r in rows if r.get("id")]
+    rows.sort(key=lambda r: str(r.get("name") or r["id"]).lower())
+    return PrefixIndex(((str(r["id"]), str(r.get("name") or r["id"])) for r in rows),
+                       {str(r["name"]): str(r["id"]) for r in rows if r.get("name")})
+
+
+def build_completers(table: str, rows: Iterable[Mapping[str, Any]]) -> Dict[str, PrefixIndex]:
+    """The completer (COMPLETER_KINDS) derived from a full pokedex, moves or items dump."""
+    if table == "pokedex":
+        return {"species": species_completer(rows)}
+    if table == "moves":
+        return {"moves": move_completer(rows)}
+    if table == "items":
+        return {"items": item_completer(rows)}
+    return {}
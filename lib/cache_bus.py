@@ -0,0 +1,200 @@
+"""
+Cross-process db_cache invalidation over Postgres LISTEN/NOTIFY.
+
+Every db_cache.invalidate_* / clear_* call in a process that imported lib.db is
+also published on the DB_CACHE_CHANNEL channel ("myuu_cache"), batched per event
+loop tick. A process that called start() listens on its own dedicated
+connection and applies other processes' events to its local caches. If that
+connection drops, it reconnects and does a full resync: it clears every cache
+that could have missed an event and calls the on_resync hook.
+
+Tools that write with a raw asyncpg connection publish with
+`await cache_bus.notify(pg, [("table", "rulesets")])`.
+
+Payload: {"o": <origin id>, "e": [[kind, key], ...]}. For the event kinds, see
+db_cache.apply_invalidation.
+
+Env:
+  DB_CACHE_BUS=0           disable publishing and listening
+  DB_CACHE_CHANNEL         channel name (default myuu_cache)
+  DB_LISTEN_URL            DSN for the listener when DATABASE_URL goes through
+                           pgbouncer (LISTEN needs a session-mode connection)
+  DB_LISTEN_HEALTH_S       how often the listener connection is health-checked (default 30)
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import os
+import socket
+import uuid
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple
+
+import asyncpg
+
+from . import db_cache
+from . import pg_aiosqlite
+
+CHANNEL = os.getenv("DB_CACHE_CHANNEL", "myuu_cache")
+ENABLED = os.getenv("DB_CACHE_BUS", "1").lower() not in ("0", "false", "no")
+# Identifies this process's own notifications so they aren't applied twice
+ORIGIN = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+_MAX_EVENTS_PER_NOTIFY = 200  # keeps payloads well under Postgres' 8000-byte limit
+
+_pending: List[Tuple[str, str]] = []
+_flush_scheduled = False
+_listener_task: Optional[asyncio.Task] = None
+_stats = {"published": 0, "notifies_sent": 0, "publish_errors": 0, "received": 0,
+          "applied": 0, "reconnects": 0, "resyncs": 0}
+
+
+def _payloads(events: List[Tuple[str, str]]) -> List[str]:
+    return [
+        json.dumps({"o": ORIGIN, "e": events[i:i + _MAX_EVENTS_PER_NOTIFY]}, separators=(",", ":"))
+        for i in range(0, len(events), _MAX_EVENTS_PER_NOTIFY)
+    ]
+
+
+# ---------- publishing ----------
+def _publish(kind: str, key: str) -> None:
+    """db_cache publisher hook: queue the event and flush once per loop tick."""
+    global _flush_scheduled
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # sync caller (no loop): nothing is listening for this process anyway
+    _pending.append((kind, key))
+    _stats["published"] += 1
+    if not _flush_scheduled:
+        _flush_scheduled = True
+        # Empty context: the caller may be inside db.session(), and the flush must not
+        # inherit (and reuse) that session's connection or transaction after it's released
+        loop.call_soon(lambda: asyncio.ensure_future(_flush()), context=contextvars.Context())
+
+
+async def _flush() -> None:
+    global _flush_scheduled
+    _flush_scheduled = False
+    if not _pending:
+        return
+    events = list(dict.fromkeys(_pending))  # dedupe, keep order
+    _pending.clear()
+    try:
+        async with pg_aiosqlite.session() as conn:
+            for payload in _payloads(events):
+                await conn.execute("SELECT pg_notify(?, ?)", (CHANNEL, payload))
+                _stats["notifies_sent"] += 1
+    except Exception as e:
+        _stats["publish_errors"] += 1
+        print(f"[cache_bus] publish failed ({len(events)} events): {e}")
+
+
+async def notify(conn: asyncpg.Connection, events: Iterable[Tuple[str, str]]) -> None:
+    """Publish invalidation events on a raw asyncpg connection (for tools that bypass lib.db)."""
+    events = [(str(k), str(v)) for k, v in events]
+    for payload in _payloads(events):
+        await conn.execute("SELECT pg_notify($1, $2)", CHANNEL, payload)
+        _stats["notifies_sent"] += 1
+
+
+def install_publisher() -> None:
+    """Publish this process's db_cache invalidations (called by lib.db on import)."""
+    if ENABLED:
+        db_cache.set_invalidation_publisher(_publish)
+
+
+# ---------- listening ----------
+def _on_notify(_conn: Any, _pid: int, _channel: str, payload: str) -> None:
+    try:
+        msg = json.loads(payload)
+    except ValueError:
+        return
+    if msg.get("o") == ORIGIN:
+        return
+    _stats["received"] += 1
+    for kind, key in msg.get("e") or ():
+        if db_cache.apply_invalidation(kind, key):
+            _stats["applied"] += 1
+
+
+def _listen_dsn() -> Optional[str]:
+    dsn = os.getenv("DB_LISTEN_URL") or pg_aiosqlite._dsn()
+    if ":6432" in dsn and not os.getenv("DB_LISTEN_URL"):
+        return None
+    return dsn
+
+
+async def _resync(on_resync: Optional[Callable[[], Awaitable[Any]]]) -> None:
+    """Events may have been missed while disconnected: drop everything shared and refill."""
+    _stats["resyncs"] += 1
+    db_cache.apply_invalidation("all", "")
+    print("[cache_bus] resynced: local caches cleared after listener reconnect")
+    if on_resync is not None:
+        try:
+            await on_resync()
+        except Exception as e:
+            print(f"[cache_bus] on_resync failed: {e}")
+
+
+async def _listen_loop(dsn: str, on_resync: Optional[Callable[[], Awaitable[Any]]]) -> None:
+    health_s = float(os.getenv("DB_LISTEN_HEALTH_S", "30"))
+    connected_before = False
+    backoff = 1.0
+    while True:
+        try:
+            conn = await asyncpg.connect(dsn, timeout=15)
+        except Exception as e:
+            print(f"[cache_bus] listener connect failed, retrying in {backoff:.0f}s: {e}")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+            continue
+        backoff = 1.0
+        lost = asyncio.Event()
+        add_term = getattr(conn, "add_termination_listener", None)
+        if add_term is not None:
+            add_term(lambda _c: lost.set())
+        try:
+            await conn.add_listener(CHANNEL, _on_notify)
+            if connected_before:
+                _stats["reconnects"] += 1
+                await _resync(on_resync)
+            connected_before = True
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), timeout=health_s)
+                except asyncio.TimeoutError:
+                    await conn.execute("SELECT 1", timeout=10)
+        except asyncio.CancelledError:
+            await conn.close()
+            raise
+        except Exception as e:
+            print(f"[cache_bus] listener connection lost: {e}")
+        else:
+            print("[cache_bus] listener connection lost")
+        try:
+            conn.terminate()
+        except Exception:
+            pass
+
+
+def start(on_resync: Optional[Callable[[], Awaitable[Any]]] = None) -> bool:
+    """
+    Start listening for other processes' invalidations (idempotent). on_resync runs after
+    a reconnect, once caches have been cleared (e.g. warm_cache). Returns False if disabled.
+    """
+    global _listener_task
+    if not ENABLED:
+        return False
+    dsn = _listen_dsn()
+    if dsn is None:
+        print("[cache_bus] DATABASE_URL is pgbouncer (:6432); set DB_LISTEN_URL to a direct DSN to receive invalidations")
+        return False
+    if _listener_task is None or _listener_task.done():
+        _listener_task = asyncio.get_running_loop().create_task(_listen_loop(dsn, on_resync))
+    return True
+
+
+def get_stats() -> dict:
+    return {"enabled": ENABLED, "channel": CHANNEL, "listening": _listener_task is not None and not _listener_task.done(),
+            **_stats}
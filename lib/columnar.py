@@ -0,0 +1,252 @@
+"""
+Column-oriented, read-only storage for the cached static tables.
+
+A full-table dump (learnsets, pokedex_forms, move_generation_stats, ...) held as a
+list of dicts costs one dict per row plus one boxed object per cell. ColumnarTable
+keeps one compact column per field instead:
+
+- integer columns -> the narrowest signed array("b"/"h"/"i"/"q") that fits (plus a
+  null bitmap when the column has NULLs)
+- float columns   -> array("d") (same)
+- other hashable values (strings, bools, dates, ...) -> dictionary-encoded: one
+  array of small codes ("B"/"H"/"I") into a pool of distinct values, with strings
+  interned, so each distinct value is stored once
+- anything unhashable (e.g. decoded JSON) -> a plain list
+- a column that is NULL in every row -> nothing at all
+
+Indexing or iterating the table gives Row views: read-only Mappings (r["x"],
+r.get("x"), dict(r), "x" in r) that decode cells on access, so existing callers
+that treat rows as dicts keep working. Copy with dict(row) before modifying.
+
+table_memory() compares the estimated size of the source rows with the columnar copy.
+"""
+from __future__ import annotations
+
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+class _NullableColumn:
+    """A numeric array with a bitmap of NULL positions."""
+
+    __slots__ = ("values", "nulls")
+
+    def __init__(self, values: array, nulls: bytearray):
+        self.values = values
+        self.nulls = nulls
+
+    def __getitem__(self, i: int) -> Any:
+        if self.nulls[i >> 3] & (1 << (i & 7)):
+            return None
+        return self.values[i]
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + sys.getsizeof(self.values) + sys.getsizeof(self.nulls)
+
+
+class _CodedColumn:
+    """Dictionary-encoded column: codes[i] indexes into the pool of distinct values."""
+
+    __slots__ = ("codes", "pool")
+
+    def __init__(self, codes: array, pool: Tuple[Any, ...]):
+        self.codes = codes
+        self.pool = pool
+
+    def __getitem__(self, i: int) -> Any:
+        return self.pool[self.codes[i]]
+
+    def __sizeof__(self) -> int:
+        return (object.__sizeof__(self) + sys.getsizeof(self.codes) + sys.getsizeof(self.pool)
+                + sum(sys.getsizeof(v) for v in self.pool if v is not None))
+
+
+class _ConstColumn:
+    """A column holding the same value (in practice NULL) in every row."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __getitem__(self, i: int) -> Any:
+        return self.value
+
+
+def _null_bitmap(values: List[Any]) -> Optional[bytearray]:
+    if all(v is not None for v in values):
+        return None
+    bits = bytearray((len(values) + 7) // 8)
+    for i, v in enumerate(values):
+        if v is None:
+            bits[i >> 3] |= 1 << (i & 7)
+    return bits
+
+
+def _int_type(lo: int, hi: int) -> str:
+    for typecode in ("b", "h", "i"):
+        bits = array(typecode).itemsize * 8 - 1
+        if -(1 << bits) <= lo and hi < (1 << bits):
+            return typecode
+    return "q"
+
+
+def _code_type(n: int) -> str:
+    if n <= 0xFF:
+        return "B"
+    if n <= 0xFFFF:
+        return "H"
+    return "I"
+
+
+def _encode_column(values: List[Any]) -> Any:
+    """Pick the most compact representation that returns exactly the same values."""
+    present = [v for v in values if v is not None]
+    if not present:
+        return _ConstColumn(None)
+    for kind in (int, float):
+        # type() rather than isinstance(): bools must come back as bools
+        if all(type(v) is kind for v in present):
+            typecode = _int_type(min(present), max(present)) if kind is int else "d"
+            try:
+                packed = array(typecode, (0 if v is None else v for v in values))
+            except OverflowError:
+                break
+            nulls = _null_bitmap(values)
+            return packed if nulls is None else _NullableColumn(packed, nulls)
+    # Keyed by (type, value) so equal values of different types (1, 1.0, True) stay apart
+    pool: Dict[Tuple[type, Any], int] = {}
+    codes: List[int] = []
+    try:
+        for v in values:
+            if type(v) is str:
+                v = sys.intern(v)
+            key = (type(v), v)
+            code = pool.get(key)
+            if code is None:
+                code = pool[key] = len(pool)
+            codes.append(code)
+    except TypeError:
+        # Unhashable cells (lists, dicts): keep the objects as they are
+        return list(values)
+    return _CodedColumn(array(_code_type(len(pool)), codes), tuple(v for _, v in pool))
+
+
+class Row(Mapping):
+    """Read-only view of one row of a ColumnarTable."""
+
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table: "ColumnarTable", i: int):
+        self._table = table
+        self._i = i
+
+    def __getitem__(self, key: str) -> Any:
+        return self._table._data[key][self._i]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        col = self._table._data.get(key)
+        return default if col is None else col[self._i]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._table._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.columns)
+
+    def __len__(self) -> int:
+        return len(self._table.columns)
+
+    def __repr__(self) -> str:
+        return f"Row({dict(self)!r})"
+
+
+class ColumnarTable(Sequence):
+    """Immutable table of rows stored column by column; rows are Row views."""
+
+    __slots__ = ("columns", "_data", "_len")
+
+    def __init__(self, columns: Sequence[str], tuples: Sequence[Sequence[Any]]):
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self._len = len(tuples)
+        self._data: Dict[str, Any] = {}
+        for j, name in enumerate(self.columns):
+            self._data[sys.intern(name)] = _encode_column([t[j] for t in tuples])
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> "ColumnarTable":
+        """Build from dict rows. Columns are the union of keys, in first-seen order; missing cells are None."""
+        rows = list(rows)
+        columns: Dict[str, None] = {}
+        for r in rows:
+            for k in r.keys():
+                columns.setdefault(k, None)
+        cols = tuple(columns)
+        return cls(cols, [tuple(r.get(c) for c in cols) for r in rows])
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [Row(self, j) for j in range(*i.indices(self._len))]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("row index out of range")
+        return Row(self, i)
+
+    def __iter__(self) -> Iterator[Row]:
+        for i in range(self._len):
+            yield Row(self, i)
+
+    def column(self, name: str) -> List[Any]:
+        """All values of one column, in row order (KeyError if there is no such column)."""
+        col = self._data[name]
+        return [col[i] for i in range(self._len)]
+
+    def nbytes(self) -> int:
+        """Estimated resident size of the table and its columns, in bytes."""
+        total = object.__sizeof__(self) + sys.getsizeof(self.columns) + sys.getsizeof(self._data)
+        for col in self._data.values():
+            total += sys.getsizeof(col)
+            if isinstance(col, list):
+                distinct = {id(v): v for v in col if v is not None}
+                total += sum(sys.getsizeof(v) for v in distinct.values())
+        return total
+
+    def __sizeof__(self) -> int:
+        return self.nbytes()
+
+    def __repr__(self) -> str:
+        return f"<ColumnarTable {self._len} rows x {len(self.columns)} columns>"
+
+
+def rows_nbytes(rows: Iterable[Any]) -> int:
+    """
+    Estimated resident size of a list of dict rows: the list, every dict, and every
+    distinct cell object (shared objects such as small ints or interned strings are
+    counted once).
+    """
+    seen: set = set()
+    total = sys.getsizeof(rows)
+    for r in rows:
+        total += sys.getsizeof(r)
+        for v in r.values():
+            if v is None or id(v) in seen:
+                continue
+            seen.add(id(v))
+            total += sys.getsizeof(v)
+    return total
+
+
+def table_memory(rows: List[Mapping[str, Any]], table: ColumnarTable) -> Dict[str, int]:
+    """{"rows", "columns", "dict_bytes", "columnar_bytes"} for a table and its source rows."""
+    return {
+        "rows": len(table),
+        "columns": len(table.columns),
+        "dict_bytes": rows_nbytes(rows),
+        "columnar_bytes": table.nbytes(),
+    }
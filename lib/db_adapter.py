@@ -1,5 +1,6 @@
 """
 Postgres-only adapter (DexThemAll uses Supabase).
+DB_BACKEND=local swaps the server for a throwaway local PostgreSQL (lib/pg_local.py).
 
 Import as:
     from lib.db_adapter import aiosqlite, DB_IS_POSTGRES
@@ -10,6 +11,9 @@ import os
 
 DB_IS_POSTGRES = True  # Always use Postgres
 
+from .pg_local import configure_backend as _configure_backend
+_configure_backend()
+
 from . import pg_aiosqlite as aiosqlite  # type: ignore
 
 __all__ = ["aiosqlite", "DB_IS_POSTGRES"]
@@ -2,40 +2,38 @@
 Database query caching layer to reduce database load and improve performance.
 Caches frequently accessed data like Pokémon species, moves, and items.
 Also caches full-table dumps for learnsets, pokedex_forms, rulesets, etc.
+
+Every namespace is a TTLCache: LRU-bounded by entry count (CACHE_MAX_<NAME>; the
+static pokedex/moves/items/species namespaces are unbounded by default) and
+optionally by approximate bytes (CACHE_MAX_BYTES_<NAME>), with its own TTL and
+hit/miss/eviction/expiry counters (see get_cache_stats()).
+
+List tables are stored column by column (lib/columnar.py: ColumnarTable of read-only
+Row views); CACHE_COLUMNAR=0 keeps them as lists of dicts. table_memory_stats() reports
+the size of each table before and after packing. Tables in TABLE_KEYS also get
+key indexes, built with the dump, for O(1) lookup_row()/lookup_rows() (e.g.
+get_pokedex_form(species_id, form_key), get_pokedex_forms_for(species_id)).
+Fuzzy name indexes (lib/fuzzy_index.py) and autocomplete prefix indexes
+(lib/autocomplete.py) built from the pokedex/moves/items dumps are kept per kind
+(get_fuzzy_index("moves"), get_completer("items"), ...) and dropped with their
+source table.
+
+Invalidations are also handed to an optional publisher (lib/cache_bus.py sends them
+to other processes over Postgres NOTIFY); apply_invalidation() is the receiving side.
 """
 from __future__ import annotations
-from typing import Dict, Any, Optional, List, Union
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Any, Mapping, Optional, List, Sequence, Union, Iterator, Tuple
+import asyncio
+import os
+from bisect import bisect_left
+import sys
 import time
 from functools import lru_cache
 
-# Global caches with TTL (Time To Live)
-_POKEDEX_CACHE: Dict[str, tuple[Dict[str, Any], float]] = {}  # key -> (data, expiry_time)
-_MOVE_CACHE: Dict[str, tuple[Dict[str, Any], float]] = {}
-_ITEM_CACHE: Dict[str, tuple[Dict[str, Any], float]] = {}
-
-# Full-table caches: table_name -> (data, expiry). data = list[dict] or dict for config.
-_STATIC_TABLES: Dict[str, tuple[Union[List[Dict[str, Any]], Dict[str, str]], float]] = {}
-
-# Per-owner pokemons list cache: owner_id (str) -> (list of pokemon dicts, expiry).
-# Invalidated whenever pokemons table is written for that owner.
-_POKEMONS_CACHE: Dict[str, tuple[List[Dict[str, Any]], float]] = {}
-
-# Per-owner bag (user_items) cache: owner_id (str) -> (list of item dicts with item_id, qty, name, emoji, icon_url, expiry).
-# Invalidated whenever user_items is written for that owner.
-_BAG_CACHE: Dict[str, tuple[List[Dict[str, Any]], float]] = {}
-
-# Per-owner adventure state cache: owner_id (str) -> (state dict, expiry). Updated on save.
-_ADVENTURE_CACHE: Dict[str, tuple[Dict[str, Any], float]] = {}
-
-# Per-owner party cache: owner_id (str) -> (list of mon_data dicts for engine, expiry). Invalidated when pokemons change.
-_PARTY_CACHE: Dict[str, tuple[List[Dict[str, Any]], float]] = {}
-
-# Per-owner TM Machine cache: owner_id (str) -> (list of {item_id, qty} for tm-%/hm-%, expiry). Invalidated when user_items tm/hm change.
-_TM_MACHINE_CACHE: Dict[str, tuple[List[Dict[str, Any]], float]] = {}
-
-# Battle-scoped party cache: user_id -> list of party dicts (from get_party_for_engine).
-# Set at battle start, cleared at battle end. Never use global/persistent pokemons cache.
-_BATTLE_PARTY_CACHE: Dict[int, List[Dict[str, Any]]] = {}
+from .columnar import ColumnarTable, table_memory
+from .autocomplete import COMPLETER_KINDS
+from .fuzzy_index import FUZZY_KINDS
 
 # Cache TTL in seconds (5 minutes for most data, 1 hour for static data)
 CACHE_TTL_POKEDEX = 300  # 5 minutes
@@ -48,82 +46,425 @@ CACHE_TTL_ADVENTURE = 300  # 5 minutes per owner
 CACHE_TTL_PARTY = 300  # 5 minutes per owner
 CACHE_TTL_TM_MACHINE = 300  # 5 minutes per owner
 
+# Store list tables column by column (see lib/columnar.py)
+CACHE_COLUMNAR = os.getenv("CACHE_COLUMNAR", "1").lower() not in ("0", "false", "no")
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return value if value > 0 else None
+
+
+def _approx_size(obj: Any, depth: int = 0) -> int:
+    """Rough deep size of a cached value (dicts/lists of rows), for max_bytes budgets."""
+    size = sys.getsizeof(obj)
+    if depth >= 3:
+        return size
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += sys.getsizeof(k) + _approx_size(v, depth + 1)
+    elif isinstance(obj, (list, tuple)):
+        for v in obj:
+            size += _approx_size(v, depth + 1)
+    return size
+
+
+class TTLCache:
+    """
+    LRU cache with a per-namespace TTL and an entry and/or byte budget.
+
+    get() returns None for missing or expired keys; set() evicts least-recently-used
+    entries until the budget holds. ttl=None means entries never expire.
+    """
+
+    __slots__ = ("name", "ttl", "max_entries", "max_bytes", "_data", "_bytes",
+                 "hits", "misses", "evictions", "expirations")
+
+    def __init__(self, name: str, ttl: Optional[float], max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = _env_int(f"CACHE_MAX_{name.upper()}", max_entries)
+        self.max_bytes = _env_int(f"CACHE_MAX_BYTES_{name.upper()}", max_bytes)
+        # key -> (value, expiry or None, approx bytes)
+        self._data: "OrderedDict[Any, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Any) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expiry, _ = entry
+        if expiry is not None and time.monotonic() > expiry:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expiry = time.monotonic() + ttl if ttl is not None else None
+        size = _approx_size(value) if self.max_bytes else 0
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (value, expiry, size)
+        self._bytes += size
+        self._enforce_budget()
+
+    def peek(self, key: Any) -> Any:
+        """Like get() for a live entry, but without touching LRU order or hit/miss counters."""
+        entry = self._data.get(key)
+        if entry is None or (entry[1] is not None and time.monotonic() > entry[1]):
+            return None
+        return entry[0]
+
+    def expires_in(self, key: Any) -> Optional[float]:
+        """Seconds until key expires (<= 0 if already expired); None if missing or never expires."""
+        entry = self._data.get(key)
+        if entry is None or entry[1] is None:
+            return None
+        return entry[1] - time.monotonic()
+
+    def touch(self, key: Any, ttl: Optional[float] = None) -> bool:
+        """Restart key's TTL without replacing the value. False if key is missing."""
+        entry = self._data.get(key)
+        if entry is None:
+            return False
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (entry[0], time.monotonic() + ttl if ttl is not None else None, entry[2])
+        return True
+
+    def touch_all(self, ttl: Optional[float] = None) -> int:
+        """Restart the TTL of every unexpired entry. Returns how many were touched."""
+        now = time.monotonic()
+        live = [k for k, (_, expiry, _) in self._data.items() if expiry is None or now <= expiry]
+        for k in live:
+            self.touch(k, ttl)
+        return len(live)
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        if key not in self._data:
+            return default
+        value = self._data[key][0]
+        self._remove(key)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Any) -> None:
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def _enforce_budget(self) -> None:
+        while self._data and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes and len(self._data) > 1)
+        ):
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
+
+    def purge_expired(self) -> int:
+        """Drop expired entries now (they are otherwise dropped lazily on access or by LRU)."""
+        now = time.monotonic()
+        dead = [k for k, (_, expiry, _) in self._data.items() if expiry is not None and now > expiry]
+        for k in dead:
+            self._remove(k)
+        self.expirations += len(dead)
+        return len(dead)
+
+    def live_values(self) -> Iterator[Any]:
+        """Values of unexpired entries (does not touch LRU order or counters)."""
+        now = time.monotonic()
+        for value, expiry, _ in list(self._data.values()):
+            if expiry is None or now <= expiry:
+                yield value
+
+    def live_count(self) -> int:
+        now = time.monotonic()
+        return sum(1 for _, expiry, _ in self._data.values() if expiry is None or now <= expiry)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._data
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "live": self.live_count(),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes if self.max_bytes else None,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate_pct": round(100.0 * self.hits / lookups, 1) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent cache-miss loads: callers asking for the same key while a load
+    is running await that load instead of starting their own.
+
+    The first caller runs load() itself, in its own task. If it fails,
+    waiters get the same exception; if it is cancelled, waiters start their own load.
+    forget(key), called on invalidation, detaches a running load: later callers start a
+    fresh one, and the detached result is returned to its waiters but not stored, so
+    data read before a write never lands in the cache.
+    """
+
+    __slots__ = ("name", "_inflight", "loads", "coalesced")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Any, "asyncio.Future[Any]"] = {}
+        self.loads = 0
+        self.coalesced = 0
+
+    async def do(self, key: Any, load: Callable[[], Awaitable[Any]],
+                 store: Optional[Callable[[Any], None]] = None) -> Any:
+        while True:
+            fut = self._inflight.get(key)
+            if fut is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                if not fut.cancelled():
+                    raise  # this waiter was cancelled, not the load
+                # the loading caller was cancelled: take over
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        self.loads += 1
+        try:
+            result = await load()
+        except BaseException as e:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+            if isinstance(e, asyncio.CancelledError):
+                fut.cancel()
+            else:
+                fut.set_exception(e)
+                fut.exception()  # retrieved here; waiters (if any) re-raise it
+            raise
+        current = self._inflight.get(key) is fut
+        if current:
+            del self._inflight[key]
+            if store is not None and result is not None:
+                try:
+                    store(result)
+                except Exception:
+                    pass
+        fut.set_result(result)
+        return result
+
+    def forget(self, key: Any) -> None:
+        self._inflight.pop(key, None)
+
+    def forget_all(self) -> None:
+        self._inflight.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"loads": self.loads, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+
+# Global caches. Static namespaces hold several keys per row (id, name, normalized name)
+# and are sized by their table, so they are unbounded unless CACHE_MAX_<NAME> is set:
+# an LRU cap would silently evict rows during warm-up. Only per-owner caches are capped.
+_POKEDEX_CACHE = TTLCache("pokedex", CACHE_TTL_POKEDEX)
+_MOVE_CACHE = TTLCache("moves", CACHE_TTL_MOVES)
+_ITEM_CACHE = TTLCache("items", CACHE_TTL_ITEMS)
+# Parsed species records (lib/species_records.py), same keys as _POKEDEX_CACHE
+_SPECIES_CACHE = TTLCache("species", CACHE_TTL_POKEDEX)
+
+# Fuzzy name indexes: kind ("species", "moves", "items", ...) -> FuzzyIndex. Names
+# don't change with single-row writes, so only table-level invalidation drops them.
+_FUZZY_CACHE = TTLCache("fuzzy", CACHE_TTL_STATIC, max_entries=32)
+# Autocomplete prefix indexes: kind ("species", "moves", "items") -> PrefixIndex. Same rules.
+_COMPLETER_CACHE = TTLCache("autocomplete", CACHE_TTL_STATIC, max_entries=16)
+
+# Full-table caches: table_name -> data. data = list[dict] or dict for config.
+_STATIC_TABLES = TTLCache("static_tables", CACHE_TTL_STATIC, max_entries=64)
+
+# Per-owner pokemons list cache: owner_id (str) -> list of pokemon dicts.
+# Invalidated whenever pokemons table is written for that owner.
+_POKEMONS_CACHE = TTLCache("pokemons", CACHE_TTL_POKEMONS, max_entries=2000)
+
+# Per-owner bag (user_items) cache: owner_id (str) -> list of item dicts with item_id, qty, name, emoji, icon_url.
+# Invalidated whenever user_items is written for that owner.
+_BAG_CACHE = TTLCache("bag", CACHE_TTL_BAG, max_entries=2000)
+
+# Per-owner adventure state cache: owner_id (str) -> state dict. Updated on save.
+_ADVENTURE_CACHE = TTLCache("adventure", CACHE_TTL_ADVENTURE, max_entries=2000)
+
+# Per-owner party cache: owner_id (str) -> list of mon_data dicts for engine. Invalidated when pokemons change.
+_PARTY_CACHE = TTLCache("party", CACHE_TTL_PARTY, max_entries=2000)
+
+# Per-owner TM Machine cache: owner_id (str) -> list of {item_id, qty} for tm-%/hm-%. Invalidated when user_items tm/hm change.
+_TM_MACHINE_CACHE = TTLCache("tm_machine", CACHE_TTL_TM_MACHINE, max_entries=2000)
+
+# Battle-scoped party cache: user_id -> list of party dicts (from get_party_for_engine).
+# Set at battle start, cleared at battle end (no TTL). Never use global/persistent pokemons cache.
+_BATTLE_PARTY_CACHE = TTLCache("battle_party", None, max_entries=1000)
+
+_ALL_CACHES = (
+    _POKEDEX_CACHE, _SPECIES_CACHE, _MOVE_CACHE, _ITEM_CACHE, _FUZZY_CACHE, _COMPLETER_CACHE, _STATIC_TABLES,
+    _POKEMONS_CACHE, _BAG_CACHE, _ADVENTURE_CACHE, _PARTY_CACHE, _TM_MACHINE_CACHE, _BATTLE_PARTY_CACHE,
+)
+
+# Single-flight loaders for per-owner misses (see load_pokemons / load_bag)
+_POKEMONS_FLIGHT = SingleFlight("pokemons")
+_BAG_FLIGHT = SingleFlight("bag")
+_ALL_FLIGHTS = (_POKEMONS_FLIGHT, _BAG_FLIGHT)
+
+# Cross-process invalidation hook: fn(kind, key), installed by cache_bus.install_publisher()
+_publisher: Optional[Callable[[str, str], None]] = None
+_suppress_publish = False  # set while applying a remote event, so it isn't echoed back
+
+
+def set_invalidation_publisher(fn: Optional[Callable[[str, str], None]]) -> None:
+    """Install (or remove with None) the hook that publishes invalidations to other processes."""
+    global _publisher
+    _publisher = fn
+
+
+def _publish(kind: str, key: str = "") -> None:
+    if _publisher is None or _suppress_publish:
+        return
+    try:
+        _publisher(kind, key)
+    except Exception:
+        pass  # publishing is best-effort; the local invalidation already happened
+
 def _get_cache_key(name_or_id: str) -> str:
     """Normalize cache key."""
     return str(name_or_id).lower().strip()
 
-def _is_expired(expiry_time: float) -> bool:
-    """Check if cache entry is expired."""
-    return time.time() > expiry_time
-
 def get_cached_pokedex(name_or_id: str) -> Optional[Dict[str, Any]]:
     """Get Pokémon data from cache."""
     key = _get_cache_key(name_or_id)
-    if key in _POKEDEX_CACHE:
-        data, expiry = _POKEDEX_CACHE[key]
-        if not _is_expired(expiry):
-            return data
-        else:
-            # Expired, remove it
-            del _POKEDEX_CACHE[key]
-    return None
+    return _POKEDEX_CACHE.get(key)
 
 def set_cached_pokedex(name_or_id: str, data: Dict[str, Any], ttl: float = CACHE_TTL_POKEDEX) -> None:
     """Cache Pokémon data."""
     key = _get_cache_key(name_or_id)
-    expiry = time.time() + ttl
-    _POKEDEX_CACHE[key] = (data, expiry)
+    _POKEDEX_CACHE.set(key, data, ttl)
+
+def set_cached_species(name_or_id: str, record: Any, ttl: float = CACHE_TTL_POKEDEX) -> None:
+    """Cache the parsed SpeciesRecord of a pokedex row (record.row must be the cached row)."""
+    _SPECIES_CACHE.set(_get_cache_key(name_or_id), record, ttl)
+
+def get_species_record(name_or_id: str) -> Any:
+    """
+    Parsed SpeciesRecord for a cached pokedex row, or None if the row isn't cached.
+    Records are built at warm time; a row cached later gets its record on first use.
+    A record is only returned while its row is still the cached one.
+    """
+    key = _get_cache_key(name_or_id)
+    row = _POKEDEX_CACHE.get(key)
+    if row is None:
+        return None
+    record = _SPECIES_CACHE.get(key)
+    if record is not None and record.row is row:
+        return record
+    from .species_records import from_row
+    record = from_row(row)
+    _SPECIES_CACHE.set(key, record, _POKEDEX_CACHE.expires_in(key))
+    return record
 
 def get_cached_move(name: str) -> Optional[Dict[str, Any]]:
     """Get move data from cache."""
     key = _get_cache_key(name)
-    if key in _MOVE_CACHE:
-        data, expiry = _MOVE_CACHE[key]
-        if not _is_expired(expiry):
-            return data
-        else:
-            del _MOVE_CACHE[key]
-    return None
+    return _MOVE_CACHE.get(key)
 
 def set_cached_move(name: str, data: Dict[str, Any], ttl: float = CACHE_TTL_MOVES) -> None:
     """Cache move data."""
     key = _get_cache_key(name)
-    expiry = time.time() + ttl
-    _MOVE_CACHE[key] = (data, expiry)
+    _MOVE_CACHE.set(key, data, ttl)
 
 def get_cached_item(item_id: str) -> Optional[Dict[str, Any]]:
     """Get item data from cache."""
     key = _get_cache_key(item_id)
-    if key in _ITEM_CACHE:
-        data, expiry = _ITEM_CACHE[key]
-        if not _is_expired(expiry):
-            return data
-        else:
-            del _ITEM_CACHE[key]
-    return None
+    return _ITEM_CACHE.get(key)
 
 def set_cached_item(item_id: str, data: Dict[str, Any], ttl: float = CACHE_TTL_ITEMS) -> None:
     """Cache item data."""
     key = _get_cache_key(item_id)
-    expiry = time.time() + ttl
-    _ITEM_CACHE[key] = (data, expiry)
+    _ITEM_CACHE.set(key, data, ttl)
+
+def set_fuzzy_index(kind: str, index: Any, ttl: float = CACHE_TTL_STATIC) -> None:
+    """Cache a FuzzyIndex under its kind (see fuzzy_index.FUZZY_KINDS)."""
+    _FUZZY_CACHE.set(kind, index, ttl)
+
+def get_fuzzy_index(kind: str) -> Any:
+    """Cached FuzzyIndex for a kind, or None if it hasn't been built (or has expired)."""
+    return _FUZZY_CACHE.get(kind)
+
+def set_completer(kind: str, index: Any, ttl: float = CACHE_TTL_STATIC) -> None:
+    """Cache an autocomplete PrefixIndex under its kind (see autocomplete.COMPLETER_KINDS)."""
+    _COMPLETER_CACHE.set(kind, index, ttl)
+
+def get_completer(kind: str) -> Any:
+    """Cached autocomplete PrefixIndex for a kind, or None if it hasn't been built (or has expired)."""
+    return _COMPLETER_CACHE.get(kind)
+
+def _drop_name_indexes(table_name: str) -> None:
+    """Drop the fuzzy and autocomplete indexes built from a table."""
+    for cache, kinds in ((_FUZZY_CACHE, FUZZY_KINDS), (_COMPLETER_CACHE, COMPLETER_KINDS)):
+        for kind, source in kinds.items():
+            if source == table_name:
+                cache.pop(kind, None)
+
+def extend_table_caches(table_name: str) -> bool:
+    """
+    Keep serving everything derived from a pokedex/moves/items dump (per-row entries,
+    name indexes, the items table) for another TTL, when the table is known unchanged.
+    False, touching nothing, if a name index is gone (the table was invalidated).
+    """
+    kinds = [(cache, kind) for cache, table_kinds in ((_FUZZY_CACHE, FUZZY_KINDS), (_COMPLETER_CACHE, COMPLETER_KINDS))
+             for kind, source in table_kinds.items() if source == table_name]
+    if not kinds or any(cache.peek(kind) is None for cache, kind in kinds):
+        return False
+    for cache in _TABLE_NAMESPACES.get(table_name, ()):
+        cache.touch_all()
+    for cache, kind in kinds:
+        cache.touch(kind)
+    _STATIC_TABLES.touch(table_name)
+    return True
 
 def get_cached_pokemons(owner_id: str) -> Optional[List[Dict[str, Any]]]:
     """Get cached list of pokemons for an owner. None if missing or expired."""
     key = str(owner_id).strip()
-    if key in _POKEMONS_CACHE:
-        data, expiry = _POKEMONS_CACHE[key]
-        if not _is_expired(expiry):
-            return data
-        del _POKEMONS_CACHE[key]
-    return None
+    return _POKEMONS_CACHE.get(key)
 
 
 def set_cached_pokemons(owner_id: str, data: List[Dict[str, Any]], ttl: float = CACHE_TTL_POKEMONS) -> None:
     """Cache list of pokemons for an owner."""
     key = str(owner_id).strip()
-    expiry = time.time() + ttl
-    _POKEMONS_CACHE[key] = (data, expiry)
+    _POKEMONS_CACHE.set(key, data, ttl)
 
 
 def invalidate_pokemons(owner_id: str) -> None:
@@ -131,107 +472,171 @@ def invalidate_pokemons(owner_id: str) -> None:
     key = str(owner_id).strip()
     _POKEMONS_CACHE.pop(key, None)
     _PARTY_CACHE.pop(key, None)  # party is derived from pokemons
+    _POKEMONS_FLIGHT.forget(key)
+    _publish("pokemons", key)
+
+
+def _in_team(row: Optional[Dict[str, Any]]) -> bool:
+    try:
+        return row is not None and row.get("team_slot") is not None and 1 <= int(row["team_slot"]) <= 6
+    except (TypeError, ValueError):
+        return False
+
+
+def patch_pokemon(owner_id: str, row: Dict[str, Any], insert_limit: Optional[int] = None) -> bool:
+    """
+    Write-through: replace (or insert, in id order) one row in the owner's cached pokemons
+    list with the authoritative row from the DB (e.g. from RETURNING *), instead of
+    dropping the whole list. The party cache is dropped only if the mon is or was in the
+    team. Other processes still get a plain invalidation. If inserting would exceed
+    insert_limit (the list is a truncated prefix), the owner is invalidated instead.
+    Returns True if the cached list was patched.
+    """
+    key = str(owner_id).strip()
+    _POKEMONS_FLIGHT.forget(key)  # a load started before this write must not be stored
+    _publish("pokemons", key)
+    cached = _POKEMONS_CACHE.peek(key)
+    try:
+        mon_id = int(row["id"])
+    except (KeyError, TypeError, ValueError):
+        cached = None
+    if cached is None:
+        _POKEMONS_CACHE.pop(key, None)
+        _PARTY_CACHE.pop(key, None)
+        return False
+    ids = [int(p.get("id")) for p in cached]
+    i = bisect_left(ids, mon_id)
+    old = cached[i] if i < len(ids) and ids[i] == mon_id else None
+    if old is None and insert_limit is not None and len(cached) >= insert_limit:
+        _POKEMONS_CACHE.pop(key, None)
+        _PARTY_CACHE.pop(key, None)
+        return False
+    new_list = list(cached)  # copy-on-write: readers may hold the old list
+    if old is not None:
+        new_list[i] = row
+    else:
+        new_list.insert(i, row)
+    _POKEMONS_CACHE.set(key, new_list)
+    if _in_team(old) or _in_team(row):
+        _PARTY_CACHE.pop(key, None)
+    return True
 
 
 def clear_all_pokemons_cache() -> None:
     """Clear all per-owner pokemons caches (e.g. after full table wipe)."""
     _POKEMONS_CACHE.clear()
+    _POKEMONS_FLIGHT.forget_all()
+    _publish("all_pokemons")
 
 
 def get_cached_bag(owner_id: str) -> Optional[List[Dict[str, Any]]]:
     """Get cached bag (list of item dicts: item_id, qty, name, emoji, icon_url) for an owner. None if missing or expired."""
     key = str(owner_id).strip()
-    if key in _BAG_CACHE:
-        data, expiry = _BAG_CACHE[key]
-        if not _is_expired(expiry):
-            return data
-        del _BAG_CACHE[key]
-    return None
+    return _BAG_CACHE.get(key)
 
 
 def set_cached_bag(owner_id: str, data: List[Dict[str, Any]], ttl: float = CACHE_TTL_BAG) -> None:
     """Cache bag (list of item dicts) for an owner."""
     key = str(owner_id).strip()
-    expiry = time.time() + ttl
-    _BAG_CACHE[key] = (data, expiry)
+    _BAG_CACHE.set(key, data, ttl)
 
 
 def invalidate_bag(owner_id: str) -> None:
     """Remove cached bag for an owner (call after user_items write so next read refills from DB)."""
-    _BAG_CACHE.pop(str(owner_id).strip(), None)
+    key = str(owner_id).strip()
+    _BAG_CACHE.pop(key, None)
+    _BAG_FLIGHT.forget(key)
+    _publish("bag", key)
 
 
 def get_cached_tm_machine(owner_id: str) -> Optional[List[Dict[str, Any]]]:
     """Get cached TM Machine list (item_id, qty) for tm-%/hm-% items. None if missing or expired."""
     key = str(owner_id).strip()
-    if key in _TM_MACHINE_CACHE:
-        data, expiry = _TM_MACHINE_CACHE[key]
-        if not _is_expired(expiry):
-            return data
-        del _TM_MACHINE_CACHE[key]
-    return None
+    return _TM_MACHINE_CACHE.get(key)
 
 
 def set_cached_tm_machine(owner_id: str, data: List[Dict[str, Any]], ttl: float = CACHE_TTL_TM_MACHINE) -> None:
     """Cache TM Machine list for an owner."""
     key = str(owner_id).strip()
-    _TM_MACHINE_CACHE[key] = (data, time.time() + ttl)
+    _TM_MACHINE_CACHE.set(key, data, ttl)
 
 
 def invalidate_tm_machine(owner_id: str) -> None:
     """Remove cached TM Machine for an owner (call after giving/using a TM/HM)."""
-    _TM_MACHINE_CACHE.pop(str(owner_id).strip(), None)
+    key = str(owner_id).strip()
+    _TM_MACHINE_CACHE.pop(key, None)
+    _publish("tm_machine", key)
 
 
 def clear_all_bag_cache() -> None:
     """Clear all per-owner bag caches (e.g. after full table wipe)."""
     _BAG_CACHE.clear()
+    _BAG_FLIGHT.forget_all()
+    _publish("all_bag")
+
+
+async def load_pokemons(owner_id: str, load: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """
+    Cached pokemons for an owner, or the result of load() (then cached). Concurrent
+    misses for the same owner share one load.
+    """
+    key = str(owner_id).strip()
+    cached = _POKEMONS_CACHE.get(key)
+    if cached is not None:
+        return cached
+    return await _POKEMONS_FLIGHT.do(key, load, lambda rows: _POKEMONS_CACHE.set(key, rows))
+
+
+async def load_bag(owner_id: str, load: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """Cached bag for an owner, or the result of load() (then cached); concurrent misses share one load."""
+    key = str(owner_id).strip()
+    cached = _BAG_CACHE.get(key)
+    if cached is not None:
+        return cached
+    return await _BAG_FLIGHT.do(key, load, lambda items: _BAG_CACHE.set(key, items))
 
 
 def get_cached_adventure_state(owner_id: str) -> Optional[Dict[str, Any]]:
     """Get cached adventure state for an owner. None if missing or expired."""
     key = str(owner_id).strip()
-    if key in _ADVENTURE_CACHE:
-        data, expiry = _ADVENTURE_CACHE[key]
-        if not _is_expired(expiry):
-            return data
-        del _ADVENTURE_CACHE[key]
-    return None
+    return _ADVENTURE_CACHE.get(key)
 
 
-def set_cached_adventure_state(owner_id: str, state: Dict[str, Any], ttl: float = CACHE_TTL_ADVENTURE) -> None:
-    """Cache adventure state for an owner (updated on save so next read is fast)."""
+def set_cached_adventure_state(
+    owner_id: str, state: Dict[str, Any], ttl: float = CACHE_TTL_ADVENTURE, publish: bool = False
+) -> None:
+    """
+    Cache adventure state for an owner (updated on save so next read is fast).
+    Pass publish=True on save so other processes drop their copy.
+    """
     key = str(owner_id).strip()
-    expiry = time.time() + ttl
-    _ADVENTURE_CACHE[key] = (state, expiry)
+    _ADVENTURE_CACHE.set(key, state, ttl)
+    if publish:
+        _publish("adventure", key)
 
 
 def get_cached_party(owner_id: str) -> Optional[List[Dict[str, Any]]]:
     """Get cached party (list of mon_data dicts for engine) for an owner. None if missing or expired."""
     key = str(owner_id).strip()
-    if key in _PARTY_CACHE:
-        data, expiry = _PARTY_CACHE[key]
-        if not _is_expired(expiry):
-            return data
-        del _PARTY_CACHE[key]
-    return None
+    return _PARTY_CACHE.get(key)
 
 
 def set_cached_party(owner_id: str, data: List[Dict[str, Any]], ttl: float = CACHE_TTL_PARTY) -> None:
     """Cache party (engine mon_data list) for an owner."""
     key = str(owner_id).strip()
-    expiry = time.time() + ttl
-    _PARTY_CACHE[key] = (data, expiry)
+    _PARTY_CACHE.set(key, data, ttl)
 
 
 def invalidate_party(owner_id: str) -> None:
     """Remove cached party for an owner (call when pokemons change so next get_party refetches)."""
-    _PARTY_CACHE.pop(str(owner_id).strip(), None)
+    key = str(owner_id).strip()
+    _PARTY_CACHE.pop(key, None)
+    _publish("party", key)
 
 
 def set_battle_party_cached(user_id: int, data: List[Dict[str, Any]]) -> None:
     """Store party data for a user for the current battle only. Cleared at battle end."""
-    _BATTLE_PARTY_CACHE[int(user_id)] = data
+    _BATTLE_PARTY_CACHE.set(int(user_id), data)
 
 
 def get_battle_party_cached(user_id: int) -> Optional[List[Dict[str, Any]]]:
@@ -246,12 +651,9 @@ def clear_battle_party_cache() -> None:
 
 def get_all_cached_items() -> list:
     """Return unique item dicts from cache (dedupe by id). Empty if cache unused."""
-    now = time.time()
     seen: set[str] = set()
     out = []
-    for (data, expiry) in _ITEM_CACHE.values():
-        if now > expiry:
-            continue
+    for data in _ITEM_CACHE.live_values():
         iid = (data.get("id") or "").strip()
         if not iid or iid in seen:
             continue
@@ -264,45 +666,226 @@ def get_all_cached_items() -> list:
 # Full-table caches (learnsets, pokedex_forms, rulesets, config, etc.)
 # -----------------------------------------------------------------------------
 
-def set_cached_table(name: str, data: Union[List[Dict[str, Any]], Dict[str, str]], ttl: float = CACHE_TTL_STATIC) -> None:
-    """Store a full-table dump. data = list[dict] or dict (for config)."""
-    expiry = time.time() + ttl
-    _STATIC_TABLES[name] = (data, expiry)
+# Table rows: a ColumnarTable of Row views, or a list of dicts with CACHE_COLUMNAR=0
+TableRows = Sequence[Mapping[str, Any]]
+
+# name -> {"rows", "columns", "dict_bytes", "columnar_bytes"} from the last time the table was stored
+_TABLE_MEMORY: Dict[str, Dict[str, int]] = {}
+
+
+def set_cached_table(name: str, data: Union[TableRows, Dict[str, str]], ttl: float = CACHE_TTL_STATIC) -> None:
+    """
+    Store a full-table dump. data = list of rows or dict (for config). Lists are packed
+    into a ColumnarTable unless CACHE_COLUMNAR=0; readers get read-only Row views.
+    """
+    if CACHE_COLUMNAR and isinstance(data, list):
+        packed = ColumnarTable.from_rows(data)
+        _TABLE_MEMORY[name] = table_memory(data, packed)
+        data = packed
+    # Indexes are built before the table is published, so readers never see a table
+    # without its indexes (no await in between)
+    indexes = _build_table_indexes(name, data) if _is_rows(data) and name in TABLE_KEYS else None
+    _STATIC_TABLES.set(name, data, ttl)
+    if indexes is not None:
+        _TABLE_INDEXES[name] = (data, indexes)
+    if name == "learnsets" and _is_rows(data):
+        _build_learnset_index(data)
+
+
+def get_cached_table(name: str) -> Optional[Union[TableRows, Dict[str, str]]]:
+    """Return cached table data (rows or dict) or None if missing/expired."""
+    return _STATIC_TABLES.get(name)
+
+
+def _is_rows(data: Any) -> bool:
+    return isinstance(data, (list, ColumnarTable))
+
+
+def _cached_rows(name: str) -> Optional[TableRows]:
+    out = get_cached_table(name)
+    return out if _is_rows(out) else None
+
+
+def table_memory_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Per packed table: rows, columns, and the estimated bytes as a list of dicts
+    ("dict_bytes") and as stored ("columnar_bytes").
+    """
+    return {name: dict(m) for name, m in _TABLE_MEMORY.items() if name in _STATIC_TABLES}
+
+
+def cached_table_expires_in(name: str) -> Optional[float]:
+    """Seconds until a full-table cache entry expires; None if it isn't cached."""
+    return _STATIC_TABLES.expires_in(name)
+
+
+def extend_cached_table(name: str, ttl: float = CACHE_TTL_STATIC) -> bool:
+    """Keep serving the current copy of a table for another ttl seconds (e.g. when a reload failed)."""
+    return _STATIC_TABLES.touch(name, ttl)
+
+
+# ---------- keyed lookups into static tables ----------
+# table -> {index name: (key columns, unique)}. A unique index maps a key to one row
+# (the first one in table order), a non-unique index to all matching rows in table order.
+TABLE_KEYS: Dict[str, Dict[str, Tuple[Tuple[str, ...], bool]]] = {
+    "pokedex_forms": {"form": (("species_id", "form_key"), True), "species": (("species_id",), False)},
+    "mega_evolution": {"form": (("base_species_id", "mega_form"), True), "base": (("base_species_id",), False)},
+    "gigantamax": {"form": (("base_species_id", "gmax_form"), True), "base": (("base_species_id",), False)},
+    "rulesets": {"scope": (("scope",), True)},
+}
+
+# table -> (rows the indexes were built from, {index name: {key: row position(s)}})
+_TABLE_INDEXES: Dict[str, Tuple[TableRows, Dict[str, Dict[Any, Any]]]] = {}
+
+
+def _key_part(value: Any) -> Any:
+    """Normalize one key value: text is stripped and lowercased, numeric text and whole floats become ints."""
+    if isinstance(value, str):
+        s = value.strip()
+        digits = s[1:] if s.startswith("-") else s
+        return int(s) if digits.isascii() and digits.isdigit() else s.lower()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _column_values(rows: TableRows, column: str) -> List[Any]:
+    if isinstance(rows, ColumnarTable):
+        return rows.column(column) if column in rows.columns else [None] * len(rows)
+    return [r.get(column) for r in rows]
+
+
+def _build_table_indexes(name: str, rows: TableRows) -> Dict[str, Dict[Any, Any]]:
+    indexes: Dict[str, Dict[Any, Any]] = {}
+    columns: Dict[str, List[Any]] = {}
+    for index_name, (key_cols, unique) in TABLE_KEYS[name].items():
+        for col in key_cols:
+            if col not in columns:
+                columns[col] = [_key_part(v) for v in _column_values(rows, col)]
+        keys = zip(*(columns[c] for c in key_cols)) if len(key_cols) > 1 else columns[key_cols[0]]
+        index: Dict[Any, Any] = {}
+        for pos, key in enumerate(keys):
+            if key is None or (isinstance(key, tuple) and None in key):
+                continue
+            if unique:
+                index.setdefault(key, pos)
+            else:
+                index.setdefault(key, []).append(pos)
+        if not unique:
+            index = {k: tuple(v) for k, v in index.items()}
+        indexes[index_name] = index
+    return indexes
+
+
+def _table_indexes(name: str) -> Optional[Tuple[TableRows, Dict[str, Dict[Any, Any]]]]:
+    rows = _cached_rows(name)
+    if rows is None:
+        _TABLE_INDEXES.pop(name, None)
+        return None
+    entry = _TABLE_INDEXES.get(name)
+    if entry is None or entry[0] is not rows:
+        entry = (rows, _build_table_indexes(name, rows))
+        _TABLE_INDEXES[name] = entry
+    return entry
+
+
+def _lookup_key(key: Tuple[Any, ...]) -> Any:
+    return _key_part(key[0]) if len(key) == 1 else tuple(_key_part(k) for k in key)
 
 
-def get_cached_table(name: str) -> Optional[Union[List[Dict[str, Any]], Dict[str, str]]]:
-    """Return cached table data (list[dict] or dict) or None if missing/expired."""
-    if name not in _STATIC_TABLES:
+def lookup_row(table: str, index: str, *key: Any) -> Optional[Mapping[str, Any]]:
+    """
+    The row of a cached static table with this key on a unique index (TABLE_KEYS), e.g.
+    lookup_row("pokedex_forms", "form", 26, "alola"). None if there is no such row
+    or the table isn't cached (see has_cached_table). Text keys match case-insensitively.
+    """
+    entry = _table_indexes(table)
+    if entry is None:
         return None
-    data, expiry = _STATIC_TABLES[name]
-    if time.time() > expiry:
-        del _STATIC_TABLES[name]
+    rows, indexes = entry
+    pos = indexes[index].get(_lookup_key(key))
+    return None if pos is None else rows[pos]
+
+
+def lookup_rows(table: str, index: str, *key: Any) -> Optional[List[Mapping[str, Any]]]:
+    """All rows with this key on a non-unique index, in table order; None if the table isn't cached."""
+    entry = _table_indexes(table)
+    if entry is None:
         return None
-    return data
+    rows, indexes = entry
+    return [rows[pos] for pos in indexes[index].get(_lookup_key(key), ())]
+
+
+def has_cached_table(name: str) -> bool:
+    """True if a full-table dump of name is cached (so a lookup miss means "no such row")."""
+    return _STATIC_TABLES.peek(name) is not None
+
+
+def get_pokedex_form(species_id: int, form_key: str) -> Optional[Mapping[str, Any]]:
+    return lookup_row("pokedex_forms", "form", species_id, form_key)
+
 
+def get_pokedex_forms_for(species_id: int) -> Optional[List[Mapping[str, Any]]]:
+    return lookup_rows("pokedex_forms", "species", species_id)
 
-def get_cached_learnsets() -> Optional[List[Dict[str, Any]]]:
+
+def get_mega_evolutions_for(base_species_id: int) -> Optional[List[Mapping[str, Any]]]:
+    return lookup_rows("mega_evolution", "base", base_species_id)
+
+
+def get_gigantamax_for(base_species_id: int) -> Optional[List[Mapping[str, Any]]]:
+    return lookup_rows("gigantamax", "base", base_species_id)
+
+
+def get_ruleset(scope: str) -> Optional[Mapping[str, Any]]:
+    return lookup_row("rulesets", "scope", scope)
+
+
+def get_cached_learnsets() -> Optional[TableRows]:
     """Cached learnsets table (list of rows)."""
-    out = get_cached_table("learnsets")
-    return out if isinstance(out, list) else None
+    return _cached_rows("learnsets")
+
+
+# (rows the index was built from, index); rebuilt whenever the cached learnsets list changes
+_LEARNSET_INDEX: Optional[Tuple[TableRows, Any]] = None
 
 
-def get_cached_exp_requirements() -> Optional[List[Dict[str, Any]]]:
+def _build_learnset_index(rows: TableRows) -> Any:
+    global _LEARNSET_INDEX
+    from .learnset_index import LearnsetIndex
+    index = LearnsetIndex(rows)
+    _LEARNSET_INDEX = (rows, index)
+    return index
+
+
+def get_learnset_index():
+    """
+    LearnsetIndex over the cached learnsets table (see lib/learnset_index.py), or None
+    if the table isn't cached. Built once per cached copy of the table.
+    """
+    global _LEARNSET_INDEX
+    rows = get_cached_learnsets()
+    if rows is None:
+        _LEARNSET_INDEX = None
+        return None
+    if _LEARNSET_INDEX is not None and _LEARNSET_INDEX[0] is rows:
+        return _LEARNSET_INDEX[1]
+    return _build_learnset_index(rows)
+
+
+def get_cached_exp_requirements() -> Optional[TableRows]:
     """Cached exp_requirements table (list of rows: group_code, level, exp_total)."""
-    out = get_cached_table("exp_requirements")
-    return out if isinstance(out, list) else None
+    return _cached_rows("exp_requirements")
 
 
-def get_cached_pokedex_forms() -> Optional[List[Dict[str, Any]]]:
+def get_cached_pokedex_forms() -> Optional[TableRows]:
     """Cached pokedex_forms table."""
-    out = get_cached_table("pokedex_forms")
-    return out if isinstance(out, list) else None
+    return _cached_rows("pokedex_forms")
 
 
-def get_cached_rulesets() -> Optional[List[Dict[str, Any]]]:
+def get_cached_rulesets() -> Optional[TableRows]:
     """Cached rulesets table."""
-    out = get_cached_table("rulesets")
-    return out if isinstance(out, list) else None
+    return _cached_rows("rulesets")
 
 
 def get_cached_config() -> Optional[Dict[str, str]]:
@@ -311,117 +894,189 @@ def get_cached_config() -> Optional[Dict[str, str]]:
     return out if isinstance(out, dict) else None
 
 
-def get_cached_format_rules() -> Optional[List[Dict[str, Any]]]:
+def get_cached_format_rules() -> Optional[TableRows]:
     """Cached format_rules table."""
-    out = get_cached_table("format_rules")
-    return out if isinstance(out, list) else None
+    return _cached_rows("format_rules")
 
 
-def get_cached_mega_forms() -> Optional[List[Dict[str, Any]]]:
+def get_cached_mega_forms() -> Optional[TableRows]:
     """Cached mega_forms table."""
-    out = get_cached_table("mega_forms")
-    return out if isinstance(out, list) else None
+    return _cached_rows("mega_forms")
 
 
-def get_cached_mega_evolution() -> Optional[List[Dict[str, Any]]]:
+def get_cached_mega_evolution() -> Optional[TableRows]:
     """Cached mega_evolution table."""
-    out = get_cached_table("mega_evolution")
-    return out if isinstance(out, list) else None
+    return _cached_rows("mega_evolution")
 
 
-def get_cached_move_generation_stats() -> Optional[List[Dict[str, Any]]]:
+def get_cached_move_generation_stats() -> Optional[TableRows]:
     """Cached move_generation_stats table."""
-    out = get_cached_table("move_generation_stats")
-    return out if isinstance(out, list) else None
+    return _cached_rows("move_generation_stats")
 
 
-def get_cached_gigantamax() -> Optional[List[Dict[str, Any]]]:
+def get_cached_gigantamax() -> Optional[TableRows]:
     """Cached gigantamax table."""
-    out = get_cached_table("gigantamax")
-    return out if isinstance(out, list) else None
+    return _cached_rows("gigantamax")
 
 
-def get_cached_item_effects() -> Optional[List[Dict[str, Any]]]:
+def get_cached_item_effects() -> Optional[TableRows]:
     """Cached item_effects table."""
-    out = get_cached_table("item_effects")
-    return out if isinstance(out, list) else None
+    return _cached_rows("item_effects")
 
 
-def get_cached_items_table() -> Optional[List[Dict[str, Any]]]:
+def get_cached_items_table() -> Optional[TableRows]:
     """Cached items table (list of rows)."""
-    out = get_cached_table("items")
-    return out if isinstance(out, list) else None
+    return _cached_rows("items")
 
 
-def get_cached_pvp_formats() -> Optional[List[Dict[str, Any]]]:
+def get_cached_pvp_formats() -> Optional[TableRows]:
     """Cached pvp_formats table."""
-    out = get_cached_table("pvp_formats")
-    return out if isinstance(out, list) else None
+    return _cached_rows("pvp_formats")
 
 
-def get_cached_pvp_format_rules() -> Optional[List[Dict[str, Any]]]:
+def get_cached_pvp_format_rules() -> Optional[TableRows]:
     """Cached pvp_format_rules table."""
-    out = get_cached_table("pvp_format_rules")
-    return out if isinstance(out, list) else None
+    return _cached_rows("pvp_format_rules")
 
 
 def invalidate_pokedex(name_or_id: str) -> None:
     """Remove one pokedex entry from cache (call after DB write so next read refills from DB)."""
     key = _get_cache_key(name_or_id)
     _POKEDEX_CACHE.pop(key, None)
+    _SPECIES_CACHE.pop(key, None)
+    _publish("pokedex", key)
 
 
 def invalidate_move(name: str) -> None:
     """Remove one move from cache (call after DB write)."""
     key = _get_cache_key(name)
     _MOVE_CACHE.pop(key, None)
+    _publish("move", key)
 
 
 def invalidate_item(item_id: str) -> None:
     """Remove one item from cache (call after DB write)."""
     key = _get_cache_key(item_id)
     _ITEM_CACHE.pop(key, None)
+    _publish("item", key)
 
 
 def invalidate_cached_table(table_name: str) -> None:
     """Remove a full-table cache entry (e.g. 'learnsets', 'pokedex_forms'). Call after writing to that table."""
     _STATIC_TABLES.pop(table_name, None)
+    _TABLE_INDEXES.pop(table_name, None)
+    _drop_name_indexes(table_name)
+    _publish("table", table_name)
 
 
 def clear_cache() -> None:
     """Clear all caches (including battle-scoped party cache)."""
-    global _POKEDEX_CACHE, _MOVE_CACHE, _ITEM_CACHE, _STATIC_TABLES, _POKEMONS_CACHE, _BAG_CACHE, _ADVENTURE_CACHE, _PARTY_CACHE, _BATTLE_PARTY_CACHE, _TM_MACHINE_CACHE
-    _POKEDEX_CACHE.clear()
-    _MOVE_CACHE.clear()
-    _ITEM_CACHE.clear()
-    _STATIC_TABLES.clear()
-    _POKEMONS_CACHE.clear()
-    _BAG_CACHE.clear()
-    _ADVENTURE_CACHE.clear()
-    _PARTY_CACHE.clear()
-    _BATTLE_PARTY_CACHE.clear()
-    _TM_MACHINE_CACHE.clear()
-
-
-def get_cache_stats() -> Dict[str, int]:
-    """Get cache statistics."""
-    now = time.time()
-    pokedex_count = sum(1 for _, expiry in _POKEDEX_CACHE.values() if now <= expiry)
-    move_count = sum(1 for _, expiry in _MOVE_CACHE.values() if now <= expiry)
-    item_count = sum(1 for _, expiry in _ITEM_CACHE.values() if now <= expiry)
-    static_count = sum(1 for _, expiry in _STATIC_TABLES.values() if now <= expiry)
-    pokemons_count = sum(1 for _, expiry in _POKEMONS_CACHE.values() if now <= expiry)
-    bag_count = sum(1 for _, expiry in _BAG_CACHE.values() if now <= expiry)
-    adventure_count = sum(1 for _, expiry in _ADVENTURE_CACHE.values() if now <= expiry)
-    party_count = sum(1 for _, expiry in _PARTY_CACHE.values() if now <= expiry)
-    return {
-        "pokedex": pokedex_count,
-        "moves": move_count,
-        "items": item_count,
-        "static_tables": static_count,
-        "pokemons": pokemons_count,
-        "bag": bag_count,
-        "adventure": adventure_count,
-        "party": party_count,
-        "total": pokedex_count + move_count + item_count + static_count + pokemons_count + bag_count + adventure_count + party_count
+    for cache in _ALL_CACHES:
+        cache.clear()
+    _TABLE_INDEXES.clear()
+    for flight in _ALL_FLIGHTS:
+        flight.forget_all()
+    _publish("all")
+
+
+# Per-row namespaces that are also derived from a table, for remote "table" events
+_TABLE_NAMESPACES: Dict[str, Tuple[TTLCache, ...]] = {
+    "pokedex": (_POKEDEX_CACHE, _SPECIES_CACHE),
+    "moves": (_MOVE_CACHE,),
+    "items": (_ITEM_CACHE,),
+    "pokemons": (_POKEMONS_CACHE, _PARTY_CACHE),
+    "user_items": (_BAG_CACHE, _TM_MACHINE_CACHE),
+    "adventure_state": (_ADVENTURE_CACHE,),
+}
+
+_OWNER_EVENTS: Dict[str, Tuple[TTLCache, ...]] = {
+    "pokemons": (_POKEMONS_CACHE, _PARTY_CACHE),
+    "party": (_PARTY_CACHE,),
+    "bag": (_BAG_CACHE,),
+    "tm_machine": (_TM_MACHINE_CACHE,),
+    "adventure": (_ADVENTURE_CACHE,),
+    "pokedex": (_POKEDEX_CACHE, _SPECIES_CACHE),
+    "move": (_MOVE_CACHE,),
+    "item": (_ITEM_CACHE,),
+}
+
+
+def apply_invalidation(kind: str, key: str = "") -> bool:
+    """
+    Apply an invalidation published by another process (without publishing it again).
+    Kinds: pokemons/party/bag/tm_machine/adventure/pokedex/move/item (key = owner id or
+    name), table (key = table name), all_pokemons, all_bag, all. Returns False for an
+    unknown kind. "all" keeps the battle-scoped party cache, which is per-process state.
+    """
+    global _suppress_publish
+    _suppress_publish = True
+    try:
+        if kind in _OWNER_EVENTS:
+            for cache in _OWNER_EVENTS[kind]:
+                cache.pop(key, None)
+            if kind == "pokemons":
+                _POKEMONS_FLIGHT.forget(key)
+            elif kind == "bag":
+                _BAG_FLIGHT.forget(key)
+        elif kind == "table":
+            _STATIC_TABLES.pop(key, None)
+            _TABLE_INDEXES.pop(key, None)
+            _drop_name_indexes(key)
+            for cache in _TABLE_NAMESPACES.get(key, ()):
+                cache.clear()
+            if key == "pokemons":
+                _POKEMONS_FLIGHT.forget_all()
+            elif key == "user_items":
+                _BAG_FLIGHT.forget_all()
+        elif kind == "all_pokemons":
+            _POKEMONS_CACHE.clear()
+            _PARTY_CACHE.clear()
+            _POKEMONS_FLIGHT.forget_all()
+        elif kind == "all_bag":
+            _BAG_CACHE.clear()
+            _TM_MACHINE_CACHE.clear()
+            _BAG_FLIGHT.forget_all()
+        elif kind == "all":
+            for cache in _ALL_CACHES:
+                if cache is not _BATTLE_PARTY_CACHE:
+                    cache.clear()
+            _TABLE_INDEXES.clear()
+            for flight in _ALL_FLIGHTS:
+                flight.forget_all()
+        else:
+            return False
+        return True
+    finally:
+        _suppress_publish = False
+
+
+def eviction_counts() -> Dict[str, int]:
+    """LRU evictions so far per namespace (to spot a budget too small for a warm-up)."""
+    return {cache.name: cache.evictions for cache in _ALL_CACHES}
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Get cache statistics: live entry counts per namespace (plus "total"), under
+    "caches" the full TTLCache counters (hits, misses, evictions, expirations, budget),
+    under "single_flight" how many per-owner loads ran and how many were coalesced,
+    and under "table_memory" the packed size of each static table (table_memory_stats()).
+    """
+    counts = {
+        "pokedex": _POKEDEX_CACHE.live_count(),
+        "species": _SPECIES_CACHE.live_count(),
+        "moves": _MOVE_CACHE.live_count(),
+        "items": _ITEM_CACHE.live_count(),
+        "fuzzy": _FUZZY_CACHE.live_count(),
+        "autocomplete": _COMPLETER_CACHE.live_count(),
+        "static_tables": _STATIC_TABLES.live_count(),
+        "pokemons": _POKEMONS_CACHE.live_count(),
+        "bag": _BAG_CACHE.live_count(),
+        "adventure": _ADVENTURE_CACHE.live_count(),
+        "party": _PARTY_CACHE.live_count(),
     }
+    counts["total"] = sum(counts.values())
+    counts["caches"] = {cache.name: cache.stats() for cache in _ALL_CACHES}
+    counts["single_flight"] = {flight.name: flight.stats() for flight in _ALL_FLIGHTS}
+    counts["table_memory"] = table_memory_stats()
+    return counts
@@ -0,0 +1,105 @@
+"""
+Experience curves (Gen III+ growth rates), precomputed in memory.
+
+Each exp group is a compact array of 100 cumulative thresholds (index = level - 1,
+level 1 = 0). exp_for_level() is O(1) and level_for_exp() is a bisect, O(log n).
+No DB access is needed: these are the same closed-form formulas that seed the
+exp_requirements table (lib.db._exp_requirement_rows).
+
+Group codes match exp_groups / pokemons.exp_group ("medium_fast", ...). Lookups
+normalize case, spaces and hyphens. An unknown group gives level 1 / exp 0, which
+is what a miss in exp_requirements used to give.
+"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+MAX_LEVEL = 100
+
+
+def _erratic(n: int) -> int:
+    if n < 50: return n ** 3 * (100 - n) // 50
+    if n < 68: return n ** 3 * (150 - n) // 100
+    if n < 98: return n ** 3 * (1911 - 10 * n) // 500
+    return n ** 3 * (160 - n) // 100
+
+
+def _fast(n: int) -> int: return 4 * n ** 3 // 5
+def _medium_fast(n: int) -> int: return n ** 3
+def _medium_slow(n: int) -> int: return int((6 / 5) * n ** 3 - 15 * n ** 2 + 100 * n - 140)
+def _slow(n: int) -> int: return 5 * n ** 3 // 4
+
+
+def _fluctuating(n: int) -> int:
+    if n < 15: return n ** 3 * ((n + 1) // 3 + 24) // 50
+    if n < 36: return n ** 3 * (n + 14) // 50
+    return n ** 3 * ((n // 2) + 32) // 50
+
+
+_FORMULAS = {
+    "erratic": _erratic,
+    "fast": _fast,
+    "medium_fast": _medium_fast,
+    "medium_slow": _medium_slow,
+    "slow": _slow,
+    "fluctuating": _fluctuating,
+}
+
+GROUPS = frozenset(_FORMULAS)
+
+
+def _build(fn) -> array:
+    out = array("q")
+    for lvl in range(1, MAX_LEVEL + 1):
+        exp_val = 0 if lvl == 1 else max(0, fn(lvl))
+        out.append(exp_val)
+    return out
+
+
+def _suffix_min(c: array) -> array:
+    """
+    out[i] = min(c[i:]). Non-decreasing, so "highest level whose threshold <= exp" is a
+    bisect even where a curve dips (erratic, as seeded, is not monotonic in the 90s).
+    """
+    out = array("q", c)
+    for i in range(len(out) - 2, -1, -1):
+        if out[i + 1] < out[i]:
+            out[i] = out[i + 1]
+    return out
+
+
+_CURVES: Dict[str, array] = {code: _build(fn) for code, fn in _FORMULAS.items()}
+_LEVEL_KEYS: Dict[str, array] = {code: _suffix_min(c) for code, c in _CURVES.items()}
+
+
+def normalize_group(exp_group: Optional[str]) -> str:
+    return str(exp_group or "").strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def curve(exp_group: Optional[str]) -> Optional[array]:
+    """The 100 cumulative thresholds for a group (index = level - 1), or None if unknown."""
+    return _CURVES.get(normalize_group(exp_group))
+
+
+def exp_for_level(exp_group: Optional[str], level: int) -> int:
+    """Total exp needed to reach level. 0 for an unknown group or a level outside 1..100."""
+    c = curve(exp_group)
+    level = int(level)
+    if c is None or not 1 <= level <= MAX_LEVEL:
+        return 0
+    return c[level - 1]
+
+
+def level_for_exp(exp_group: Optional[str], exp_val: int) -> int:
+    """Highest level whose threshold is <= exp_val (1 for an unknown group)."""
+    keys = _LEVEL_KEYS.get(normalize_group(exp_group))
+    if keys is None:
+        return 1
+    return max(1, bisect_right(keys, int(exp_val)))
+
+
+def rows() -> List[Tuple[str, int, int]]:
+    """(group_code, level, exp_total) for every group and level, as stored in exp_requirements."""
+    return [(code, lvl, c[lvl - 1]) for code, c in _CURVES.items() for lvl in range(1, MAX_LEVEL + 1)]
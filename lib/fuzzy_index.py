@@ -0,0 +1,355 @@
+"""
+Character n-gram index for fuzzy name lookup (species, moves, items, abilities, natures).
+
+Scoring a query with difflib.SequenceMatcher against every name costs a few
+milliseconds per lookup on the moves or pokedex lists. FuzzyIndex keeps an inverted
+index from character trigrams to names and scores only a short list:
+
+1. exact hit on the normalized query (names and aliases) -> (name, 1.0, [name])
+2. candidates = names containing the query (so prefix/substring matches are never
+   pruned) + the best `shortlist` names by trigram overlap (Dice). Trigrams are
+   padded at the ends like pg_trgm's, so short names with a typo still overlap.
+3. those are scored exactly as FuzzyMatcher.fuzzy_match / _fuzzy_best score them
+
+A query sharing no trigram with any name falls back to scoring every name, so there
+is always a best match, as with the full scan.
+
+Aliases (abbreviations such as "eq" -> "earthquake", or item names -> item ids) are
+extra keys that resolve to a name; results always list names, never alias keys.
+
+The bot's indexes are built from the pokedex/moves/items rows when the cache is
+warmed (build_indexes()) and kept in db_cache (get_fuzzy_index()). The abbreviation
+and regional-form alias tables used by FuzzyMatcher and parse_form_from_name live here.
+"""
+from __future__ import annotations
+
+import difflib
+import heapq
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+# (best, score, suggestions), as FuzzyMatcher returns it
+Match = Tuple[Optional[str], float, List[str]]
+
+# Common abbreviations for moves
+MOVE_ABBREVIATIONS = {
+    "eq": "earthquake",
+    "dclaw": "dragon-claw",
+    "stone": "stone-edge",
+    "sword": "swords-dance",
+    "rocks": "stealth-rock",
+    "twave": "thunder-wave",
+    "willowisp": "will-o-wisp",
+    "wow": "will-o-wisp",
+    "sr": "stealth-rock",
+    "hp": "hidden-power",
+    "sub": "substitute",
+    "protect": "protect",
+    "toxic": "toxic",
+    "roost": "roost",
+    "uturn": "u-turn",
+    "volt": "volt-switch",
+    "scald": "scald",
+    "knock": "knock-off",
+    "defog": "defog",
+    "rapid": "rapid-spin",
+    "spin": "rapid-spin",
+    "flamethrower": "flamethrower",
+    "fireblast": "fire-blast",
+    "icebeam": "ice-beam",
+    "thunderbolt": "thunderbolt",
+    "thunder": "thunder",
+    "psychic": "psychic",
+    "shadowball": "shadow-ball",
+    "energyball": "energy-ball",
+    "focusblast": "focus-blast",
+    "aurasphere": "aura-sphere",
+    "darkpulse": "dark-pulse",
+    "dragonpulse": "dragon-pulse",
+    "dracometeor": "draco-meteor",
+    "overheat": "overheat",
+    "closecombat": "close-combat",
+    "superpower": "superpower",
+    "ironhead": "iron-head",
+    "playrough": "play-rough",
+    "moonblast": "moonblast",
+    "gigadrain": "giga-drain",
+}
+
+# Common nature abbreviations
+NATURE_ABBREVIATIONS = {
+    "ada": "adamant",
+    "bold": "bold",
+    "brave": "brave",
+    "calm": "calm",
+    "care": "careful",
+    "hast": "hasty",
+    "imp": "impish",
+    "jol": "jolly",
+    "lax": "lax",
+    "lone": "lonely",
+    "mild": "mild",
+    "mod": "modest",
+    "naive": "naive",
+    "naugh": "naughty",
+    "quie": "quiet",
+    "rash": "rash",
+    "relax": "relaxed",
+    "sass": "sassy",
+    "seri": "serious",
+    "timi": "timid",
+}
+
+# Regional form words -> form key
+FORM_ALIASES = {
+    "alola": "alola", "alolan": "alola",
+    "galar": "galar", "galarian": "galar",
+    "hisui": "hisui", "hisuian": "hisui",
+    "paldea": "paldea", "paldean": "paldea",
+}
+
+# Index kind -> the table its names come from (for invalidation)
+FUZZY_KINDS = {
+    "species": "pokedex",
+    "species_canon": "pokedex",
+    "abilities": "pokedex",
+    "moves": "moves",
+    "items": "items",
+    "item_names": "items",
+}
+
+
+def normalize_name(text: Any) -> str:
+    """Lowercase, trimmed, spaces/underscores -> hyphens (FuzzyMatcher.normalize)."""
+    if not text:
+        return ""
+    return str(text).strip().lower().replace(" ", "-").replace("_", "-")
+
+
+def canon(s: str) -> str:
+    """lowercase and strip non-alphanumerics for fuzzy compare"""
+    return re.sub(r"[^a-z0-9]+", "", (s or "").lower())
+
+
+def species_key(text: Any) -> str:
+    """
+    normalize_name() with regional-form words rewritten to the pokedex spelling:
+    'alolan raichu' / 'raichu alolan' -> 'raichu-alola', 'paldean tauros aqua breed'
+    -> 'tauros-paldea-aqua-breed'.
+    """
+    toks = [t for t in re.split(r"[^a-z0-9]+", normalize_name(text)) if t]
+    idx = next((i for i, t in enumerate(toks) if t in FORM_ALIASES), None)
+    if idx is None:
+        return normalize_name(text)
+    region = FORM_ALIASES[toks[idx]]
+    if idx == 0:
+        toks = toks[1:] + [region]
+    else:
+        toks = toks[:idx] + [region] + toks[idx + 1:]
+    return "-".join(toks)
+
+
+def species_canon_key(text: Any) -> str:
+    return canon(species_key(text))
+
+
+def ngrams(text: str, n: int = 3, pad: bool = False) -> Set[str]:
+    """
+    Distinct character n-grams of text. Unpadded, empty if text is shorter than n;
+    padded ("  ab" + " "), every non-empty text has some.
+    """
+    if pad and text:
+        text = " " * (n - 1) + text + " "
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def similarity(query: str, key: str, bonus: bool = True) -> float:
+    """
+    SequenceMatcher ratio of two normalized strings. With bonus, a key starting with the
+    query scores at least 0.85 and one containing it at least 0.80 (FuzzyMatcher rules).
+    """
+    ratio = difflib.SequenceMatcher(a=query, b=key).ratio()
+    if bonus:
+        if key.startswith(query):
+            ratio = max(ratio, 0.85)
+        if query in key:
+            ratio = max(ratio, 0.80)
+    return ratio
+
+
+class FuzzyIndex:
+    """Read-only fuzzy index over a list of names; build once, query many times."""
+
+    __slots__ = ("normalize", "bonus", "n", "shortlist", "names", "_keys", "_targets",
+                 "_exact", "_postings", "_sizes")
+
+    def __init__(self, names: Iterable[str], normalize: Callable[[str], str], *,
+                 aliases: Optional[Mapping[str, str]] = None, bonus: bool = True,
+                 n: int = 3, shortlist: int = 64):
+        """
+        names: the values results are made of, in preference order (ties keep this order).
+        normalize: applied to names, aliases and queries alike.
+        aliases: alias -> name; aliases whose name isn't in names are ignored.
+        bonus: apply the prefix/contains bonuses of FuzzyMatcher.fuzzy_match.
+        """
+        self.normalize = normalize
+        self.bonus = bonus
+        self.n = n
+        self.shortlist = shortlist
+        self.names: List[str] = []
+        self._keys: List[str] = []      # normalized key per entry
+        self._targets: List[str] = []   # name each entry resolves to
+        self._exact: Dict[str, str] = {}
+        seen: Set[str] = set()
+        for name in names:
+            if not name or name in seen:
+                continue
+            seen.add(name)
+            self.names.append(name)
+            self._add(normalize(name), name)
+        for alias, name in (aliases or {}).items():
+            if name in seen:
+                self._add(normalize(alias), name)
+
+        self._postings: Dict[str, List[int]] = {}
+        self._sizes: List[int] = []
+        for i, key in enumerate(self._keys):
+            grams = ngrams(key, n, pad=True)
+            self._sizes.append(len(grams))
+            for g in grams:
+                self._postings.setdefault(g, []).append(i)
+
+    def _add(self, key: str, name: str) -> None:
+        if not key or key in self._exact:
+            return
+        self._exact[key] = name
+        self._keys.append(key)
+        self._targets.append(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._exact.get(self.normalize(name)) is not None
+
+    def exact(self, query: str) -> Optional[str]:
+        """Name whose normalized form (or an alias of it) equals the normalized query."""
+        return self._exact.get(self.normalize(query))
+
+    def candidates(self, query_norm: str) -> Optional[List[int]]:
+        """Entry positions worth scoring, in index order; None means score everything."""
+        grams = ngrams(query_norm, self.n, pad=True)
+        counts: Dict[int, int] = {}
+        for g in grams:
+            for i in self._postings.get(g, ()):
+                counts[i] = counts.get(i, 0) + 1
+        if not counts:
+            return None
+        # Keys containing the query hold all of its unpadded n-grams
+        inner = sorted((self._postings.get(g, ()) for g in ngrams(query_norm, self.n)), key=len)
+        if inner:
+            picked = set(inner[0]).intersection(*inner[1:])
+        else:
+            picked = {i for i, key in enumerate(self._keys) if query_norm in key}
+        q, sizes = len(grams), self._sizes
+        picked.update(heapq.nlargest(self.shortlist, counts, key=lambda i: counts[i] / (q + sizes[i])))
+        return sorted(picked)
+
+    def scored(self, query: str) -> List[Tuple[float, str]]:
+        """(score, name) for the candidate names, best first, one entry per name."""
+        q = self.normalize(query)
+        positions = self.candidates(q)
+        if positions is None:
+            positions = range(len(self._keys))
+        keys, targets, bonus = self._keys, self._targets, self.bonus
+        scored = [(similarity(q, keys[i], bonus), targets[i]) for i in positions]
+        # Stable: equal scores keep index (i.e. names) order, like a full scan would
+        scored.sort(key=lambda x: x[0], reverse=True)
+        seen: Set[str] = set()
+        out = []
+        for score, name in scored:
+            if name not in seen:
+                seen.add(name)
+                out.append((score, name))
+        return out
+
+    def match(self, query: str, threshold: float = 0.72, limit: int = 5) -> Match:
+        """(best, score, suggestions scoring >= threshold [:limit]); exact hits return (name, 1.0, [name])."""
+        if not self._keys:
+            return None, 0.0, []
+        hit = self.exact(query)
+        if hit is not None:
+            return hit, 1.0, [hit]
+        scored = self.scored(query)
+        best_score, best = scored[0]
+        return best, best_score, [c for s, c in scored if s >= threshold][:limit]
+
+
+def species_index(names: Iterable[str]) -> FuzzyIndex:
+    """Pokedex names, FuzzyMatcher scoring, regional-form words understood."""
+    return FuzzyIndex(names, species_key)
+
+
+def species_canon_index(names: Iterable[str]) -> FuzzyIndex:
+    """Pokedex names scored like _fuzzy_best (punctuation ignored, no bonuses)."""
+    return FuzzyIndex(names, species_canon_key, bonus=False)
+
+
+def move_index(names: Iterable[str]) -> FuzzyIndex:
+    """Move names plus MOVE_ABBREVIATIONS (only those naming an existing move)."""
+    return FuzzyIndex(names, normalize_name, aliases=MOVE_ABBREVIATIONS)
+
+
+def ability_index(names: Iterable[str]) -> FuzzyIndex:
+    return FuzzyIndex(names, normalize_name)
+
+
+def item_index(rows: Iterable[Mapping[str, Any]]) -> FuzzyIndex:
+    """Item ids, with item names as aliases: results are always ids."""
+    rows = [r for r in rows if r.get("id")]
+    return FuzzyIndex((str(r["id"]) for r in rows), normalize_name,
+                      aliases={str(r["name"]): str(r["id"]) for r in rows if r.get("name")})
+
+
+def item_name_index(rows: Iterable[Mapping[str, Any]]) -> FuzzyIndex:
+    """
+    Item ids with their display names as aliases, scored like _fuzzy_best: results are
+    ids, so items whose names canonicalize alike stay apart.
+    """
+    rows = [r for r in rows if r.get("id")]
+    return FuzzyIndex((str(r["id"]) for r in rows), canon, bonus=False,
+                      aliases={str(r["name"]): str(r["id"]) for r in rows if r.get("name")})
+
+
+@lru_cache(maxsize=1)
+def nature_index() -> FuzzyIndex:
+    """The 25 natures plus NATURE_ABBREVIATIONS (static, built once)."""
+    from .stats import NATURE_PLUS_MINUS
+    return FuzzyIndex(NATURE_PLUS_MINUS.keys(), normalize_name, aliases=NATURE_ABBREVIATIONS)
+
+
+def build_indexes(table: str, rows: Iterable[Mapping[str, Any]]) -> Dict[str, FuzzyIndex]:
+    """Every index kind (FUZZY_KINDS) derived from a full pokedex, moves or items dump."""
+    rows = list(rows)
+    names = [str(r["name"]) for r in rows if r.get("name")]
+    if table == "pokedex":
+        from .species_records import parse_abilities
+        abilities: Dict[str, None] = {}
+        for r in rows:
+            regs, hides = parse_abilities(r.get("abilities") or [])
+            for a in regs + hides:
+                abilities.setdefault(a, None)
+        return {
+            "species": species_index(names),
+            "species_canon": species_canon_index(names),
+            "abilities": ability_index(abilities),
+        }
+    if table == "moves":
+        return {"moves": move_index(names)}
+    if table == "items":
+        return {
+            "items": item_index(rows),
+            "item_names": item_name_index(rows),
+        }
+    return {}
@@ -0,0 +1,104 @@
+"""
+In-memory index over the cached learnsets table.
+
+The learnsets table has hundreds of thousands of rows, and the encounter and
+legality helpers only ever need one species at a time. LearnsetIndex groups the
+rows once, keyed by (species_id, generation, method), so a lookup costs
+O(moves for that species) instead of a scan of the whole table:
+
+- level-up entries are sorted by level, so "moves learned at or below level N"
+  is a bisect plus a slice
+- per-key move sets answer "can species X learn move Y by method Z" in O(1)
+- per-species rows serve callers that filter on several generations/methods
+  (legality, /pokeinfo learnset counts)
+
+Methods are normalized with strip().lower(). Rows with no species_id or move_id
+are skipped. Per-species rows are kept as positions into the table, so a columnar
+table (lib/columnar.py) only materializes row views for the species asked for.
+
+db_cache.get_learnset_index() builds the index when the learnsets table is
+cached and drops it when that table is invalidated or expires.
+"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+Key = Tuple[int, int, str]  # (species_id, generation, method)
+
+
+def _as_int(value: Any, default: Optional[int]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+class LearnsetIndex:
+    __slots__ = ("_rows", "_move_ids", "_move_sets", "_levelup", "_species_rows", "row_count")
+
+    def __init__(self, rows: Sequence[Mapping[str, Any]]):
+        move_ids: Dict[Key, List[int]] = {}
+        levelup: Dict[Tuple[int, int], List[Tuple[int, str, int]]] = {}
+        species_rows: Dict[int, array] = {}
+        count = 0
+        for pos, r in enumerate(rows):
+            species_id = _as_int(r.get("species_id"), None)
+            move_id = _as_int(r.get("move_id"), None)
+            if species_id is None or move_id is None:
+                continue
+            count += 1
+            gen = _as_int(r.get("generation"), 0) or 0
+            method = str(r.get("method") or "").strip().lower()
+            species_rows.setdefault(species_id, array("I")).append(pos)
+            move_ids.setdefault((species_id, gen, method), []).append(move_id)
+            if method == "level-up":
+                lv = _as_int(r.get("level_learned"), 0) or 0
+                levelup.setdefault((species_id, gen), []).append((lv, str(move_id), move_id))
+
+        # Distinct move ids per key, in table order
+        self._move_ids: Dict[Key, Tuple[int, ...]] = {k: tuple(dict.fromkeys(v)) for k, v in move_ids.items()}
+        self._move_sets: Dict[Key, FrozenSet[int]] = {k: frozenset(v) for k, v in self._move_ids.items()}
+        # Level-up entries sorted ascending by (level, str(move_id)), with the levels for bisect
+        self._levelup: Dict[Tuple[int, int], Tuple[List[int], List[int]]] = {}
+        for k, entries in levelup.items():
+            entries.sort()
+            self._levelup[k] = ([e[0] for e in entries], [e[2] for e in entries])
+        self._rows = rows
+        self._species_rows = species_rows
+        self.row_count = count
+
+    def move_ids(self, species_id: int, generation: int, methods: Iterable[str]) -> List[int]:
+        """Distinct move ids a species learns in one generation by any of the given methods."""
+        out: Dict[int, None] = {}
+        for method in methods:
+            for move_id in self._move_ids.get((int(species_id), int(generation), method), ()):
+                out[move_id] = None
+        return list(out)
+
+    def can_learn(self, species_id: int, move_id: int, generation: int, method: str) -> bool:
+        return int(move_id) in self._move_sets.get((int(species_id), int(generation), method), ())
+
+    def levelup_moves(self, species_id: int, generation: int, max_level: int) -> List[Tuple[int, int]]:
+        """
+        (level, move_id) for level-up moves learned at or below max_level, highest level
+        first (ties by move id string, descending).
+        """
+        entry = self._levelup.get((int(species_id), int(generation)))
+        if not entry:
+            return []
+        levels, move_ids = entry
+        end = bisect_right(levels, int(max_level))
+        return [(levels[i], move_ids[i]) for i in range(end - 1, -1, -1)]
+
+    def species_rows(self, species_id: int) -> Tuple[Mapping[str, Any], ...]:
+        """All learnset rows for one species (the table's own rows, table order)."""
+        positions = self._species_rows.get(int(species_id))
+        if positions is None:
+            return ()
+        rows = self._rows
+        return tuple(rows[i] for i in positions)
+
+    def __len__(self) -> int:
+        return self.row_count
@@ -19,14 +19,12 @@ def _legal_moves_from_cache(species_id: int, gen: int):
         from . import db_cache
     except ImportError:
         return []
-    learnsets = db_cache.get_cached_learnsets()
-    if not learnsets:
+    index = db_cache.get_learnset_index()
+    if index is None:
         return []
     seen: set[tuple[int, str, int]] = set()
     out = []
-    for ls in learnsets:
-        if ls.get("species_id") != species_id:
-            continue
+    for ls in index.species_rows(species_id):
         g = ls.get("generation")
         if g is None or int(g) > gen:
             continue
@@ -0,0 +1,184 @@
+"""
+Throwaway local PostgreSQL for offline tests and benchmarks.
+
+With DB_BACKEND=local, lib.db (and lib.db_adapter) start a private PostgreSQL
+cluster on 127.0.0.1 instead of using DATABASE_URL. Everything else works the
+same way because it is still the same pg_aiosqlite shim and the same
+schema_pg.sql: connect()/session()/execute, init_schema(), the caches. There is
+no cloud and no network.
+
+The server comes from the first of these that is available:
+- the `pgserver` package (pip install pgserver), which bundles the PostgreSQL
+  binaries, so no system install is needed
+- initdb/pg_ctl from PG_BIN, PATH, or /usr/lib/postgresql/*/bin. initdb does not
+  run as root; use a normal user or pgserver.
+
+DB_LOCAL_DIR keeps the data directory between runs, which makes reruns fast and
+keeps seeded data. Without it, a temp dir is created and deleted at exit. The
+cluster runs with fsync off. It is for benchmarks and tests, never for real data.
+
+Standalone:
+  python -m lib.pg_local [--dir PATH] [--no-schema]
+    Starts the server, applies the schema, prints the DSN and waits for Ctrl+C.
+    Other processes reuse it with DB_BACKEND=local DB_LOCAL_DSN=<printed dsn>.
+    To copy reference data from myuu.db into it:
+      DATABASE_URL=<printed dsn> python -m tools.sync_local_to_cloud --tables pokedex,pokedex_forms
+"""
+from __future__ import annotations
+
+import atexit
+import glob
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+_dsn: Optional[str] = None
+_stop = None  # callable that shuts the server down
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _pg_bin() -> Optional[Path]:
+    """Directory holding initdb/pg_ctl, or None."""
+    env = os.getenv("PG_BIN")
+    if env and (Path(env) / "initdb").exists():
+        return Path(env)
+    found = shutil.which("initdb")
+    if found:
+        return Path(found).parent
+    candidates = sorted(glob.glob("/usr/lib/postgresql/*/bin/initdb"), reverse=True)
+    return Path(candidates[0]).parent if candidates else None
+
+
+def _start_pgserver(data_dir: Path) -> Optional[str]:
+    try:
+        import pgserver  # type: ignore
+    except ImportError:
+        return None
+    global _stop
+    srv = pgserver.get_server(str(data_dir))
+    _stop = srv.cleanup
+    return srv.get_uri()
+
+
+def _start_binaries(data_dir: Path) -> Optional[str]:
+    bindir = _pg_bin()
+    if bindir is None:
+        return None
+    global _stop
+    if not (data_dir / "PG_VERSION").exists():
+        subprocess.run(
+            [str(bindir / "initdb"), "-D", str(data_dir), "-U", "postgres", "-A", "trust", "-E", "UTF8", "--no-sync"],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+    port = _free_port()
+    opts = (
+        f"-p {port} -k {data_dir} -c listen_addresses=127.0.0.1 "
+        "-c fsync=off -c synchronous_commit=off -c full_page_writes=off"
+    )
+    subprocess.run(
+        [str(bindir / "pg_ctl"), "-D", str(data_dir), "-o", opts, "-l", str(data_dir / "server.log"), "-w", "start"],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+    def _shutdown() -> None:
+        subprocess.run(
+            [str(bindir / "pg_ctl"), "-D", str(data_dir), "-m", "fast", "-w", "stop"],
+            check=False,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    _stop = _shutdown
+    return f"postgresql://postgres@127.0.0.1:{port}/postgres"
+
+
+def start(data_dir: Optional[str] = None) -> str:
+    """
+    Start (once per process) a local PostgreSQL and return its DSN. Stopped at exit.
+    If DB_LOCAL_DSN is set (by a parent process or `python -m lib.pg_local`), that server is reused.
+    """
+    global _dsn
+    if _dsn is not None:
+        return _dsn
+    running = os.getenv("DB_LOCAL_DSN")
+    if running:
+        _dsn = running
+        return running
+    keep = data_dir or os.getenv("DB_LOCAL_DIR")
+    path = Path(keep) if keep else Path(tempfile.mkdtemp(prefix="myuu-pg-"))
+    path.mkdir(parents=True, exist_ok=True)
+
+    dsn = _start_pgserver(path) or _start_binaries(path)
+    if dsn is None:
+        raise RuntimeError(
+            "DB_BACKEND=local needs a PostgreSQL server: pip install pgserver, "
+            "or install PostgreSQL (initdb/pg_ctl on PATH or in PG_BIN)."
+        )
+    print(f"[pg_local] PostgreSQL running at {dsn} (data: {path})")
+
+    def _cleanup() -> None:
+        if _stop is not None:
+            try:
+                _stop()
+            except Exception:
+                pass
+        if not keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+    atexit.register(_cleanup)
+    _dsn = dsn
+    os.environ["DB_LOCAL_DSN"] = dsn
+    return dsn
+
+
+def configure_backend() -> Optional[str]:
+    """
+    Apply DB_BACKEND: for "local", start the local server and point DATABASE_URL at it
+    (a replica URL from .env is dropped too). Returns the local DSN, or None for "postgres".
+    """
+    backend = os.getenv("DB_BACKEND", "postgres").strip().lower()
+    if backend != "local":
+        return None
+    dsn = start()
+    os.environ["DATABASE_URL"] = dsn
+    os.environ.pop("DATABASE_REPLICA_URL", None)
+    os.environ.pop("POSTGRES_REPLICA_DSN", None)
+    return dsn
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import time
+
+    ap = argparse.ArgumentParser(description="Run a throwaway local PostgreSQL with the bot schema.")
+    ap.add_argument("--dir", help="Data directory to keep between runs (default: temp dir, deleted on exit)")
+    ap.add_argument("--no-schema", action="store_true", help="Do not apply db/schema_pg.sql")
+    args = ap.parse_args()
+
+    if args.dir:
+        os.environ["DB_LOCAL_DIR"] = args.dir
+    os.environ["DB_BACKEND"] = "local"
+    local_dsn = configure_backend()
+    if not args.no_schema:
+        from lib import db
+
+        asyncio.run(db.init_schema())
+        print("[pg_local] Schema applied.")
+    print(local_dsn)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
@@ -79,22 +79,22 @@ async def ensure_move(session: aiohttp.ClientSession, key: str | int) -> int:
         },
     }
     # upsert move
-    conn = await db.connect()
-    await conn.execute("""
-        INSERT INTO moves (id,name,introduced_in,type,power,accuracy,pp,damage_class,meta)
-        VALUES (?,?,?,?,?,?,?,?,json(?))
-        ON CONFLICT(id) DO UPDATE SET
-          name=excluded.name,
-          introduced_in=excluded.introduced_in,
-          type=excluded.type,
-          power=excluded.power,
-          accuracy=excluded.accuracy,
-          pp=excluded.pp,
-          damage_class=excluded.damage_class,
-          meta=excluded.meta
-    """, (row["id"], row["name"], row["introduced_in"], row["type"], row["power"],
-          row["accuracy"], row["pp"], row["damage_class"], db.json.dumps(row["meta"]) if hasattr(db, "json") else __import__("json").dumps(row["meta"])))
-    await conn.commit()
+    async with db.session() as conn:
+        await conn.execute("""
+            INSERT INTO moves (id,name,introduced_in,type,power,accuracy,pp,damage_class,meta)
+            VALUES (?,?,?,?,?,?,?,?,json(?))
+            ON CONFLICT(id) DO UPDATE SET
+              name=excluded.name,
+              introduced_in=excluded.introduced_in,
+              type=excluded.type,
+              power=excluded.power,
+              accuracy=excluded.accuracy,
+              pp=excluded.pp,
+              damage_class=excluded.damage_class,
+              meta=excluded.meta
+        """, (row["id"], row["name"], row["introduced_in"], row["type"], row["power"],
+              row["accuracy"], row["pp"], row["damage_class"], db.json.dumps(row["meta"]) if hasattr(db, "json") else __import__("json").dumps(row["meta"])))
+        await conn.commit()
     if db_cache is not None:
         try:
             db_cache.invalidate_move(row["name"])
@@ -222,8 +222,8 @@ async def ensure_species_and_learnsets(key: str | int) -> dict[str, Any]:
         # store species
         await db.upsert_pokedex(species_entry)
 
-        # store learnsets (per generation)
-        conn = await db.connect()
+        # store learnsets (per generation): collect rows, then one bulk COPY + merge
+        learnset_rows: dict[tuple, tuple] = {}
         for mv in p.get("moves", []):
             move_name = mv["move"]["name"].lower()
             # ensure move row (with metadata)
@@ -236,11 +236,24 @@ async def ensure_species_and_learnsets(key: str | int) -> dict[str, Any]:
                     continue
                 method = d["move_learn_method"]["name"]   # level-up, machine, tutor, egg
                 lvl = d.get("level_learned_at") or None
-                await conn.execute("""
-                   INSERT OR IGNORE INTO learnsets (species_id, form_name, move_id, generation, method, level_learned)
-                   VALUES (?, '', ?, ?, ?, ?)""", (p["id"], mid, gen, method, lvl))
+                # first (species, form, move, gen, method) wins, as with INSERT OR IGNORE
+                learnset_rows.setdefault((mid, gen, method), (p["id"], "", mid, gen, method, lvl))
 
-        await conn.commit()
+        async with db.session() as conn:
+            rows = list(learnset_rows.values())
+            copy_upsert = getattr(conn, "copy_upsert", None)
+            if copy_upsert is not None:
+                await copy_upsert(
+                    "learnsets",
+                    ("species_id", "form_name", "move_id", "generation", "method", "level_learned"),
+                    rows,
+                    conflict_columns=("species_id", "form_name", "move_id", "generation", "method"),
+                )
+            else:
+                await conn.executemany("""
+                   INSERT OR IGNORE INTO learnsets (species_id, form_name, move_id, generation, method, level_learned)
+                   VALUES (?, ?, ?, ?, ?, ?)""", rows)
+            await conn.commit()
         if db_cache is not None:
             try:
                 db_cache.invalidate_cached_table("learnsets")
@@ -318,15 +331,15 @@ async def ensure_item_cached(name_or_id: str) -> dict:
     # Optional: store extra fields if your schema has them
     # (category/price/description). Safe to ignore if columns exist already.
     try:
-        conn = await db.connect()
-        await conn.execute("""
-            UPDATE items
-               SET category   = COALESCE(?, category),
-                   price      = COALESCE(?, price),
-                   description= COALESCE(?, description)
-             WHERE id = ?
-        """, (category, price, description, item_id))
-        await conn.commit()
+        async with db.session() as conn:
+            await conn.execute("""
+                UPDATE items
+                   SET category   = COALESCE(?, category),
+                       price      = COALESCE(?, price),
+                       description= COALESCE(?, description)
+                 WHERE id = ?
+            """, (category, price, description, item_id))
+            await conn.commit()
     except Exception:
         pass
 
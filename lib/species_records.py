@@ -0,0 +1,258 @@
+"""
+Pre-parsed species records for the pokedex cache.
+
+Pokedex rows keep types, stats, abilities, gender_ratio, ev_yield and evolution as
+JSON (text on some backends, decoded values on others), with stat keys in several
+spellings. SpeciesRecord holds those fields parsed and normalized once, so wild
+encounters, trainer teams, EV awards and /pokeinfo don't re-parse them per call.
+
+Records are frozen; their mappings are read-only views. Copy them (dict(...)) before
+handing them to code that may modify its arguments.
+
+The parsing helpers here (parse_abilities, extract_types, normalize_base_stats,
+gender_ratio_from_row, parse_evolution) are the ones the bot uses for raw rows too.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+STAT_KEYS_LONG = ("hp", "attack", "defense", "special_attack", "special_defense", "speed")
+# Short keys used by build_mon (pvp/engine)
+STAT_KEYS_SHORT = ("hp", "atk", "defn", "spa", "spd", "spe")
+
+# Any stat key spelling (lowercased, "-"/" " -> "_") -> short key
+_SHORT_KEY = {
+    "hp": "hp",
+    "attack": "atk", "atk": "atk",
+    "defense": "defn", "def": "defn", "defn": "defn",
+    "special_attack": "spa", "sp_attack": "spa", "spatk": "spa", "spa": "spa",
+    "special_defense": "spd", "sp_defense": "spd", "spdef": "spd", "spd": "spd",
+    "speed": "spe", "spe": "spe",
+}
+
+
+def _json(value: Any, default: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except Exception:
+            return default
+    return value if value is not None else default
+
+
+def normalize_type_id(value: Any) -> str | None:
+    if value is None:
+        return None
+    s = str(value).strip().lower()
+    s = s.replace("type", "").replace("_", "-").replace(" ", "-")
+    return s or None
+
+
+def extract_types(entry: Mapping[str, Any]) -> list[str]:
+    """Distinct normalized type ids of a pokedex row, in order."""
+    raw = entry.get("types")
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except Exception:
+            raw = [raw]
+    if raw is None:
+        return []
+    types: list[str] = []
+    for item in raw:
+        norm = normalize_type_id(item)
+        if norm and norm not in types:
+            types.append(norm)
+    return types
+
+
+def normalize_base_stats(stats: Any) -> dict:
+    """
+    Convert DB stats into underscore long-form keys required by generate_mon():
+    {hp, attack, defense, special_attack, special_defense, speed}
+    Supports short keys {atk, def, spa, spd, spe} or hyphen keys.
+    """
+    if not isinstance(stats, dict):
+        return {}
+    lk = {str(k).lower().replace("-", "_"): v for k, v in stats.items()}
+    return {
+        "hp": lk.get("hp", 0),
+        "attack": lk.get("attack", lk.get("atk", 0)),
+        "defense": lk.get("defense", lk.get("def", 0)),
+        "special_attack": lk.get("special_attack", lk.get("spa", lk.get("specialattack", 0))),
+        "special_defense": lk.get("special_defense", lk.get("spd", lk.get("specialdefense", 0))),
+        "speed": lk.get("speed", lk.get("spe", 0)),
+    }
+
+
+def parse_abilities(abilities_raw) -> tuple[list[str], list[str]]:
+    """
+    Normalizes ability data from your DB (strings, dicts, or JSON string) into:
+        (regular_ability_names, hidden_ability_names)
+    Accepts formats like:
+      - ["overgrow","chlorophyll"]
+      - [{"name":"overgrow"},{"name":"chlorophyll","is_hidden":true}]
+      - [{"ability":{"name":"overgrow"},"slot":1},{"ability":{"name":"chlorophyll"},"slot":3}]
+    """
+    # if JSON text, parse first
+    if isinstance(abilities_raw, str):
+        try:
+            abilities_raw = json.loads(abilities_raw)
+        except Exception:
+            abilities_raw = []
+    regs, hides = [], []
+    for a in (abilities_raw or []):
+        if isinstance(a, str):
+            regs.append(a)
+            continue
+        if isinstance(a, dict):
+            name = a.get("name") or (a.get("ability") or {}).get("name") or ""
+            is_hidden = bool(a.get("is_hidden") or a.get("hidden") or (a.get("slot") == 3))
+            if name:
+                (hides if is_hidden else regs).append(name)
+    # de-dup while preserving order
+    def _dedup(seq: list[str]) -> list[str]:
+        seen = set(); out = []
+        for s in seq:
+            k = s.lower()
+            if k not in seen:
+                seen.add(k); out.append(s)
+        return out
+    return _dedup(regs), _dedup(hides)
+
+
+def gender_ratio_from_row(entry: Optional[Mapping[str, Any]]) -> dict:
+    """Gender ratio from a pokedex row (gender_ratio, else gender_rate in eighths); 50/50 if neither."""
+    gender_ratio = _json(entry.get("gender_ratio"), None) if entry else None
+    if not gender_ratio or not isinstance(gender_ratio, dict):
+        gr = entry.get("gender_rate") if entry else None
+        if isinstance(gr, str):
+            try:
+                gr = json.loads(gr)
+            except Exception:
+                gr = None
+        if isinstance(gr, int):
+            if gr == -1:
+                gender_ratio = {"genderless": True}
+            else:
+                female = gr * 12.5
+                gender_ratio = {"male": 100 - female, "female": female}
+    if not gender_ratio or not isinstance(gender_ratio, dict):
+        gender_ratio = {"male": 50, "female": 50}
+    return gender_ratio
+
+
+def ev_yield_from_raw(raw: Any) -> dict:
+    """EV yield as short keys (hp, atk, defn, spa, spd, spe), all ints >= 0."""
+    raw = _json(raw, {})
+    out = {k: 0 for k in STAT_KEYS_SHORT}
+    if not isinstance(raw, dict):
+        return out
+    for k, v in raw.items():
+        short = _SHORT_KEY.get(str(k).strip().lower().replace("-", "_").replace(" ", "_"))
+        if short is None:
+            continue
+        try:
+            out[short] = max(0, int(v or 0))
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+def parse_evolution(evolution: Any) -> dict:
+    """Parse pokedex.evolution (JSONB or string) into a dict with 'next' list."""
+    if evolution is None:
+        return {}
+    if isinstance(evolution, dict):
+        return evolution
+    if isinstance(evolution, str):
+        try:
+            return json.loads(evolution)
+        except Exception:
+            return {}
+    return {}
+
+
+def evolution_list(evolution: Any) -> Tuple[Mapping[str, Any], ...]:
+    """
+    evolution.next as ({"species", "details"}, ...), species lowercased with hyphens.
+    details is None for an entry given as a bare species name (no conditions).
+    """
+    evo = parse_evolution(evolution)
+    raw_next = evo.get("next") if isinstance(evo, dict) else None
+    if raw_next is None:
+        return ()
+    out = []
+    for n in raw_next if isinstance(raw_next, list) else [raw_next]:
+        if isinstance(n, str):
+            name = n.strip().lower().replace(" ", "-")
+            if name:
+                out.append(MappingProxyType({"species": name, "details": None}))
+        elif isinstance(n, dict):
+            name = str(n.get("species") or "").strip().lower().replace(" ", "-")
+            details = n.get("details") if isinstance(n.get("details"), dict) else {}
+            if name:
+                out.append(MappingProxyType({"species": name, "details": MappingProxyType(dict(details))}))
+    return tuple(out)
+
+
+@dataclass(frozen=True, slots=True)
+class SpeciesRecord:
+    """One pokedex row, parsed. row is the original row for any other column."""
+
+    id: Optional[int]
+    name: str
+    types: Tuple[str, ...]
+    base_stats: Mapping[str, Any]        # long keys, as generate_mon()/calc_all_stats() take them
+    base_stats_short: Mapping[str, Any]  # hp, atk, defn, spa, spd, spe (build_mon "base")
+    abilities: Tuple[Tuple[str, bool], ...]  # (name, is_hidden), regular ones first
+    gender_ratio: Mapping[str, Any]
+    ev_yield: Mapping[str, int]          # short keys
+    evolution: Tuple[Mapping[str, Any], ...]
+    weight_kg: float
+    base_happiness: int
+    row: Mapping[str, Any]
+
+    @property
+    def regular_abilities(self) -> List[str]:
+        return [name for name, hidden in self.abilities if not hidden]
+
+    @property
+    def hidden_abilities(self) -> List[str]:
+        return [name for name, hidden in self.abilities if hidden]
+
+    def abilities_for_generator(self) -> List[Dict[str, Any]]:
+        """[{"name", "is_hidden"}, ...] as generate_mon()/choose_ability() expect."""
+        return [{"name": name, "is_hidden": hidden} for name, hidden in self.abilities]
+
+    def types_tuple(self) -> Tuple[str, Optional[str]]:
+        """(primary, secondary or None), title-cased as build_mon expects; Normal if untyped."""
+        return (self.types[0].title() if self.types else "Normal",
+                self.types[1].title() if len(self.types) > 1 else None)
+
+
+def from_row(row: Mapping[str, Any]) -> SpeciesRecord:
+    """Build the record for one pokedex row (dict, Record or columnar row)."""
+    base_long = normalize_base_stats(_json(row.get("stats"), {}) or {})
+    regs, hides = parse_abilities(row.get("abilities") or [])
+    try:
+        species_id = int(row["id"]) if row.get("id") is not None else None
+    except (TypeError, ValueError):
+        species_id = None
+    return SpeciesRecord(
+        id=species_id,
+        name=str(row.get("name") or ""),
+        types=tuple(extract_types(row)),
+        base_stats=MappingProxyType(base_long),
+        base_stats_short=MappingProxyType(dict(zip(STAT_KEYS_SHORT, (base_long.get(k, 0) for k in STAT_KEYS_LONG)))),
+        abilities=tuple((n, False) for n in regs) + tuple((n, True) for n in hides),
+        gender_ratio=MappingProxyType(gender_ratio_from_row(row)),
+        ev_yield=MappingProxyType(ev_yield_from_raw(row.get("ev_yield"))),
+        evolution=evolution_list(row.get("evolution")),
+        weight_kg=float(row.get("weight_kg") or 100.0),
+        base_happiness=int(row.get("base_happiness") or 70),
+        row=row,
+    )
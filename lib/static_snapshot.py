@@ -0,0 +1,170 @@
+"""
+On-disk snapshot of the static game tables for fast warm starts.
+
+warm_cache writes the tables it loaded (pokedex, moves, items, learnsets,
+pokedex_forms, ...) to one binary file. On the next boot it memory-maps that file
+and takes every table whose version still matches the database from the file.
+Only changed tables are fetched again.
+
+Version of a table = "<config marker>|<ins>.<upd>.<del>":
+- config marker: config["static_version:<table>"], else config["static_data_version"].
+  Bump either one (any new value) to force a refetch, e.g. after an ingest run.
+- ins/upd/del: the primary's pg_stat_user_tables write counters for that table.
+  Any write changes them, including writes from tools that don't bump a marker.
+If neither source is available, the version is "" and the snapshot is not trusted
+for that table.
+
+File layout: MAGIC, u32 index length, JSON index {"format", "created", "tables":
+{name: {"version", "offset", "length", "rows"}}}, then one pickled
+(columns, row tuples) blob per table. The file is written by this process to a
+local path (CACHE_SNAPSHOT_PATH) and replaced atomically. A missing, corrupt or
+old-format file is ignored.
+
+Env:
+  CACHE_SNAPSHOT=0        disable (always fetch everything)
+  CACHE_SNAPSHOT_PATH     file location (default .cache/static_snapshot.bin)
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MAGIC = b"MYUUSNP1"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<I")
+
+ENABLED = os.getenv("CACHE_SNAPSHOT", "1").lower() not in ("0", "false", "no")
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / ".cache" / "static_snapshot.bin"
+
+
+def snapshot_path() -> Path:
+    return Path(os.getenv("CACHE_SNAPSHOT_PATH") or DEFAULT_PATH)
+
+
+class Snapshot:
+    """A memory-mapped snapshot file. Tables are unpickled on demand by load()."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._mm[:len(MAGIC)] != MAGIC:
+                raise ValueError("not a snapshot file")
+            start = len(MAGIC)
+            (index_len,) = _HEADER.unpack_from(self._mm, start)
+            start += _HEADER.size
+            index = json.loads(bytes(self._mm[start:start + index_len]))
+            if index.get("format") != FORMAT_VERSION:
+                raise ValueError(f"snapshot format {index.get('format')} != {FORMAT_VERSION}")
+        except Exception:
+            self.close()
+            raise
+        self._data_start = start + index_len
+        self.created = index.get("created")
+        self.tables: Dict[str, Dict[str, Any]] = index.get("tables") or {}
+
+    def version(self, name: str) -> Optional[str]:
+        entry = self.tables.get(name)
+        return entry.get("version") if entry else None
+
+    def load(self, name: str) -> List[Dict[str, Any]]:
+        entry = self.tables[name]
+        offset = self._data_start + int(entry["offset"])
+        with memoryview(self._mm)[offset:offset + int(entry["length"])] as blob:
+            columns, rows = pickle.loads(blob)
+        return [dict(zip(columns, r)) for r in rows]
+
+    def close(self) -> None:
+        mm = getattr(self, "_mm", None)
+        if mm is not None:
+            mm.close()
+        self._file.close()
+
+
+def open_snapshot(path: Optional[Path] = None) -> Optional[Snapshot]:
+    """The current snapshot, or None if disabled, missing or unreadable."""
+    if not ENABLED:
+        return None
+    path = path or snapshot_path()
+    if not path.exists():
+        return None
+    try:
+        return Snapshot(path)
+    except Exception as e:
+        print(f"[static_snapshot] ignoring unreadable snapshot {path}: {e}")
+        return None
+
+
+def _encode(rows: List[Dict[str, Any]]) -> bytes:
+    columns: Tuple[str, ...] = tuple(rows[0].keys()) if rows else ()
+    packed = [tuple(r.get(c) for c in columns) for r in rows]
+    return pickle.dumps((columns, packed), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def write_snapshot(tables: Dict[str, Tuple[str, List[Dict[str, Any]]]], path: Optional[Path] = None) -> int:
+    """
+    Write {name: (version, rows)} to the snapshot file (atomic replace). Tables with an
+    empty version or no rows are left out. Returns the file size in bytes. Blocking: call
+    via asyncio.to_thread from async code.
+    """
+    path = path or snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    blobs: List[bytes] = []
+    index: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    for name, (version, rows) in tables.items():
+        if not version or not rows:
+            continue
+        blob = _encode(rows)
+        index[name] = {"version": version, "offset": offset, "length": len(blob), "rows": len(rows)}
+        blobs.append(blob)
+        offset += len(blob)
+    header = json.dumps({"format": FORMAT_VERSION, "created": time.time(), "tables": index}).encode()
+    fd, tmp = tempfile.mkstemp(prefix=path.name, dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(_HEADER.pack(len(header)))
+            f.write(header)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return len(MAGIC) + _HEADER.size + len(header) + offset
+
+
+async def table_versions(conn, tables: Iterable[str], config: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Current version string per table (see module docstring); "" when unknown."""
+    tables = list(tables)
+    config = config or {}
+    counters: Dict[str, str] = {}
+    try:
+        cur = await conn.execute(
+            "SELECT relname, n_tup_ins, n_tup_upd, n_tup_del FROM pg_stat_user_tables "
+            "WHERE schemaname = current_schema() AND relname = ANY(?)",
+            (tables,),
+        )
+        for r in await cur.fetchall():
+            counters[str(r["relname"])] = f"{r['n_tup_ins']}.{r['n_tup_upd']}.{r['n_tup_del']}"
+        await cur.close()
+    except Exception as e:
+        print(f"[static_snapshot] pg_stat_user_tables unavailable, using config markers only: {e}")
+    out: Dict[str, str] = {}
+    for t in tables:
+        marker = config.get(f"static_version:{t}") or config.get("static_data_version") or ""
+        stat = counters.get(t, "")
+        out[t] = f"{marker}|{stat}" if (marker or stat) else ""
+    return out
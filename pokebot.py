@@ -52,14 +52,24 @@ except ImportError:
 from lib.poke_ingest import ensure_species_and_learnsets
 from pvp.panel import _base_pp, _max_pp
 from lib.stats import generate_mon, calc_all_stats
+from lib import exp_curves
+from lib import autocomplete, fuzzy_index, species_records
+from lib.fuzzy_index import FORM_ALIASES as _FORM_ALIASES, canon as _canon
+from lib.species_records import (
+    extract_types as _extract_species_types,
+    normalize_base_stats as _normalize_stats_for_generator,
+    normalize_type_id as _normalize_type_id,
+    parse_abilities,
+)
 from lib.team_import import parse_showdown_team, get_preset_team_names, get_preset_team, ParsedPokemon
 from lib.legality import legal_moves, species_allowed
 from lib.rules import rules_for
 import lib.rules as _rules
 try:
-    from tools.cache_everything import warm_cache, STATIC_TABLES
+    from tools.cache_everything import warm_cache, refresh_loop as cache_refresh_loop, STATIC_TABLES
 except ImportError:
     warm_cache = None
+    cache_refresh_loop = None
     STATIC_TABLES = []
 
 # Warm up renderer once to avoid first-GIF stall (no-op if renderer missing)
@@ -126,31 +136,6 @@ VALID_TERA_TYPES: tuple[str, ...] = (
 )
 
 
-def _normalize_type_id(value: Any) -> str | None:
-    if value is None:
-        return None
-    s = str(value).strip().lower()
-    s = s.replace("type", "").replace("_", "-").replace(" ", "-")
-    return s or None
-
-
-def _extract_species_types(entry: Mapping[str, Any]) -> list[str]:
-    raw = entry.get("types")
-    if isinstance(raw, str):
-        try:
-            raw = json.loads(raw)
-        except Exception:
-            raw = [raw]
-    if raw is None:
-        return []
-    types: list[str] = []
-    for item in raw:
-        norm = _normalize_type_id(item)
-        if norm and norm not in types:
-            types.append(norm)
-    return types
-
-
 def _roll_default_tera_type(types: Sequence[str]) -> str | None:
     if not types:
         return None
@@ -481,42 +466,43 @@ async def _import_all_items_from_pokeapi() -> tuple[int, int]:
             return 0, 0
 
         changed = 0
-        async with db.session() as conn:
-            # Gentle on the API: fetch details sequentially (still fast enough), or batch if you want
-            for idx, entry in enumerate(results, start=1):
-                try:
-                    detail = await _fetch_json(session, entry["url"])
-                except Exception as e:
-                    print(f"[items] skip {entry.get('name')} (fetch error: {e})")
-                    continue
+        with db.background():
+            async with db.session() as conn:
+                # Gentle on the API: fetch details sequentially (still fast enough), or batch if you want
+                for idx, entry in enumerate(results, start=1):
+                    try:
+                        detail = await _fetch_json(session, entry["url"])
+                    except Exception as e:
+                        print(f"[items] skip {entry.get('name')} (fetch error: {e})")
+                        continue
 
-                pid = _canon_item_id(detail["name"])
-                pretty_name = await _item_english_name(detail)
-                icon_url = (detail.get("sprites") or {}).get("default") or None
-                category = (detail.get("category") or {}).get("name")
-                if category:
-                    category = category.replace("-", "_")
-                desc = _item_english_desc(detail)
-                price = detail.get("cost")
-                sell_price = price // 2 if isinstance(price, int) else None  # simple default
-
-                await _upsert_item_row(
-                    conn,
-                    item_id=pid,
-                    name=pretty_name,
-                    icon_url=icon_url,
-                    category=category,
-                    description=desc,
-                    price=price if isinstance(price, int) else None,
-                    sell_price=sell_price
-                )
-                changed += 1
+                    pid = _canon_item_id(detail["name"])
+                    pretty_name = await _item_english_name(detail)
+                    icon_url = (detail.get("sprites") or {}).get("default") or None
+                    category = (detail.get("category") or {}).get("name")
+                    if category:
+                        category = category.replace("-", "_")
+                    desc = _item_english_desc(detail)
+                    price = detail.get("cost")
+                    sell_price = price // 2 if isinstance(price, int) else None  # simple default
+
+                    await _upsert_item_row(
+                        conn,
+                        item_id=pid,
+                        name=pretty_name,
+                        icon_url=icon_url,
+                        category=category,
+                        description=desc,
+                        price=price if isinstance(price, int) else None,
+                        sell_price=sell_price
+                    )
+                    changed += 1
 
-                # optional: tiny sleep to be nice to PokeAPI
-                await asyncio.sleep(0.01)
+                    # optional: tiny sleep to be nice to PokeAPI
+                    await asyncio.sleep(0.01)
 
-            await conn.commit()
-            return changed, total
+                await conn.commit()
+                return changed, total
 
 @bot.tree.command(name="import_items", description="(DB Admin) Cache all PokeAPI items into the database.")
 @admin_only()
@@ -844,19 +830,18 @@ async def _pg_pokemons_column_flags(conn) -> dict:
     return flags
 
 async def _tx_begin(conn) -> None:
-    await conn.execute("BEGIN")
+    begin = getattr(conn, "begin", None)
+    if begin is not None:
+        await begin()
+    else:
+        await conn.execute("BEGIN")
 
 async def _tx_commit(conn) -> None:
-    if getattr(db, "DB_IS_POSTGRES", False):
-        await conn.execute("COMMIT")
-    else:
-        await conn.commit()
+    # pg_aiosqlite commit()/rollback() honour both begin() and a manual "BEGIN"
+    await conn.commit()
 
 async def _tx_rollback(conn) -> None:
-    if getattr(db, "DB_IS_POSTGRES", False):
-        await conn.execute("ROLLBACK")
-    else:
-        await conn.rollback()
+    await conn.rollback()
 
 async def _wipe_user(conn, uid: str) -> dict:
     """
@@ -1020,7 +1005,10 @@ async def db_pool_stats(interaction: discord.Interaction):
     await interaction.response.defer(ephemeral=False)
     
     try:
-        from pvp.db_pool import get_pool_stats
+        try:
+            from pvp.db_pool import get_pool_stats
+        except ImportError:
+            from lib.pg_aiosqlite import get_pool_stats
         stats = get_pool_stats()
         
         embed = discord.Embed(
@@ -1055,7 +1043,134 @@ async def db_pool_stats(interaction: discord.Interaction):
                 value="Potential connection leak detected! Total connections exceed pool size.",
                 inline=False
             )
-        
+
+        if "target_size" in stats:
+            embed.add_field(
+                name="Admission Control",
+                value=(
+                    f"Admitted size: {stats['target_size']} ({'adaptive' if stats['adaptive'] else 'fixed'}; "
+                    f"grew {stats['grow']}× · shrank {stats['shrink']}×)\n"
+                    f"Interactive: {stats['interactive_in_use']} in use · {stats['waiting_interactive']} waiting\n"
+                    f"Background: {stats['background_in_use']}/{stats['background_cap']} in use · {stats['waiting_background']} waiting"
+                ),
+                inline=False
+            )
+
+        rep = stats.get("replica")
+        if rep and rep.get("configured"):
+            embed.add_field(
+                name="Read Replica" + (" (⚠️ down, using primary)" if rep.get("down") else ""),
+                value=(
+                    f"Reads: {rep['replica_reads']} replica · {rep['primary_reads']} primary "
+                    f"({rep['forced_primary']} forced) · Fallbacks: {rep['fallbacks']}\n"
+                    f"Pool: {rep.get('in_use_connections', 0)}/{rep.get('pool_size', 0)} in use"
+                ),
+                inline=False
+            )
+
+        try:
+            from lib.pg_aiosqlite import get_sql_cache_stats
+            sq = get_sql_cache_stats()
+            embed.add_field(
+                name="SQL Translation Cache",
+                value=(
+                    f"Hit rate: {sq['hit_rate_pct']}% ({sq['hits']}/{sq['hits'] + sq['misses']})\n"
+                    f"Entries: {sq['size']}/{sq['max_size']} · Evictions: {sq['evictions']}\n"
+                    f"CPU saved: ~{sq['cpu_saved_ms']} ms\n"
+                    f"Prepared: {sq['prepared_promotions']} promoted · {sq['prepared_hits']} hits"
+                ),
+                inline=False
+            )
+        except Exception:
+            pass
+
+        if db_cache is not None:
+            try:
+                caches = db_cache.get_cache_stats()["caches"]
+                lines = []
+                for name, c in caches.items():
+                    if not (c["entries"] or c["hits"] or c["misses"]):
+                        continue
+                    cap = f"/{c['max_entries']}" if c["max_entries"] else ""
+                    lines.append(
+                        f"`{name}` {c['entries']}{cap} · {c['hit_rate_pct']}% hit · "
+                        f"{c['evictions']} evicted · {c['expirations']} expired"
+                    )
+                for name, f in db_cache.get_cache_stats()["single_flight"].items():
+                    if f["loads"] or f["coalesced"]:
+                        lines.append(f"`{name}` loads: {f['loads']} · coalesced: {f['coalesced']}")
+                mem = db_cache.get_cache_stats()["table_memory"]
+                if mem:
+                    before = sum(m["dict_bytes"] for m in mem.values())
+                    after = sum(m["columnar_bytes"] for m in mem.values())
+                    lines.append(f"static tables: {before // 1024} KiB as dicts → {after // 1024} KiB columnar")
+                if lines:
+                    embed.add_field(name="Data Cache (db_cache)", value="\n".join(lines)[:1024], inline=False)
+            except Exception:
+                pass
+
+        try:
+            from lib import cache_bus
+            cb = cache_bus.get_stats()
+            if cb["enabled"]:
+                embed.add_field(
+                    name="Cache Invalidation Bus",
+                    value=(
+                        f"Channel: `{cb['channel']}` · Listening: {'yes' if cb['listening'] else 'no'}\n"
+                        f"Published: {cb['published']} ({cb['notifies_sent']} notifies, {cb['publish_errors']} errors)\n"
+                        f"Received: {cb['received']} · Applied: {cb['applied']}\n"
+                        f"Reconnects: {cb['reconnects']} · Resyncs: {cb['resyncs']}"
+                    ),
+                    inline=False
+                )
+        except Exception:
+            pass
+
+        try:
+            from lib.pg_aiosqlite import get_query_stats
+            qs = get_query_stats(top_n=5)
+            aw = qs["acquire_wait"]
+            embed.add_field(
+                name="Pool Acquire Wait",
+                value=(
+                    f"p50 {aw['p50_ms']} ms · p95 {aw['p95_ms']} ms · p99 {aw['p99_ms']} ms · max {aw['max_ms']} ms\n"
+                    f"Acquires: {aw['count']} · Timeouts: {aw['timeouts']}"
+                ),
+                inline=False
+            )
+            top_lines = []
+            for q in qs["top"]:
+                sql = q["sql"] if len(q["sql"]) <= 90 else q["sql"][:87] + "..."
+                top_lines.append(
+                    f"`{q['total_ms']:.0f} ms` ×{q['count']} · p95 {q['p95_ms']} ms · {q['rows']} rows\n`{sql}`"
+                )
+            if top_lines:
+                embed.add_field(
+                    name=f"Top Queries by Total Time ({qs['statements']} statements, {qs['queries']} queries)",
+                    value="\n".join(top_lines)[:1024],
+                    inline=False
+                )
+            from lib.pg_aiosqlite import get_lease_stats
+            ls = get_lease_stats(top_n=3)
+            lease_lines = [
+                f"Open: {ls['open']} ({', '.join(f'{k} {v}' for k, v in ls['by_kind'].items()) or 'none'}) · "
+                f"held > {ls['warn_s']:.0f}s: {ls['held_past_warn']}",
+                f"Reclaimed: {ls['reclaimed_orphans']} orphaned · {ls['reclaimed_idle']} idle (mode: {ls['reclaim']})",
+            ]
+            for l in ls["oldest"]:
+                if l["age_s"] >= ls["warn_s"]:
+                    lease_lines.append(f"`{l['age_s']:.0f}s` {l['kind']} · {l['site']}")
+            embed.add_field(name="Connection Leases", value="\n".join(lease_lines)[:1024], inline=False)
+            slow = qs["slow_recent"]
+            if slow:
+                embed.add_field(
+                    name=f"Recent Slow Queries (≥ {qs['slow_threshold_ms']:.0f} ms)",
+                    value="\n".join(f"`{x['ms']:.0f} ms` {x['sql'][:80]}" for x in slow[-5:])[:1024],
+                    inline=False
+                )
+        except Exception:
+            pass
+
         await interaction.followup.send(embed=embed, ephemeral=True)
     except ImportError:
         await interaction.followup.send("❌ Pool stats not available (pvp.db_pool not found)", ephemeral=True)
@@ -1098,9 +1213,25 @@ async def admin_remove(interaction: discord.Interaction, member: discord.Member)
 #  Utility / admin-only slash
 # =========================
 # --- fuzzy matching helpers ---
-def _canon(s: str) -> str:
-    """lowercase and strip non-alphanumerics for fuzzy compare"""
-    return re.sub(r"[^a-z0-9]+", "", (s or "").lower())
+# _canon (lowercase, strip non-alphanumerics) comes from lib.fuzzy_index
+
+def _cached_fuzzy_index(kind: str):
+    """Prebuilt FuzzyIndex ("species", "moves", "items", ...) from the warmed cache; None if cold."""
+    if db_cache is None:
+        return None
+    try:
+        return db_cache.get_fuzzy_index(kind)
+    except Exception:
+        return None
+
+def _remember_fuzzy_index(kind: str, index) -> None:
+    """Keep an index built from a full DB read, so the next lookup skips the DB."""
+    if db_cache is None or not len(index):
+        return
+    try:
+        db_cache.set_fuzzy_index(kind, index)
+    except Exception:
+        pass
 
 # ============================================================================
 # ENHANCED FUZZY MATCHING SYSTEM
@@ -1110,85 +1241,18 @@ class FuzzyMatcher:
     """
     Comprehensive fuzzy matching for Pokemon data with abbreviations,
     typo tolerance, and smart suggestions.
+
+    Moves, species, items, abilities and natures are looked up in prebuilt n-gram
+    indexes (lib/fuzzy_index.py, built when the cache is warmed); fuzzy_match()
+    scans an arbitrary list.
     """
     
-    # Common abbreviations for moves
-    MOVE_ABBREVIATIONS = {
-        "eq": "earthquake",
-        "dclaw": "dragon-claw",
-        "stone": "stone-edge",
-        "sword": "swords-dance",
-        "rocks": "stealth-rock",
-        "twave": "thunder-wave",
-        "willowisp": "will-o-wisp",
-        "wow": "will-o-wisp",
-        "sr": "stealth-rock",
-        "hp": "hidden-power",
-        "sub": "substitute",
-        "protect": "protect",
-        "toxic": "toxic",
-        "roost": "roost",
-        "uturn": "u-turn",
-        "volt": "volt-switch",
-        "scald": "scald",
-        "knock": "knock-off",
-        "defog": "defog",
-        "rapid": "rapid-spin",
-        "spin": "rapid-spin",
-        "flamethrower": "flamethrower",
-        "fireblast": "fire-blast",
-        "icebeam": "ice-beam",
-        "thunderbolt": "thunderbolt",
-        "thunder": "thunder",
-        "psychic": "psychic",
-        "shadowball": "shadow-ball",
-        "energyball": "energy-ball",
-        "focusblast": "focus-blast",
-        "aurasphere": "aura-sphere",
-        "darkpulse": "dark-pulse",
-        "dragonpulse": "dragon-pulse",
-        "dracometeor": "draco-meteor",
-        "overheat": "overheat",
-        "closecombat": "close-combat",
-        "superpower": "superpower",
-        "ironhead": "iron-head",
-        "playrough": "play-rough",
-        "moonblast": "moonblast",
-        "gigadrain": "giga-drain",
-    }
+    # Common abbreviations for moves / natures (aliases in the fuzzy indexes)
+    MOVE_ABBREVIATIONS = fuzzy_index.MOVE_ABBREVIATIONS
+    NATURE_ABBREVIATIONS = fuzzy_index.NATURE_ABBREVIATIONS
     
-    # Common nature abbreviations
-    NATURE_ABBREVIATIONS = {
-        "ada": "adamant",
-        "bold": "bold",
-        "brave": "brave",
-        "calm": "calm",
-        "care": "careful",
-        "hast": "hasty",
-        "imp": "impish",
-        "jol": "jolly",
-        "lax": "lax",
-        "lone": "lonely",
-        "mild": "mild",
-        "mod": "modest",
-        "naive": "naive",
-        "naugh": "naughty",
-        "quie": "quiet",
-        "rash": "rash",
-        "relax": "relaxed",
-        "sass": "sassy",
-        "seri": "serious",
-        "timi": "timid",
-    }
-    
-    @staticmethod
-    def normalize(text: str) -> str:
-        """Normalize text for matching"""
-        if not text:
-            return ""
-        # Convert to string if it's not already (handles move IDs)
-        text = str(text)
-        return text.strip().lower().replace(" ", "-").replace("_", "-")
+    # Normalize text for matching (lowercase, spaces/underscores -> hyphens)
+    normalize = staticmethod(fuzzy_index.normalize_name)
     
     @staticmethod
     def fuzzy_match(query: str, choices: list[str], threshold: float = 0.72) -> tuple[Optional[str], float, list[str]]:
@@ -1231,52 +1295,27 @@ class FuzzyMatcher:
         
         return best_choice, best_score, suggestions
     
-    @staticmethod
-    async def fuzzy_move(conn, query: str, species_id: Optional[int] = None, 
-                         gen: Optional[int] = None) -> tuple[Optional[str], float, list[str]]:
-        """
-        Fuzzy match move name with abbreviation support and legality checking.
-        Returns: (move_name, confidence, suggestions)
-        """
-        query_norm = FuzzyMatcher.normalize(query)
-        
-        # Check abbreviations first
-        if query_norm in FuzzyMatcher.MOVE_ABBREVIATIONS:
-            exact_move = FuzzyMatcher.MOVE_ABBREVIATIONS[query_norm]
-            return exact_move, 1.0, [exact_move]
-        
-        # Get all moves (or legal moves if species_id provided)
-        if species_id and gen:
-            cur = await conn.execute("""
-                SELECT DISTINCT m.name
-                FROM moves m
-                JOIN learnsets l ON m.id = l.move_id
-                WHERE l.species_id = ? AND l.generation <= ?
-            """, (species_id, gen))
-        else:
-            cur = await conn.execute("SELECT name FROM moves")
-        
-        move_rows = await cur.fetchall()
-        await cur.close()
-        
-        all_moves = [row['name'] for row in move_rows]
-        
-        return FuzzyMatcher.fuzzy_match(query, all_moves, threshold=0.70)
-    
     @staticmethod
     async def fuzzy_species(conn, query: str) -> tuple[Optional[dict], float, list[str]]:
         """
-        Fuzzy match species name.
+        Fuzzy match species name ("alolan raichu" finds raichu-alola).
         Returns: (species_row, confidence, suggestions)
         """
-        cur = await conn.execute("SELECT id, name FROM pokedex")
-        species_rows = await cur.fetchall()
-        await cur.close()
+        index = _cached_fuzzy_index("species")
+        if index is None:
+            cur = await conn.execute("SELECT id, name FROM pokedex")
+            species_rows = await cur.fetchall()
+            await cur.close()
+            index = fuzzy_index.species_index(row['name'] for row in species_rows)
+            _remember_fuzzy_index("species", index)
         
-        species_names = [row['name'] for row in species_rows]
-        best_name, score, suggestions = FuzzyMatcher.fuzzy_match(query, species_names, threshold=0.70)
+        best_name, score, suggestions = index.match(query, threshold=0.70)
         
         if best_name:
+            if db_cache is not None:
+                cached = db_cache.get_cached_pokedex(best_name)
+                if cached is not None:
+                    return dict(cached), score, suggestions
             cur = await conn.execute("SELECT * FROM pokedex WHERE LOWER(name) = LOWER(?)", (best_name,))
             species_row = await cur.fetchone()
             await cur.close()
@@ -1291,71 +1330,54 @@ class FuzzyMatcher:
         Returns: (ability_name, confidence, suggestions)
         """
         if valid_abilities:
-            choices = valid_abilities
-        else:
-            # Get all abilities from database (you may need to adjust this query)
-            cur = await conn.execute("SELECT DISTINCT ability FROM pokemons WHERE ability IS NOT NULL")
-            rows = await cur.fetchall()
-            await cur.close()
-            choices = list(set(row['ability'] for row in rows if row['ability']))
+            return FuzzyMatcher.fuzzy_match(query, valid_abilities, threshold=0.75)
+        
+        # Every species' abilities, from the warmed pokedex
+        index = _cached_fuzzy_index("abilities")
+        if index is not None:
+            return index.match(query, threshold=0.75)
+        
+        # Get all abilities from database (you may need to adjust this query)
+        cur = await conn.execute("SELECT DISTINCT ability FROM pokemons WHERE ability IS NOT NULL")
+        rows = await cur.fetchall()
+        await cur.close()
+        choices = list(set(row['ability'] for row in rows if row['ability']))
         
         return FuzzyMatcher.fuzzy_match(query, choices, threshold=0.75)
     
     @staticmethod
     async def fuzzy_item(conn, query: str) -> tuple[Optional[str], float, list[str]]:
         """
-        Fuzzy match item name. Uses item cache when available to avoid DB round-trip.
+        Fuzzy match item id or name. Uses the prebuilt item index when the cache is
+        warm, to avoid a DB round-trip.
         Returns: (item_id, confidence, suggestions)
         """
-        item_rows = []
-        if db_cache is not None:
-            item_rows = db_cache.get_all_cached_items()
-        if not item_rows:
+        index = _cached_fuzzy_index("items")
+        if index is None:
             cur = await conn.execute("SELECT id, name FROM items")
-            item_rows = [dict(r) for r in await cur.fetchall()]
+            index = fuzzy_index.item_index([dict(r) for r in await cur.fetchall()])
             await cur.close()
+            _remember_fuzzy_index("items", index)
         
-        item_ids = [r.get("id") or "" for r in item_rows]
-        item_names = [r.get("name") or r.get("id") or "" for r in item_rows]
-        
-        best_id, score_id, sugg_id = FuzzyMatcher.fuzzy_match(query, item_ids, threshold=0.70)
-        best_name, score_name, sugg_name = FuzzyMatcher.fuzzy_match(query, item_names, threshold=0.70)
-        
-        if score_id > score_name:
-            return best_id, score_id, sugg_id
-        if best_name:
-            for row in item_rows:
-                if (row.get("name") or "").lower() == best_name.lower():
-                    sugg = [r.get("id") or "" for r in item_rows if (r.get("name") or "") in sugg_name]
-                    return row.get("id"), score_name, sugg
-        return None, 0.0, []
+        # Names are aliases of their ids, so id and name matches compete in one pass
+        return index.match(query, threshold=0.70)
     
     @staticmethod
     async def fuzzy_move(conn, query: str) -> tuple[Optional[str], float, list[str]]:
         """
-        Fuzzy match move name.
+        Fuzzy match move name (abbreviations like "eq" or "twave" included).
         Returns: (move_name, confidence, suggestions)
         The move_name is normalized (lowercase, hyphens).
         """
-        cur = await conn.execute("SELECT name FROM moves")
-        move_rows = await cur.fetchall()
-        await cur.close()
-        
-        # Get all move names
-        move_names = [row['name'] for row in move_rows]
-        
-        # Check abbreviations first
-        query_norm = FuzzyMatcher.normalize(query)
-        if query_norm in FuzzyMatcher.MOVE_ABBREVIATIONS:
-            abbrev_full = FuzzyMatcher.MOVE_ABBREVIATIONS[query_norm]
-            # Check if abbreviated move exists
-            if abbrev_full in move_names:
-                return abbrev_full, 1.0, [abbrev_full]
-        
-        # Try fuzzy match
-        best_match, score, suggestions = FuzzyMatcher.fuzzy_match(query, move_names, threshold=0.70)
+        index = _cached_fuzzy_index("moves")
+        if index is None:
+            cur = await conn.execute("SELECT name FROM moves")
+            move_rows = await cur.fetchall()
+            await cur.close()
+            index = fuzzy_index.move_index(row['name'] for row in move_rows)
+            _remember_fuzzy_index("moves", index)
         
-        return best_match, score, suggestions[:5]  # Return top 5 suggestions
+        return index.match(query, threshold=0.70, limit=5)  # Return top 5 suggestions
     
     @staticmethod
     def fuzzy_nature(query: str) -> tuple[Optional[str], float, list[str]]:
@@ -1363,16 +1385,8 @@ class FuzzyMatcher:
         Fuzzy match nature name with abbreviation support.
         Returns: (nature_name, confidence, suggestions)
         """
-        import lib.stats as stats
-        
-        query_norm = FuzzyMatcher.normalize(query)
-        
-        # Check abbreviations first
-        if query_norm in FuzzyMatcher.NATURE_ABBREVIATIONS:
-            return FuzzyMatcher.NATURE_ABBREVIATIONS[query_norm], 1.0, [FuzzyMatcher.NATURE_ABBREVIATIONS[query_norm]]
-        
-        natures = list(stats.NATURE_PLUS_MINUS.keys())
-        return FuzzyMatcher.fuzzy_match(query, natures, threshold=0.75)
+        # Abbreviations are aliases in the (static) nature index
+        return fuzzy_index.nature_index().match(query, threshold=0.75)
 
 # Keep old function for backwards compatibility
 def _fuzzy_best(query: str, choices: list[str]):
@@ -1393,6 +1407,146 @@ def _fuzzy_best(query: str, choices: list[str]):
     suggestions = [c for r, c in scored if r >= 0.72][:3]
     return best, best_ratio, suggestions
 
+# ============================================================================
+# SLASH-COMMAND AUTOCOMPLETE (answered from memory)
+# ============================================================================
+_AC_LIMIT = 25  # Discord shows at most 25 choices, each name/value at most 100 chars
+
+_COMPLETER_SQL = {
+    "pokedex": "SELECT id, name FROM pokedex",
+    "moves": "SELECT name FROM moves",
+    "items": "SELECT id, name FROM items",
+}
+
+async def _completer(kind: str):
+    """Prefix index ("species", "moves", "items") from the warmed cache; built from one DB read if cold."""
+    if db_cache is not None:
+        try:
+            index = db_cache.get_completer(kind)
+            if index is not None:
+                return index
+        except Exception:
+            pass
+    table = autocomplete.COMPLETER_KINDS[kind]
+    try:
+        conn = await db.connect()
+        try:
+            cur = await conn.execute(_COMPLETER_SQL[table])
+            rows = [dict(r) for r in await cur.fetchall()]
+            await cur.close()
+        finally:
+            await conn.close()
+    except Exception as e:
+        print(f"[Autocomplete] could not load {table}: {e}")
+        return None
+    index = autocomplete.build_completers(table, rows)[kind]
+    if db_cache is not None and len(index):
+        try:
+            db_cache.set_completer(kind, index)
+        except Exception:
+            pass
+    return index
+
+def _ac_choices(pairs) -> list[app_commands.Choice[str]]:
+    return [app_commands.Choice(name=label[:100], value=value[:100]) for value, label in pairs][:_AC_LIMIT]
+
+async def _complete_names(kind: str, current: str) -> list[tuple[str, str]]:
+    """(value, label) completions; typo-tolerant fuzzy suggestions when nothing starts with current."""
+    index = await _completer(kind)
+    if index is None:
+        return []
+    pairs = index.complete(current, _AC_LIMIT)
+    if not pairs and (current or "").strip():
+        fuzzy = _cached_fuzzy_index(kind)
+        if fuzzy is not None:
+            _, _, suggestions = fuzzy.match(current, threshold=0.6, limit=10)
+            pairs = [(v, index.label(v)) for v in suggestions]
+    return pairs
+
+async def species_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+    """Pokédex names by prefix, dex number or "alolan raichu"; value is the pokedex name."""
+    return _ac_choices(await _complete_names("species", current))
+
+async def move_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+    """Move names by prefix or abbreviation ("eq", "twave"); value is the move name."""
+    return _ac_choices(await _complete_names("moves", current))
+
+async def item_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+    """Items by id or display name; value is the item id."""
+    pairs = await _complete_names("items", current)
+    return _ac_choices(
+        (value, f"{label} ({value})" if label.lower() != value.lower() else value) for value, label in pairs
+    )
+
+async def _team_members(uid: str) -> list[dict]:
+    """Team rows (slots 1-6, in slot order) from the per-owner pokemons cache; one load on a miss."""
+    rows = db_cache.get_cached_pokemons(uid) if db_cache is not None else None
+    if rows is None:
+        try:
+            rows = await db.list_pokemons(uid, limit=10_000)
+        except Exception:
+            return []
+    team = [r for r in rows if r.get("team_slot") is not None and 1 <= int(r["team_slot"]) <= 6]
+    return sorted(team, key=lambda r: int(r["team_slot"]))
+
+async def _complete_team(interaction: discord.Interaction, current: str, *, by_slot: bool) -> list[app_commands.Choice[str]]:
+    q = _canon(current)
+    choices = []
+    for r in await _team_members(str(interaction.user.id)):
+        species = str(r.get("species") or "")
+        slot = int(r["team_slot"])
+        if q and not (_canon(species).startswith(q) or q in _canon(species) or q == str(slot)):
+            continue
+        label = f"Slot {slot} · {species.replace('-', ' ').title()} (Lv. {r.get('level') or '?'})"
+        choices.append(app_commands.Choice(name=label, value=str(slot) if by_slot else species))
+    return choices
+
+async def team_member_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+    """The caller's team members; value is the species."""
+    return await _complete_team(interaction, current, by_slot=False)
+
+async def team_slot_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+    """The caller's team members; value is the team slot (unambiguous with duplicates)."""
+    return await _complete_team(interaction, current, by_slot=True)
+
+async def feed_item_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+    """Only the items /feed accepts."""
+    q = _canon(current)
+    return [
+        app_commands.Choice(name=pretty_item(item_id), value=item_id)
+        for item_id in _FEED_ITEMS
+        if q in _canon(item_id)
+    ]
+
+async def showdown_token_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+    """
+    Completes the word being typed in a Showdown paste: the species first, an item
+    after "@", a move after "- ". Choice values are capped at 100 characters, so
+    longer pastes get no suggestions.
+    """
+    text = current or ""
+    cut = max(text.rfind("@"), text.rfind("- "))
+    if cut < 0:
+        kind, start = "species", 0
+    elif text[cut] == "@":
+        kind, start = "items", cut + 1
+    else:
+        kind, start = "moves", cut + 2
+    head, word = text[:start], text[start:].strip()
+    if not word or len(text) > 100:
+        return []
+    if head and not head.endswith(" "):
+        head += " "
+    index = await _completer(kind)
+    if index is None:
+        return []
+    choices = []
+    for _, label in index.complete(word, _AC_LIMIT):
+        value = head + label
+        if len(value) <= 100:
+            choices.append(app_commands.Choice(name=value, value=value))
+    return choices
+
 # --- replace your existing resolve_team_mon with this version ---
 async def resolve_team_mon(
     interaction,
@@ -1578,24 +1732,40 @@ async def _resolve_item_fuzzy(conn, query: str, *, threshold: float = 0.85):
     if row:
         return dict(row), None, []
 
-    # 3) fuzzy: use cache when available, else DB
-    rows = []
-    if db_cache is not None:
-        rows = [{"id": r.get("id"), "name": r.get("name") or r.get("id")} for r in db_cache.get_all_cached_items()]
-    if not rows:
-        cur = await conn.execute("SELECT id, COALESCE(name, id) AS name FROM items")
+    # 3) fuzzy: prebuilt name index when the cache is warm, else DB. Results are item ids.
+    index = _cached_fuzzy_index("item_names")
+    if index is None:
+        cur = await conn.execute("SELECT id, name FROM items")
         rows = [dict(r) for r in await cur.fetchall()]
         await cur.close()
-    names = [r["name"] for r in rows]
-
-    best, score, suggestions = _fuzzy_best(q, names)
-    if best and (score >= threshold or _is_prefixish(q, best)):
-        match_id = next((r["id"] for r in rows if r["name"] == best), None)
-        if match_id:
-            row = await _fetch_item_by_query(conn, str(match_id))
-            if row:
-                return dict(row), best, []
-    return None, None, [s.title() for s in suggestions[:3]]
+        index = fuzzy_index.item_name_index(rows)
+        _remember_fuzzy_index("item_names", index)
+
+    # Scored like _fuzzy_best: suggestions >= 0.72, top 3
+    best, score, suggestions = index.match(q, threshold=0.72, limit=3)
+    names = await _item_display_names(conn, ([best] if best else []) + suggestions[:3])
+    if best and (score >= threshold or _is_prefixish(q, names[best])):
+        row = await _fetch_item_by_query(conn, best)
+        if row:
+            return dict(row), names[best], []
+    return None, None, [names[s].title() for s in suggestions[:3]]
+
+async def _item_display_names(conn, ids: list[str]) -> dict[str, str]:
+    """Item id -> display name (the id for unnamed items); item cache first, one query for the rest."""
+    names: dict[str, str] = {}
+    for item_id in ids:
+        cached = db_cache.get_cached_item(item_id) if db_cache is not None else None
+        if cached is not None:
+            names[item_id] = str(cached.get("name") or item_id)
+    missing = [i for i in dict.fromkeys(ids) if i not in names]
+    if missing:
+        cur = await conn.execute("SELECT id, name FROM items WHERE id = ANY(?)", (missing,))
+        for r in await cur.fetchall():
+            names[str(r["id"])] = str(r["name"] or r["id"])
+        await cur.close()
+    for item_id in missing:
+        names.setdefault(item_id, item_id)
+    return names
 ##items
 MAX_STACK = 999  # per-item cap
 
@@ -1755,34 +1925,10 @@ class AdminItems(commands.Cog):
         interaction: discord.Interaction,
         current: str
     ) -> list[app_commands.Choice[str]]:
-        q = (current or "").strip().lower()
-        if not q:
+        if not (current or "").strip():
             return []
-
-        like = f"%{q}%"
-        conn = await open_db()
-        try:
-            cur = await conn.execute(
-                "SELECT id, name FROM items "
-                "WHERE LOWER(id) LIKE ? OR LOWER(name) LIKE ? "
-                "ORDER BY CASE "
-                "  WHEN LOWER(id)=? OR LOWER(name)=? THEN 0 "
-                "  WHEN LOWER(id) LIKE ? OR LOWER(name) LIKE ? THEN 1 "
-                "  ELSE 2 "
-                "END, id "
-                "LIMIT 25",
-                (like, like, q, q, like, like)
-            )
-            rows = await cur.fetchall(); await cur.close()
-        finally:
-            await conn.close()
-
-        choices: list[app_commands.Choice[str]] = []
-        for r in rows:
-            _id = r["id"]; _name = r["name"]
-            label = f"{_name} ({_id})" if _name and _name.lower() != _id else _id
-            choices.append(app_commands.Choice(name=label, value=_id))
-        return choices
+        # Prefix index over the cached items (no DB query per keystroke)
+        return await item_autocomplete(interaction, current)
     def __init__(self, bot: commands.Bot):
         self.bot = bot
     # /merge_item_id
@@ -2585,6 +2731,7 @@ class BuyItemView(discord.ui.View):
         await itx.response.send_modal(modal)
 @bot.tree.command(name="item", description="Show info about an item and buy it.")
 @app_commands.describe(name="Item id or name (e.g. 'poke ball', 'choice scarf')")
+@app_commands.autocomplete(name=item_autocomplete)
 async def item_cmd(interaction: discord.Interaction, name: str):
     start_time = time.time()
     # Defer IMMEDIATELY - wrapped in try/catch for expired interactions
@@ -2989,30 +3136,23 @@ def _validate_evs(evs: dict[str,int]) -> None:
     if sum(evs.values()) > 510:
         raise ValueError("Total EVs cannot exceed 510.")
 
+def _cached_species_record(species_name: str) -> Optional[species_records.SpeciesRecord]:
+    """Parsed species record from the pokedex cache (name as given, lowercased, or hyphenated), else None."""
+    if not species_name or not db_cache:
+        return None
+    name = species_name.strip()
+    for key in dict.fromkeys((name, name.lower(), name.lower().replace(" ", "-"))):
+        record = db_cache.get_species_record(key)
+        if record is not None:
+            return record
+    return None
+
 def _get_ev_yield_for_species(species_name: str) -> dict:
     """Return EV yield dict (hp, atk, defn, spa, spd, spe) for a species from cached pokedex. All keys int >= 0."""
-    if not species_name or not db_cache:
-        return {k: 0 for k in _STAT_KEYS_SHORT}
-    entry = db_cache.get_cached_pokedex(species_name) or db_cache.get_cached_pokedex((species_name or "").lower()) or db_cache.get_cached_pokedex((species_name or "").replace(" ", "-"))
-    if not entry:
+    record = _cached_species_record(species_name)
+    if record is None:
         return {k: 0 for k in _STAT_KEYS_SHORT}
-    raw = entry.get("ev_yield")
-    if isinstance(raw, str):
-        try:
-            raw = json.loads(raw) if raw else {}
-        except Exception:
-            raw = {}
-    if not isinstance(raw, dict):
-        raw = {}
-    normalized = _normalize_stats_keys(raw)
-    return {
-        "hp": max(0, int(normalized.get("hp", 0) or 0)),
-        "atk": max(0, int(normalized.get("atk", 0) or 0)),
-        "defn": max(0, int(normalized.get("def", 0) or normalized.get("defn", 0) or 0)),
-        "spa": max(0, int(normalized.get("spa", 0) or 0)),
-        "spd": max(0, int(normalized.get("spd", 0) or 0)),
-        "spe": max(0, int(normalized.get("spe", 0) or 0)),
-    }
+    return dict(record.ev_yield)
 
 def _cap_evs(evs_dict: dict) -> dict:
     """Return a new EV dict with each stat capped at 252 and total capped at 510."""
@@ -3337,40 +3477,6 @@ def normalize_base_stats(src: dict | None) -> dict:
     }
 
 
-def parse_abilities(abilities_raw) -> tuple[list[str], list[str]]:
-    """
-    Normalizes ability data from your DB (strings, dicts, or JSON string) into:
-        (regular_ability_names, hidden_ability_names)
-    Accepts formats like:
-      - ["overgrow","chlorophyll"]
-      - [{"name":"overgrow"},{"name":"chlorophyll","is_hidden":true}]
-      - [{"ability":{"name":"overgrow"},"slot":1},{"ability":{"name":"chlorophyll"},"slot":3}]
-    """
-    # if JSON text, parse first
-    if isinstance(abilities_raw, str):
-        try:
-            abilities_raw = json.loads(abilities_raw)
-        except Exception:
-            abilities_raw = []
-    regs, hides = [], []
-    for a in (abilities_raw or []):
-        if isinstance(a, str):
-            regs.append(a)
-            continue
-        if isinstance(a, dict):
-            name = a.get("name") or (a.get("ability") or {}).get("name") or ""
-            is_hidden = bool(a.get("is_hidden") or a.get("hidden") or (a.get("slot") == 3))
-            if name:
-                (hides if is_hidden else regs).append(name)
-    # de-dup while preserving order
-    def _dedup(seq: list[str]) -> list[str]:
-        seen = set(); out = []
-        for s in seq:
-            k = s.lower()
-            if k not in seen:
-                seen.add(k); out.append(s)
-        return out
-    return _dedup(regs), _dedup(hides)
 def roll_hidden_ability(abilities_raw, ha_denominator: int = 10) -> tuple[str, bool]:
     """
     Returns (ability_name, is_hidden).
@@ -4891,23 +4997,6 @@ from lib import db
 # I will CALL them below and NOT redefine them here.
 
 # ---------------- per-user gen helpers ----------------
-def _normalize_stats_for_generator(stats: dict) -> dict:
-    """
-    Convert DB stats into underscore long-form keys required by generate_mon():
-    {hp, attack, defense, special_attack, special_defense, speed}
-    Supports short keys {atk, def, spa, spd, spe} or hyphen keys.
-    """
-    if not isinstance(stats, dict):
-        return {}
-    lk = {str(k).lower().replace("-", "_"): v for k, v in stats.items()}
-    return {
-        "hp": lk.get("hp", 0),
-        "attack": lk.get("attack", lk.get("atk", 0)),
-        "defense": lk.get("defense", lk.get("def", 0)),
-        "special_attack": lk.get("special_attack", lk.get("spa", lk.get("specialattack", 0))),
-        "special_defense": lk.get("special_defense", lk.get("spd", lk.get("specialdefense", 0))),
-        "speed": lk.get("speed", lk.get("spe", 0)),
-    }
 async def _ensure_user_in_gen1(user_id: str) -> None:
     """
     Make sure a user exists and is initialized at Gen 1 with user_rulesets.
@@ -5049,36 +5138,50 @@ async def _user_selected_gen(user_id: str) -> int:
 
 
 # ---------------- helper functions for storing extra fields ----------------
+def _cached_levelup_move_names(species_id: int, level: int, generation: int, limit: int = 4, scan: Optional[int] = 40) -> list[str]:
+    """
+    Highest-level level-up moves (title-cased) from the learnset index; [] if not cached.
+    Only the first `scan` entries are considered (None = all), like the LIMIT in the DB fallback.
+    """
+    index = db_cache.get_learnset_index() if db_cache is not None else None
+    if index is None:
+        return []
+    seen, out = set(), []
+    for _lv, move_id in index.levelup_moves(species_id, generation, level)[:scan]:
+        move = db_cache.get_cached_move(str(move_id))
+        name = (move.get("name") if move else None) or ""
+        if name:
+            name = name.replace("-", " ").title()
+            if name not in seen:
+                seen.add(name)
+                out.append(name)
+        if len(out) == limit:
+            break
+    return out
+
+
+def _cached_learnset_move_names(species_id: int, generation: int, methods: tuple[str, ...]) -> list[str]:
+    """Sorted distinct move names (title-cased) learned by any of methods, from the learnset index."""
+    index = db_cache.get_learnset_index() if db_cache is not None else None
+    if index is None:
+        return []
+    out = []
+    for move_id in index.move_ids(species_id, generation, methods):
+        move = db_cache.get_cached_move(str(move_id))
+        name = (move.get("name") if move else None) or ""
+        if name:
+            out.append(name.replace("-", " ").title())
+    return sorted(out)
+
+
 async def _default_levelup_moves(species_id: int, level: int, generation: int, limit: int = 4) -> list[str]:
     """Best-effort: choose up to 4 highest-level level-up moves from cache or DB."""
-    if db_cache is not None:
-        try:
-            learnsets = db_cache.get_cached_learnsets()
-            if learnsets:
-                rows = [
-                    r for r in learnsets
-                    if int(r.get("species_id") or -1) == int(species_id)
-                    and int(r.get("generation") or 0) == generation
-                    and str(r.get("method") or "").strip().lower() == "level-up"
-                    and int(r.get("level_learned") or 0) <= level
-                ]
-                rows.sort(key=lambda r: (int(r.get("level_learned") or 0), str(r.get("move_id") or "")), reverse=True)
-                seen, out = set(), []
-                for r in rows[:40]:
-                    move_id = r.get("move_id")
-                    move = db_cache.get_cached_move(str(move_id)) if move_id is not None else None
-                    name = (move.get("name") if move else None) or ""
-                    if name:
-                        name = name.replace("-", " ").title()
-                        if name not in seen:
-                            seen.add(name)
-                            out.append(name)
-                    if len(out) == limit:
-                        break
-                if out:
-                    return out
-        except Exception:
-            pass
+    try:
+        out = _cached_levelup_move_names(species_id, level, generation, limit)
+        if out:
+            return out
+    except Exception:
+        pass
     conn = await db.connect()
     try:
         cur = await conn.execute("""
@@ -5127,16 +5230,9 @@ async def _species_can_learn_move_by_machine(species_id: int, move_id: int, gen:
     """True if this species can learn this move by TM/HM (method=machine) in this gen."""
     if db_cache is not None:
         try:
-            learnsets = db_cache.get_cached_learnsets()
-            if learnsets:
-                for r in learnsets:
-                    if int(r.get("species_id") or -1) != int(species_id) or int(r.get("move_id") or -1) != int(move_id):
-                        continue
-                    if int(r.get("generation") or 0) != gen:
-                        continue
-                    if str(r.get("method") or "").strip().lower() != "machine":
-                        continue
-                    return True
+            index = db_cache.get_learnset_index()
+            if index is not None and index.can_learn(species_id, move_id, gen, "machine"):
+                return True
         except Exception:
             pass
     try:
@@ -5235,29 +5331,12 @@ async def _get_team_tutor_eligible(user_id: str, gen: int) -> List[Dict[str, Any
 
 async def _get_tutor_learnset_moves(species_id: int, generation: int) -> list[str]:
     """Return move names from learnset that are tutor-only for this species in this gen."""
-    if db_cache is not None:
-        try:
-            learnsets = db_cache.get_cached_learnsets()
-            if learnsets:
-                move_ids_seen = set()
-                out = []
-                for r in learnsets:
-                    if int(r.get("species_id") or -1) != int(species_id) or int(r.get("generation") or 0) != generation:
-                        continue
-                    if str(r.get("method") or "").strip().lower() != "tutor":
-                        continue
-                    move_id = r.get("move_id")
-                    if move_id in move_ids_seen:
-                        continue
-                    move_ids_seen.add(move_id)
-                    move = db_cache.get_cached_move(str(move_id)) if move_id is not None else None
-                    name = (move.get("name") if move else None) or ""
-                    if name:
-                        out.append(name.replace("-", " ").title())
-                if out:
-                    return sorted(out)
-        except Exception:
-            pass
+    try:
+        out = _cached_learnset_move_names(species_id, generation, ("tutor",))
+        if out:
+            return out
+    except Exception:
+        pass
     conn = await db.connect()
     try:
         cur = await conn.execute("""
@@ -5281,31 +5360,12 @@ async def _get_tutor_learnset_moves(species_id: int, generation: int) -> list[st
 
 async def _get_egg_machine_learnset_moves(species_id: int, generation: int) -> list[str]:
     """Return move names from learnset that are egg or machine only (no tutor — tutor doesn't exist in Gen 1)."""
-    if db_cache is not None:
-        try:
-            learnsets = db_cache.get_cached_learnsets()
-            if learnsets:
-                methods = ("egg", "machine")
-                move_ids_seen = set()
-                out = []
-                for r in learnsets:
-                    if int(r.get("species_id") or -1) != int(species_id) or int(r.get("generation") or 0) != generation:
-                        continue
-                    m = str(r.get("method") or "").strip().lower()
-                    if m not in methods:
-                        continue
-                    move_id = r.get("move_id")
-                    if move_id in move_ids_seen:
-                        continue
-                    move_ids_seen.add(move_id)
-                    move = db_cache.get_cached_move(str(move_id)) if move_id is not None else None
-                    name = (move.get("name") if move else None) or ""
-                    if name:
-                        out.append(name.replace("-", " ").title())
-                if out:
-                    return sorted(out)
-        except Exception:
-            pass
+    try:
+        out = _cached_learnset_move_names(species_id, generation, ("egg", "machine"))
+        if out:
+            return out
+    except Exception:
+        pass
     conn = await db.connect()
     try:
         cur = await conn.execute("""
@@ -5329,31 +5389,12 @@ async def _get_egg_machine_learnset_moves(species_id: int, generation: int) -> l
 
 async def _get_non_levelup_learnset_moves(species_id: int, generation: int) -> list[str]:
     """Return move names from learnset that are not level-up (egg, tutor, machine)."""
-    if db_cache is not None:
-        try:
-            learnsets = db_cache.get_cached_learnsets()
-            if learnsets:
-                methods = ("egg", "tutor", "machine")
-                move_ids_seen = set()
-                out = []
-                for r in learnsets:
-                    if int(r.get("species_id") or -1) != int(species_id) or int(r.get("generation") or 0) != generation:
-                        continue
-                    m = str(r.get("method") or "").strip().lower()
-                    if m not in methods:
-                        continue
-                    move_id = r.get("move_id")
-                    if move_id in move_ids_seen:
-                        continue
-                    move_ids_seen.add(move_id)
-                    move = db_cache.get_cached_move(str(move_id)) if move_id is not None else None
-                    name = (move.get("name") if move else None) or ""
-                    if name:
-                        out.append(name.replace("-", " ").title())
-                if out:
-                    return sorted(out)
-        except Exception:
-            pass
+    try:
+        out = _cached_learnset_move_names(species_id, generation, ("egg", "tutor", "machine"))
+        if out:
+            return out
+    except Exception:
+        pass
     conn = await db.connect()
     try:
         cur = await conn.execute("""
@@ -5786,45 +5827,22 @@ class StarterView(discord.ui.View):
             cached_pps: list[int] | None = None
             try:
                 if db_cache is not None:
-                    learnsets = db_cache.get_cached_learnsets()
-                    if learnsets:
-                        species_id = entry.get("id")
-                        if species_id is not None:
-                            rows = [
-                                r for r in learnsets
-                                if int(r.get("species_id") or -1) == int(species_id)
-                                and int(r.get("generation") or 0) == 1
-                                and str(r.get("method") or "").lower() == "level-up"
-                                and int(r.get("level_learned") or 0) <= 5
-                            ]
-                            rows.sort(key=lambda r: (int(r.get("level_learned") or 0), str(r.get("move_id") or "")))
-                            rows = list(reversed(rows))
-                            seen = set()
-                            out = []
-                            for r in rows:
-                                move_id = r.get("move_id")
-                                move = db_cache.get_cached_move(str(move_id)) if move_id is not None else None
-                                name = (move.get("name") if move else None) or ""
-                                if name:
-                                    name = name.replace("-", " ").title()
-                                    if name not in seen:
-                                        seen.add(name)
-                                        out.append(name)
-                                if len(out) >= 4:
-                                    break
-                            cached_moves = out if out else None
-                            if cached_moves:
-                                pps = []
-                                for m in cached_moves:
-                                    mv = db_cache.get_cached_move(m) or db_cache.get_cached_move(m.lower()) or db_cache.get_cached_move(m.lower().replace(" ", "-"))
-                                    if mv and mv.get("pp") is not None:
-                                        try:
-                                            pps.append(int(mv["pp"]))
-                                        except Exception:
-                                            pps.append(20)
-                                    else:
+                    species_id = entry.get("id")
+                    if species_id is not None:
+                        out = _cached_levelup_move_names(int(species_id), 5, 1, limit=4, scan=None)
+                        cached_moves = out if out else None
+                        if cached_moves:
+                            pps = []
+                            for m in cached_moves:
+                                mv = db_cache.get_cached_move(m) or db_cache.get_cached_move(m.lower()) or db_cache.get_cached_move(m.lower().replace(" ", "-"))
+                                if mv and mv.get("pp") is not None:
+                                    try:
+                                        pps.append(int(mv["pp"]))
+                                    except Exception:
                                         pps.append(20)
-                                cached_pps = pps
+                                else:
+                                    pps.append(20)
+                            cached_pps = pps
             except Exception:
                 cached_moves = None
                 cached_pps = None
@@ -6922,7 +6940,9 @@ async def _get_adventure_state(user_id: str) -> dict:
         await cur.close()
         if row and row.get("data"):
             try:
-                state = json.loads(row["data"])
+                state = _maybe_json(row["data"])
+                if not isinstance(state, dict):
+                    state = None
             except Exception:
                 state = None
     if state is None:
@@ -6965,7 +6985,7 @@ async def _save_adventure_state(user_id: str, state: dict) -> None:
         await conn.commit()
     if db_cache is not None:
         try:
-            db_cache.set_cached_adventure_state(uid, state)
+            db_cache.set_cached_adventure_state(uid, state, publish=True)
         except Exception:
             pass
 
@@ -7281,51 +7301,40 @@ async def _build_mon_from_team_entry(team_entry: dict) -> Optional["Mon"]:
         return None
     species = str(team_entry["species"]).strip()
     level = int(team_entry.get("level", 5))
-    try:
-        entry = await ensure_species_and_learnsets(species)
-    except Exception:
-        return None
-    raw_stats = entry.get("stats")
-    if isinstance(raw_stats, str):
+    record = _cached_species_record(species)
+    if record is None:
         try:
-            raw_stats = json.loads(raw_stats)
+            record = species_records.from_row(await ensure_species_and_learnsets(species))
         except Exception:
-            raw_stats = {}
-    base_long = _normalize_stats_for_generator(raw_stats or {})
-    base_short = {
-        "hp": base_long.get("hp", 1),
-        "atk": base_long.get("attack", 1),
-        "defn": base_long.get("defense", 1),
-        "spa": base_long.get("special_attack", 1),
-        "spd": base_long.get("special_defense", 1),
-        "spe": base_long.get("speed", 1),
-    }
-    types = _extract_species_types(entry)
-    types_tuple = (types[0].title() if types else "Normal", types[1].title() if len(types) > 1 else None)
+            return None
 
     move_list = team_entry.get("moves")
     if not move_list:
-        conn = await db.connect()
+        species_id = record.id
         try:
-            cur = await conn.execute("SELECT id FROM pokedex WHERE LOWER(name)=LOWER(?) LIMIT 1", (species.lower(),))
-            row = await cur.fetchone()
-            await cur.close()
-            if row:
-                move_list = await _default_levelup_moves(int(row["id"]), level, 1)
+            if species_id is None:
+                conn = await db.connect()
+                try:
+                    cur = await conn.execute("SELECT id FROM pokedex WHERE LOWER(name)=LOWER(?) LIMIT 1", (species.lower(),))
+                    row = await cur.fetchone()
+                    await cur.close()
+                    species_id = int(row["id"]) if row else None
+                finally:
+                    try:
+                        await conn.close()
+                    except Exception:
+                        pass
+            if species_id is not None:
+                move_list = await _default_levelup_moves(species_id, level, 1)
         except Exception:
             move_list = []
-        finally:
-            try:
-                await conn.close()
-            except Exception:
-                pass
     if not move_list:
         move_list = ["Tackle"]
     move_list = [str(m).title().replace(" ", "-") if isinstance(m, str) else str(m) for m in (move_list or [])][:4]
 
     ability = team_entry.get("ability")
     if ability is None or (isinstance(ability, str) and not ability.strip()):
-        regs, hides = parse_abilities(entry.get("abilities") or [])
+        regs, hides = record.regular_abilities, record.hidden_abilities
         ability = (regs[0] if regs else (hides[0] if hides else None)) or "Unknown"
     else:
         ability = str(ability).strip().lower().replace(" ", "-")
@@ -7341,13 +7350,13 @@ async def _build_mon_from_team_entry(team_entry: dict) -> Optional["Mon"]:
     from lib.stats import calc_all_stats
     ivs_long = {"hp": ivs["hp"], "attack": ivs["atk"], "defense": ivs["defn"], "special_attack": ivs["spa"], "special_defense": ivs["spd"], "speed": ivs["spe"]}
     evs_long = {"hp": evs["hp"], "attack": evs["atk"], "defense": evs["defn"], "special_attack": evs["spa"], "special_defense": evs["spd"], "speed": evs["spe"]}
-    final_stats = calc_all_stats(base_long, ivs_long, evs_long, level, nature)
+    final_stats = calc_all_stats(dict(record.base_stats), ivs_long, evs_long, level, nature)
     hp_max = final_stats.get("hp", 1)
 
     dto = {
-        "species": entry.get("name") or species,
-        "types": types_tuple,
-        "base": base_short,
+        "species": record.name or species,
+        "types": record.types_tuple(),
+        "base": dict(record.base_stats_short),
         "ivs": ivs,
         "evs": evs,
         "level": level,
@@ -7356,8 +7365,8 @@ async def _build_mon_from_team_entry(team_entry: dict) -> Optional["Mon"]:
         "gender": gender,
         "is_shiny": is_shiny,
         "hp_now": hp_max,
-        "weight_kg": float(entry.get("weight_kg") or 100.0),
-        "friendship": int(entry.get("base_happiness") or 70),
+        "weight_kg": record.weight_kg,
+        "friendship": record.base_happiness,
         "nature": nature,
     }
     # Optional fixed stats override (e.g. for scripted rival/trainer teams)
@@ -7373,73 +7382,22 @@ async def _build_mon_from_team_entry(team_entry: dict) -> Optional["Mon"]:
         }
     return build_mon(dto, set_level=level, heal=True)
 
-def _gender_ratio_from_entry(entry: dict) -> dict:
-    """Get gender ratio from DB/cache entry (gender_ratio or gender_rate). Same logic as starter flow."""
-    gender_ratio = _j(entry.get("gender_ratio"), None) if entry else None
-    if not gender_ratio or not isinstance(gender_ratio, dict):
-        gr = entry.get("gender_rate") if entry else None
-        if isinstance(gr, str):
-            try:
-                gr = json.loads(gr)
-            except Exception:
-                gr = None
-        if isinstance(gr, int):
-            if gr == -1:
-                gender_ratio = {"genderless": True}
-            else:
-                female = gr * 12.5
-                gender_ratio = {"male": 100 - female, "female": female}
-    if not gender_ratio or not isinstance(gender_ratio, dict):
-        gender_ratio = {"male": 50, "female": 50}
-    return gender_ratio
-
-
 async def _build_mon_from_species(species: str, level: int, moves: Optional[list[str]] = None) -> Optional["Mon"]:
-    # Prefer cache (db_cache) then ensure_species_and_learnsets (DB / API)
-    entry = None
-    if db_cache is not None:
-        key = species.strip().lower().replace(" ", "-")
-        entry = db_cache.get_cached_pokedex(key) or db_cache.get_cached_pokedex(species.lower())
-        if not entry and key != species.lower():
-            entry = db_cache.get_cached_pokedex(species.lower())
-    if entry is None:
+    # Prefer the parsed record from the pokedex cache, then ensure_species_and_learnsets (DB / API)
+    record = _cached_species_record(species)
+    if record is None:
         try:
-            entry = await ensure_species_and_learnsets(species)
+            record = species_records.from_row(await ensure_species_and_learnsets(species))
         except Exception:
             return None
-    raw_stats = entry.get("stats")
-    if isinstance(raw_stats, str):
-        try:
-            raw_stats = json.loads(raw_stats)
-        except Exception:
-            raw_stats = {}
-    base_long = _normalize_stats_for_generator(raw_stats or {})
-    # Normalize abilities so generate_mon/choose_ability get list[dict] with name + is_hidden (handles pokedex JSON/API formats)
-    abilities_raw = entry.get("abilities") or []
-    regs, hides = parse_abilities(abilities_raw)
-    abilities_for_gen = [{"name": r, "is_hidden": False} for r in regs] + [{"name": h, "is_hidden": True} for h in hides]
-    if not abilities_for_gen:
-        abilities_for_gen = []
-    # Gender ratio from database/cache (same as starter: gender_ratio or gender_rate)
-    gender_ratio = _gender_ratio_from_entry(entry)
-    rolled = generate_mon(base_stats=base_long, abilities=abilities_for_gen, gender_ratio=gender_ratio, level=level)
-    base_short = {
-        "hp": base_long.get("hp", 1),
-        "atk": base_long.get("attack", 1),
-        "defn": base_long.get("defense", 1),
-        "spa": base_long.get("special_attack", 1),
-        "spd": base_long.get("special_defense", 1),
-        "spe": base_long.get("speed", 1),
-    }
-    types = _extract_species_types(entry)
-    types_tuple = (types[0].title() if types else "Normal", types[1].title() if len(types) > 1 else None)
+    rolled = generate_mon(
+        base_stats=dict(record.base_stats),
+        abilities=record.abilities_for_generator(),
+        gender_ratio=dict(record.gender_ratio),
+        level=level,
+    )
     move_list = moves or []
-    species_id = None
-    try:
-        species_id = entry.get("id")
-        species_id = int(species_id) if species_id is not None else None
-    except (TypeError, ValueError):
-        species_id = None
+    species_id = record.id
     if not move_list:
         move_list = await _default_levelup_moves(species_id, level, 1) if species_id else ["Tackle"]
     # Special move roll: 0.1% chance per slot to be a non-level-up move (egg/machine only; no tutor in Gen 1)
@@ -7451,9 +7409,9 @@ async def _build_mon_from_species(species: str, level: int, moves: Optional[list
                 if random.random() < 0.001:  # 0.1% per slot
                     move_list[i] = random.choice(special_moves)
     dto = {
-        "species": entry.get("name") or species,
-        "types": types_tuple,
-        "base": base_short,
+        "species": record.name or species,
+        "types": record.types_tuple(),
+        "base": dict(record.base_stats_short),
         "ivs": {
             "hp": int(rolled["ivs"]["hp"]),
             "atk": int(rolled["ivs"]["attack"]),
@@ -7477,8 +7435,8 @@ async def _build_mon_from_species(species: str, level: int, moves: Optional[list
         "nature": rolled.get("nature"),
         "is_shiny": await shiny_roll(_wild_shiny_denominator()),
         "hp_now": int(rolled["stats"]["hp"]),
-        "weight_kg": float(entry.get("weight_kg") or 100.0),
-        "friendship": int(entry.get("base_happiness") or 70),
+        "weight_kg": record.weight_kg,
+        "friendship": record.base_happiness,
     }
     return build_mon(dto, set_level=level, heal=True)
 
@@ -7497,7 +7455,7 @@ async def _load_pp_from_db(st: "BattleState", uid: int) -> None:
                     if not row:
                         continue
                     try:
-                        moves = json.loads(row["moves"]) if row.get("moves") else []
+                        moves = _maybe_json(row["moves"]) if row.get("moves") else []
                     except Exception:
                         moves = []
                     try:
@@ -7527,25 +7485,40 @@ async def _load_pp_from_db(st: "BattleState", uid: int) -> None:
 
 async def _save_party_state_from_battle(st: "BattleState", uid: int) -> None:
     team = st.team_for(uid)
-    async with db.session() as conn:
-        for idx, mon in enumerate(team):
-            db_id = getattr(mon, "_db_id", None)
-            if not db_id:
-                continue
-            key = (uid, idx)
-            pp_store = st._pp.get(key, {})
-            move_list = (mon.moves or [])[:4]
-            moves_pp = [int(pp_store.get(m, _max_pp(m, generation=st.gen))) for m in move_list]
-            await conn.execute(
-                "UPDATE pokemons SET hp_now=?, moves_pp=? WHERE id=?",
-                (int(mon.hp), json.dumps(moves_pp, ensure_ascii=False), int(db_id)),
-            )
-        await conn.commit()
+    updates = []
+    for idx, mon in enumerate(team):
+        db_id = getattr(mon, "_db_id", None)
+        if not db_id:
+            continue
+        key = (uid, idx)
+        pp_store = st._pp.get(key, {})
+        move_list = (mon.moves or [])[:4]
+        moves_pp = [int(pp_store.get(m, _max_pp(m, generation=st.gen))) for m in move_list]
+        updates.append((int(mon.hp), json.dumps(moves_pp, ensure_ascii=False), int(db_id)))
+    if not updates:
+        return
+    # One statement for the whole party; RETURNING patches the cached rows instead of
+    # dropping the owner's full list.
+    hps, pps, ids = (list(col) for col in zip(*updates))
+    async with db.session(transaction=True) as conn:
+        cur = await conn.execute(
+            """
+            UPDATE pokemons AS p SET hp_now = v.hp, moves_pp = v.pp::jsonb
+            FROM (SELECT unnest(?::bigint[]) AS id, unnest(?::int[]) AS hp, unnest(?::text[]) AS pp) AS v
+            WHERE p.id = v.id
+            RETURNING p.*
+            """,
+            (ids, hps, pps),
+        )
+        rows = await cur.fetchall()
+        await cur.close()
+    if len(rows) != len(updates):
         db.invalidate_pokemons_cache(str(uid))
+    db.patch_pokemons_cache(rows)
 
 # --- Experience helpers (Adventure/PvE) ---
 # Valid exp_group codes (must match exp_groups / exp_requirements in DB)
-_VALID_EXP_GROUPS = frozenset({"erratic", "fast", "medium_fast", "medium_slow", "slow", "fluctuating"})
+_VALID_EXP_GROUPS = exp_curves.GROUPS
 
 
 def _normalize_growth_rate_to_exp_group(growth_rate: str | None) -> str:
@@ -7575,75 +7548,13 @@ async def _get_exp_group_for_species(conn, species: str) -> str:
 
 
 async def _get_exp_total_for_level(conn, exp_group: str, level: int) -> int:
-    """Return exp_total from exp_requirements for (exp_group, level). Returns 0 if not found."""
-    if db_cache is not None:
-        try:
-            rows = db_cache.get_cached_exp_requirements()
-            if rows:
-                key = exp_group.strip().lower().replace(" ", "_")
-                for r in rows:
-                    if str(r.get("group_code") or "").strip().lower().replace(" ", "_") == key and int(r.get("level") or 0) == level:
-                        v = r.get("exp_total")
-                        return int(v) if v is not None else 0
-        except Exception:
-            pass
-    try:
-        cur = await conn.execute(
-            "SELECT exp_total FROM exp_requirements WHERE group_code = ? AND level = ? LIMIT 1",
-            (exp_group.strip().lower().replace(" ", "_"), level),
-        )
-        row = await cur.fetchone()
-        await cur.close()
-        return int(row["exp_total"]) if row and row.get("exp_total") is not None else 0
-    except Exception:
-        return 0
+    """Return exp_total for (exp_group, level) from the in-memory exp curves. Returns 0 if not found."""
+    return exp_curves.exp_for_level(exp_group, level)
 
 
 async def _calc_level_from_exp(exp_group: str, exp_val: int) -> int:
     """Return highest level where exp_total <= exp_val for a given exp_group."""
-    if db_cache is not None:
-        try:
-            rows = db_cache.get_cached_exp_requirements()
-            if rows:
-                key = (exp_group or "").strip().lower().replace(" ", "_")
-                best = 1
-                for r in rows:
-                    if str(r.get("group_code") or "").strip().lower().replace(" ", "_") != key:
-                        continue
-                    lvl = int(r.get("level") or 0)
-                    total = int(r.get("exp_total") or 0)
-                    if total <= exp_val and lvl > best:
-                        best = lvl
-                return best
-        except Exception:
-            pass
-    async with db.session() as conn:
-        cur = await conn.execute(
-            """
-            SELECT level FROM exp_requirements
-            WHERE group_code = ? AND exp_total <= ?
-            ORDER BY level DESC
-            LIMIT 1
-            """,
-            (exp_group, exp_val),
-        )
-        row = await cur.fetchone()
-        await cur.close()
-        return int(row["level"]) if row and row.get("level") is not None else 1
-
-
-def _parse_evolution(evolution: Any) -> dict:
-    """Parse pokedex.evolution (JSONB or string) into a dict with 'next' list."""
-    if evolution is None:
-        return {}
-    if isinstance(evolution, dict):
-        return evolution
-    if isinstance(evolution, str):
-        try:
-            return json.loads(evolution)
-        except Exception:
-            return {}
-    return {}
+    return exp_curves.level_for_exp(exp_group, exp_val)
 
 
 async def _get_level_up_evolution(conn, species_name: str, level: int) -> Optional[str]:
@@ -7651,34 +7562,24 @@ async def _get_level_up_evolution(conn, species_name: str, level: int) -> Option
     Return the evolved species name (lowercase) if this species can evolve by level-up at the given level.
     Uses pokedex.evolution JSON: next[].details.trigger == 'level-up' and level >= min_level.
     """
-    cur = await conn.execute(
-        "SELECT evolution FROM pokedex WHERE LOWER(name) = LOWER(?) LIMIT 1",
-        (species_name.strip(),),
-    )
-    row = await cur.fetchone()
-    await cur.close()
-    if not row or row.get("evolution") is None:
-        return None
-    evo = _parse_evolution(row["evolution"])
-    if not isinstance(evo, dict):
-        return None
-    raw_next = evo.get("next")
-    if isinstance(raw_next, list):
-        next_list = raw_next
-    elif raw_next is not None:
-        next_list = [raw_next]
+    record = _cached_species_record(species_name)
+    if record is not None:
+        evolutions = record.evolution
     else:
-        next_list = []
-    for n in next_list:
-        if isinstance(n, str):
+        cur = await conn.execute(
+            "SELECT evolution FROM pokedex WHERE LOWER(name) = LOWER(?) LIMIT 1",
+            (species_name.strip(),),
+        )
+        row = await cur.fetchone()
+        await cur.close()
+        if not row or row.get("evolution") is None:
+            return None
+        evolutions = species_records.evolution_list(row["evolution"])
+    for n in evolutions:
+        details = n["details"]
+        if details is None:
             # Bare species name (e.g. simple evolution format): treat as valid at any level
-            s = (n or "").strip().lower().replace(" ", "-")
-            if s:
-                return s
-            continue
-        if not isinstance(n, dict):
-            continue
-        details = n.get("details") or {}
+            return n["species"]
         trigger = (details.get("trigger") or "").lower().replace(" ", "-")
         if trigger != "level-up":
             continue
@@ -7690,9 +7591,7 @@ async def _get_level_up_evolution(conn, species_name: str, level: int) -> Option
         except (TypeError, ValueError):
             continue
         if level >= min_level:
-            species = (n.get("species") or "").strip().lower().replace(" ", "-")
-            if species:
-                return species
+            return n["species"]
     return None
 
 
@@ -7889,7 +7788,7 @@ async def _award_exp_to_party(st: "BattleState", winner_id: int, defeated: list[
             total_ev_yield[k] = total_ev_yield.get(k, 0) + yield_one.get(k, 0)
     has_ev_yield = any(total_ev_yield.get(k, 0) > 0 for k in _STAT_KEYS_SHORT)
 
-    async with db.session() as conn:
+    async with db.session(transaction=True) as conn:
         placeholders = ",".join("?" for _ in db_ids)
         cur = await conn.execute(
             f"SELECT id, exp, exp_group, evs FROM pokemons WHERE id IN ({placeholders})",
@@ -7903,6 +7802,8 @@ async def _award_exp_to_party(st: "BattleState", winner_id: int, defeated: list[
         level_ups: List[Tuple[int, "Mon", int]] = []
         exp_summary: List[Tuple["Mon", int, int, int]] = []
         ev_summary: List[Tuple["Mon", dict]] = []
+        patched: Dict[int, Any] = {}  # mon id -> latest RETURNING row
+        missed = False
 
         def gain_for(mon_level: int, foe_level: int, base_exp: int, gen: int, trainer_bonus: bool, outsider: bool, lucky_egg: bool, affection_boost: bool, split: int) -> int:
             if gen <= 4:
@@ -7943,28 +7844,22 @@ async def _award_exp_to_party(st: "BattleState", winner_id: int, defeated: list[
                 total_gain += gain_for(mon.level, foe.level, base_exp, st.gen, trainer_foe, outsider, lucky_egg, affection_boost, split)
 
             new_exp = cur_exp + total_gain
-            cur_old = await conn.execute(
-                "SELECT level FROM exp_requirements WHERE group_code = ? AND exp_total <= ? ORDER BY level DESC LIMIT 1",
-                (eg, cur_exp),
-            )
-            row_old = await cur_old.fetchone()
-            await cur_old.close()
-            old_level = int(row_old["level"]) if row_old and row_old.get("level") is not None else 1
-            cur_new = await conn.execute(
-                "SELECT level FROM exp_requirements WHERE group_code = ? AND exp_total <= ? ORDER BY level DESC LIMIT 1",
-                (eg, new_exp),
-            )
-            row_new = await cur_new.fetchone()
-            await cur_new.close()
-            raw_new_lvl = int(row_new["level"]) if row_new and row_new.get("level") is not None else 1
+            old_level = exp_curves.level_for_exp(eg, cur_exp)
+            raw_new_lvl = exp_curves.level_for_exp(eg, new_exp)
             # Never decrease level (e.g. if cur_exp was wrong/missing) or exceed 100
             new_lvl = min(100, max(mon.level, raw_new_lvl))
             # If we clamped level up, ensure exp is at least the exp for that level (keep DB consistent)
             if new_lvl > raw_new_lvl:
-                min_exp = await _get_exp_total_for_level(conn, eg, new_lvl)
-                if min_exp is not None and new_exp < min_exp:
+                min_exp = exp_curves.exp_for_level(eg, new_lvl)
+                if new_exp < min_exp:
                     new_exp = min_exp
-            await conn.execute("UPDATE pokemons SET exp=?, level=? WHERE id=?", (new_exp, new_lvl, mid))
+            cur_upd = await conn.execute("UPDATE pokemons SET exp=?, level=? WHERE id=? RETURNING *", (new_exp, new_lvl, mid))
+            row_upd = await cur_upd.fetchone()
+            await cur_upd.close()
+            if row_upd is not None:
+                patched[int(mid)] = row_upd
+            else:
+                missed = True
             exp_summary.append((mon, total_gain, old_level, new_lvl))
             if new_lvl > old_level:
                 level_ups.append((mid, mon, new_lvl))
@@ -7974,11 +7869,20 @@ async def _award_exp_to_party(st: "BattleState", winner_id: int, defeated: list[
                 new_evs = _cap_evs({k: current_evs[k] + total_ev_yield.get(k, 0) for k in _STAT_KEYS_SHORT})
                 ev_gains = {k: new_evs[k] - current_evs[k] for k in _STAT_KEYS_SHORT if new_evs[k] - current_evs[k] > 0}
                 if ev_gains:
-                    await conn.execute("UPDATE pokemons SET evs=? WHERE id=?", (json.dumps(new_evs, ensure_ascii=False), mid))
+                    cur_ev = await conn.execute(
+                        "UPDATE pokemons SET evs=? WHERE id=? RETURNING *",
+                        (json.dumps(new_evs, ensure_ascii=False), mid),
+                    )
+                    row_ev = await cur_ev.fetchone()
+                    await cur_ev.close()
+                    if row_ev is not None:
+                        patched[int(mid)] = row_ev
                     ev_summary.append((mon, ev_gains))
-        await conn.commit()
+    # Write-through: patch the updated rows into their owners' cached lists
+    if missed:
         db.invalidate_pokemons_cache(str(winner_id))
-        return (level_ups, exp_summary, ev_summary)
+    db.patch_pokemons_cache(patched.values())
+    return (level_ups, exp_summary, ev_summary)
 
 
 async def _get_level_up_moves_at_level(conn, species_name: str, level: int, gen: int) -> List[str]:
@@ -8063,7 +7967,7 @@ async def _heal_party(user_id: str) -> int:
             hp_max = int(row["hp"])
             moves = []
             try:
-                moves = json.loads(row["moves"]) if row.get("moves") else []
+                moves = _maybe_json(row["moves"]) if row.get("moves") else []
             except Exception:
                 moves = []
             max_pp = [_max_pp(m, generation=user_gen) for m in moves[:4]] if moves else []
@@ -9949,16 +9853,10 @@ async def wallet_slash(interaction: discord.Interaction):
 
 async def _ruleset_gen(conn, guild: discord.Guild | None) -> int:
     """Pick generation from rulesets table, preferring guild scope, else global, else 6."""
-    if db_cache:
-        rules = db_cache.get_cached_rulesets()
-        if rules:
-            if guild:
-                for r in rules:
-                    if str(r.get("scope") or "") == f"guild:{guild.id}":
-                        return int(r.get("generation") or 6)
-            for r in rules:
-                if str(r.get("scope") or "").lower() == "global":
-                    return int(r.get("generation") or 6)
+    if db_cache and db_cache.get_cached_rulesets():
+        r = (db_cache.get_ruleset(f"guild:{guild.id}") if guild else None) or db_cache.get_ruleset("global")
+        if r is not None:
+            return int(r.get("generation") or 6)
     try:
         if guild:
             cur = await conn.execute("SELECT generation FROM rulesets WHERE scope = ? LIMIT 1", (f"guild:{guild.id}",))
@@ -10454,6 +10352,7 @@ class MPokeInfo(commands.Cog):
         name="Pokémon species (e.g. pikachu)",
         slot="Team slot (1–6) if you have duplicates"
     )
+    @app_commands.autocomplete(name=team_member_autocomplete)
     async def mpokeinfo(self, interaction: Interaction, name: str, slot: Optional[int] = None):
         if not interaction.response.is_done():
             await interaction.response.defer(ephemeral=False)
@@ -10685,7 +10584,9 @@ async def _action_window(user_id: str, mon_id: int, action: str, since_hours: in
             if created < cutoff:
                 break
             try:
-                payload = json.loads(r["payload"])
+                payload = _maybe_json(r["payload"])
+                if not isinstance(payload, dict):
+                    payload = {}
             except Exception:
                 payload = {}
             if str(payload.get("mon_id")) == str(mon_id):
@@ -10748,6 +10649,7 @@ _FEED_ITEMS = {
     item="Item name (e.g., Oran Berry, Sitrus Berry, Poffin Sweet …)",
     slot="If duplicates, which team slot (1–6)"
 )
+@app_commands.autocomplete(name=team_member_autocomplete, item=feed_item_autocomplete)
 async def feed_cmd(inter: discord.Interaction, name: str, item: str, slot: int | None = None):
     mon = await resolve_team_mon(inter, name, slot)
     if not mon:
@@ -11070,6 +10972,7 @@ async def _create_pokemon_from_parsed(
 @app_commands.describe(
     team_text="The team in Showdown format (paste the entire team export)"
 )
+@app_commands.autocomplete(team_text=showdown_token_autocomplete)
 async def import_team(interaction: discord.Interaction, team_text: str):
     """Import a team from Pokémon Showdown format."""
     await interaction.response.defer(ephemeral=False)
@@ -12361,13 +12264,6 @@ def _split_abilities(abilities_list):
                 (hides if is_hidden else regs).append(name)
     return regs, hides
 
-_FORM_ALIASES = {
-    "alola": "alola", "alolan": "alola",
-    "galar": "galar", "galarian": "galar",
-    "hisui": "hisui", "hisuian": "hisui",
-    "paldea": "paldea", "paldean": "paldea",
-}
-
 def _norm_token(s: str) -> str:
     return re.sub(r"[^a-z0-9-]+", "-", (s or "").strip().lower()).strip("-")
 
@@ -12403,21 +12299,31 @@ def parse_form_from_name(input_name: str) -> Tuple[str, Optional[str]]:
 # ---------- FUZZY name -> species row (uses your _fuzzy_best) ----------
 async def fuzzy_species_row(con, name: str):
     """
-    Try exact by name; if not found, use your _fuzzy_best() to find the closest species.
+    Try exact by name; if not found, find the closest species (scored like _fuzzy_best(),
+    from the prebuilt species index when the cache is warm).
     Returns (row, suggestions_or_empty_list) where row may be None.
     """
     q = (name or "").strip().lower()
+    row = db_cache.get_cached_pokedex(q) if db_cache is not None else None
+    if row is not None:
+        return dict(row), []
     cur = await con.execute("SELECT * FROM pokedex WHERE LOWER(name)=?", (q,))
     row = await cur.fetchone(); await cur.close()
     if row:
         return row, []
 
-    cur = await con.execute("SELECT id, name FROM pokedex")
-    all_rows = await cur.fetchall(); await cur.close()
-    choices = [r["name"] for r in all_rows]
-    best, ratio, suggestions = _fuzzy_best(q, choices)  # <-- your corrector
+    index = _cached_fuzzy_index("species_canon")
+    if index is None:
+        cur = await con.execute("SELECT id, name FROM pokedex")
+        all_rows = await cur.fetchall(); await cur.close()
+        index = fuzzy_index.species_canon_index(r["name"] for r in all_rows)
+        _remember_fuzzy_index("species_canon", index)
+    best, ratio, suggestions = index.match(q, threshold=0.72, limit=3)
     if not best or ratio < 0.82:
         return None, suggestions
+    row = db_cache.get_cached_pokedex(best) if db_cache is not None else None
+    if row is not None:
+        return dict(row), []
     cur = await con.execute("SELECT * FROM pokedex WHERE LOWER(name)=?", (best.lower(),))
     row = await cur.fetchone(); await cur.close()
     return row, [] if row else suggestions
@@ -13166,6 +13072,7 @@ class PokeInfoFormView(discord.ui.View):
         app_commands.Choice(name="female", value="female"),
     ]
 )
+@app_commands.autocomplete(name_or_id=species_autocomplete)
 async def pokeinfo(
     interaction: discord.Interaction,
     name_or_id: str,
@@ -13246,24 +13153,16 @@ async def pokeinfo(
     if form_key:
         sid = _r(base_row, "id")
         sname = _r(base_row, "name")
-        if db_cache:
-            forms = db_cache.get_cached_pokedex_forms()
-            if forms:
-                for f in forms:
-                    if f.get("species_id") != sid:
-                        continue
-                    if (f.get("form_key") or "").strip().lower() == (form_key or "").strip().lower():
-                        form_row = dict(f)
-                        break
-                if not form_row and not (form_key or "").startswith(f"{sname}-"):
-                    species_form_key = f"{sname}-{form_key}"
-                    for f in forms:
-                        if f.get("species_id") != sid:
-                            continue
-                        if (f.get("form_key") or "").strip().lower() == species_form_key.strip().lower():
-                            form_row = dict(f)
-                            form_key = species_form_key
-                            break
+        if db_cache and sid is not None and db_cache.has_cached_table("pokedex_forms"):
+            f = db_cache.get_pokedex_form(sid, form_key)
+            if f is not None:
+                form_row = dict(f)
+            elif not (form_key or "").startswith(f"{sname}-"):
+                species_form_key = f"{sname}-{form_key}"
+                f = db_cache.get_pokedex_form(sid, species_form_key)
+                if f is not None:
+                    form_row = dict(f)
+                    form_key = species_form_key
 
         if form_row is None:
             con = await db_connect()
@@ -13395,10 +13294,10 @@ async def pokeinfo(
     total_learn = None
     per_gen_rows = None
     if db_cache:
-        ls = db_cache.get_cached_learnsets()
-        if ls:
+        index = db_cache.get_learnset_index()
+        if index is not None and species_id is not None:
             from collections import defaultdict
-            filt = [r for r in ls if r.get("species_id") == species_id]
+            filt = index.species_rows(species_id)
             total_learn = len(filt)
             gcnt = defaultdict(int)
             for r in filt:
@@ -13429,11 +13328,22 @@ async def pokeinfo(
     def j_or(row, key, default):
         return _j(_r(row, key), default)
 
-    stats        = j_or(base_row, "stats", {})
-    types        = j_or(base_row, "types", [])
-    abilities    = j_or(base_row, "abilities", [])
+    # Base form of a cached species: take the fields already parsed in its record
+    record = db_cache.get_species_record(str(species_id)) if db_cache and species_id is not None else None
+    if record is None or record.row is not base_row or form_row:
+        record = None
+    if record is not None:
+        display_key = {"defn": "def"}  # embed uses atk/def/spa/spd/spe
+        stats     = {display_key.get(k, k): v for k, v in record.base_stats_short.items()}
+        ev_yield  = {display_key.get(k, k): v for k, v in record.ev_yield.items()}
+        types     = list(record.types)
+        abilities = [{"name": n, "is_hidden": h} for n, h in record.abilities]
+    else:
+        stats     = j_or(base_row, "stats", {})
+        types     = j_or(base_row, "types", [])
+        abilities = j_or(base_row, "abilities", [])
+        ev_yield  = j_or(base_row, "ev_yield", {})
     egg_groups   = j_or(base_row, "egg_groups", [])
-    ev_yield     = j_or(base_row, "ev_yield", {})
     gender_ratio = j_or(base_row, "gender_ratio", {})
     flavor       = _r(base_row, "flavor", "")
     color        = _r(base_row, "color", "")
@@ -13453,8 +13363,9 @@ async def pokeinfo(
         v = _r(form_row, "color");           color           = color           if v in (None, "") else v
 
     # ---------- normalize keys so embed uses atk/def/spa/spd/spe ----------
-    stats = _normalize_stats_keys(stats)
-    ev_yield = _normalize_stats_keys(ev_yield)
+    if record is None:
+        stats = _normalize_stats_keys(stats)
+        ev_yield = _normalize_stats_keys(ev_yield)
 
     # ---------- embed ----------
     title_name = _r(base_row, "name", "").title()
@@ -13587,29 +13498,34 @@ async def pokeinfo(
     view = None
     con = await db_connect()
     try:
+        # Cached tables answer from their species indexes; the rest go to the DB
+        async def _forms_of(cached, sql: str, order_col: str):
+            if cached is not None:
+                return sorted(cached, key=lambda r: str(r.get(order_col) or ""))
+            cur = await con.execute(sql, (_r(base_row, "id"),))
+            rows = await cur.fetchall()
+            await cur.close()
+            return rows
+
+        sid = _r(base_row, "id")
+        cached = db_cache is not None and sid is not None
         # Regular forms from pokedex_forms
-        cur = await con.execute(
-            "SELECT form_key, display_name FROM pokedex_forms WHERE species_id = ? ORDER BY form_key",
-            (_r(base_row, "id"),)
+        form_rows = await _forms_of(
+            db_cache.get_pokedex_forms_for(sid) if cached else None,
+            "SELECT form_key, display_name FROM pokedex_forms WHERE species_id = ? ORDER BY form_key", "form_key",
         )
-        form_rows = await cur.fetchall()
-        await cur.close()
         
         # Mega Evolution forms
-        cur = await con.execute(
-            "SELECT mega_form, form_key FROM mega_evolution WHERE base_species_id = ? ORDER BY mega_form",
-            (_r(base_row, "id"),)
+        mega_rows = await _forms_of(
+            db_cache.get_mega_evolutions_for(sid) if cached else None,
+            "SELECT mega_form, form_key FROM mega_evolution WHERE base_species_id = ? ORDER BY mega_form", "mega_form",
         )
-        mega_rows = await cur.fetchall()
-        await cur.close()
         
         # Gigantamax forms
-        cur = await con.execute(
-            "SELECT gmax_form, form_key FROM gigantamax WHERE base_species_id = ? ORDER BY gmax_form",
-            (_r(base_row, "id"),)
+        gmax_rows = await _forms_of(
+            db_cache.get_gigantamax_for(sid) if cached else None,
+            "SELECT gmax_form, form_key FROM gigantamax WHERE base_species_id = ? ORDER BY gmax_form", "gmax_form",
         )
-        gmax_rows = await cur.fetchall()
-        await cur.close()
         
         # Primal Reversion forms
         cur = await con.execute(
@@ -13861,6 +13777,7 @@ class MovesPager(discord.ui.View):
     move_category=[app_commands.Choice(name=x.title(), value=x) for x in CATEGORIES],
     move_type=[app_commands.Choice(name=x.title(), value=x) for x in TYPES]
 )
+@app_commands.autocomplete(name_or_id=species_autocomplete)
 async def moves(
     interaction: discord.Interaction,
     name_or_id: str,
@@ -14079,7 +13996,10 @@ async def _periodic_pool_stats_logging():
     """Periodically log DB pool statistics to detect leaks."""
     import asyncio
     try:
-        from pvp.db_pool import get_pool_stats
+        try:
+            from pvp.db_pool import get_pool_stats
+        except ImportError:
+            from lib.pg_aiosqlite import get_pool_stats
         while True:
             try:
                 # Wait 5 minutes between logs
@@ -14140,6 +14060,15 @@ async def on_ready():
     except Exception as e:
         print(f"[on_ready] db.warm_pool error: {e}")
 
+    # 1a') Listen for other processes' cache invalidations (lib/cache_bus.py); after a listener
+    #      reconnect the caches are cleared and warm_cache runs again.
+    try:
+        from lib import cache_bus
+        if cache_bus.start(on_resync=warm_cache):
+            print(f"[on_ready] Cache invalidation listener started on channel {cache_bus.CHANNEL!r}")
+    except Exception as e:
+        print(f"[on_ready] cache_bus.start error: {e}")
+
     # 1b) Warm db_cache at startup (pokedex, moves, items, static tables, pokemons for active teams).
     if warm_cache is not None:
         try:
@@ -14188,6 +14117,12 @@ async def on_ready():
         bot.loop.create_task(_periodic_cleanup_old_battle_media())
         print("[Cleanup] Periodic battle media cleanup task started")
 
+    # 5a) Keep db_cache warm: reload static tables in the background before they expire
+    if cache_refresh_loop is not None and not hasattr(bot, "_cache_refresh_task_started"):
+        bot._cache_refresh_task_started = True
+        bot.loop.create_task(cache_refresh_loop())
+        print("[Cache] Background static table refresh started")
+
     # 6) Start periodic DB pool stats logging (every 5 minutes)
     if not hasattr(bot, "_pool_stats_task_started"):
         bot._pool_stats_task_started = True
@@ -14243,9 +14178,11 @@ async def on_message(message: discord.Message):
 def _norm_move_name(s: str) -> str:
     return str(s).strip().lower().replace("  ", " ").replace(" ", "-")
 
-def _parse_moves_text(txt: str | None) -> list[str]:
+def _parse_moves_text(txt: str | list | None) -> list[str]:
     if not txt:
         return []
+    if isinstance(txt, list):
+        return [str(x) for x in txt][:4]
     try:
         arr = json.loads(txt)
         if isinstance(arr, list):
@@ -14408,6 +14345,7 @@ class OverrideMoveView(discord.ui.View):
     mon="Team slot (1-6) OR Pokémon name on your team",
     move="Move name (level-up move, must be legal for your highest unlocked gen)",
 )
+@app_commands.autocomplete(mon=team_slot_autocomplete, move=move_autocomplete)
 async def learn_cmd(interaction: discord.Interaction, mon: str, move: str):
     uid = str(interaction.user.id)
     await interaction.response.defer(ephemeral=False)
@@ -15277,8 +15215,7 @@ async def transform_pokemon(
             
                 if fusion_row and fusion_row['fusion_data']:
                     # Restore the absorbed Pokémon
-                    import json
-                    partner_data = json.loads(fusion_row['fusion_data'])
+                    partner_data = _maybe_json(fusion_row['fusion_data'])
                 
                     # Insert the partner back into the PC (box 1)
                     await conn.execute(
@@ -10,12 +10,21 @@ Run standalone:
 Or call warm_cache() from the bot at startup:
   from tools.cache_everything import warm_cache
   await warm_cache()
+
+Tables whose version is unchanged since the last run are read from a local snapshot
+file instead of the DB (lib/static_snapshot.py).
+
+Keep the caches warm with refresh_loop() (stale-while-revalidate: each part is
+reloaded in the background before it expires; CACHE_REFRESH_CHECK_S, CACHE_REFRESH_LEAD_S).
+pokedex/moves/items whose table version is unchanged are kept for another TTL instead.
 """
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import os
 import sys
+import time
 from pathlib import Path
 
 # Project root
@@ -28,6 +37,8 @@ load_dotenv(ROOT / ".env")
 
 from lib import db
 from lib import db_cache
+from lib import autocomplete, fuzzy_index, species_records
+from lib import static_snapshot
 
 
 def _row_to_dict(row) -> dict | None:
@@ -52,35 +63,52 @@ STATIC_TABLES = [
 ]
 
 
+async def _iter_rows(conn, sql: str):
+    """
+    Yield rows of a SELECT. Streams through a server-side cursor when the backend
+    supports it, so only one prefetch batch of Records is alive at a time.
+    Consume it inside contextlib.aclosing() so an early exit releases the connection.
+    """
+    iterate = getattr(conn, "iterate", None)
+    if iterate is not None:
+        async with contextlib.aclosing(iterate(sql)) as rows:
+            async for r in rows:
+                yield r
+        return
+    cur = await conn.execute(sql)
+    rows = await cur.fetchall()
+    await cur.close()
+    for r in rows:
+        yield r
+
+
 async def _load_table(conn, name: str):
     """Load table as list[dict]. Returns [] on error or missing table."""
     try:
-        cur = await conn.execute(f"SELECT * FROM {name}")
-        rows = await cur.fetchall()
-        await cur.close()
         out = []
-        for r in rows:
-            d = _row_to_dict(r)
-            if d:
-                out.append(d)
+        async with contextlib.aclosing(_iter_rows(conn, f"SELECT * FROM {name}")) as rows:
+            async for r in rows:
+                d = _row_to_dict(r)
+                if d:
+                    out.append(d)
         return out
-    except Exception:
+    except Exception as e:
+        print(f"[cache_warm] {name}: load failed: {e}")
         return []
 
 
 async def _load_config(conn):
     """Load config as dict key -> value."""
     try:
-        cur = await conn.execute("SELECT key, value FROM config")
-        rows = await cur.fetchall()
-        await cur.close()
         out = {}
-        for r in rows:
-            d = _row_to_dict(r)
-            if d and d.get("key") is not None:
-                out[str(d["key"])] = str(d.get("value") or "")
+        async with contextlib.aclosing(_iter_rows(conn, "SELECT key, value FROM config")) as rows:
+            async for r in rows:
+                d = _row_to_dict(r)
+                if d and d.get("key") is not None:
+                    out[str(d["key"])] = str(d.get("value") or "")
         return out
-    except Exception:
+    except Exception as e:
+        print(f"[cache_warm] config: load failed: {e}")
         return {}
 
 
@@ -96,84 +124,336 @@ async def warm_cache() -> dict[str, int]:
     only per battle (at battle start, cleared at battle end) so it stays
     correct when users change teams (e.g. box a Pokémon).
     """
+    with db.background():
+        return await _warm_cache()
+
+
+async def _fetch_rows(conn, name: str) -> list[dict]:
+    out = []
+    async with contextlib.aclosing(_iter_rows(conn, f"SELECT * FROM {name}")) as rows:
+        async for row in rows:
+            d = _row_to_dict(row)
+            if d:
+                out.append(d)
+    return out
+
+
+def _derive(table: str, rows: list[dict]) -> dict:
+    """
+    The CPU-heavy part of loading a pokedex/moves/items dump: species records and the
+    fuzzy/autocomplete indexes. Touches no cache, so it runs in a worker thread.
+    """
+    derived: dict = {"fuzzy": {}, "completers": {}}
+    if rows:
+        derived["fuzzy"] = fuzzy_index.build_indexes(table, rows)
+        derived["completers"] = autocomplete.build_completers(table, rows)
+    if table == "pokedex":
+        derived["records"] = [_species_record(d) for d in rows]
+    return derived
+
+
+def _species_record(row: dict):
+    """SpeciesRecord for a pokedex row; None (logged) for a row that can't be parsed."""
+    try:
+        return species_records.from_row(row)
+    except Exception as e:
+        print(f"[cache_warm] pokedex {row.get('id')}: no species record: {e}")
+        return None
+
+
+def _apply_pokedex(rows: list[dict], derived: dict) -> int:
+    """Pokedex: cache by id and by name, with the parsed species record for each row that has one."""
+    for d, record in zip(rows, derived["records"]):
+        keys = [str(d["id"])] + ([d["name"]] if d.get("name") else [])
+        for key in keys:
+            db_cache.set_cached_pokedex(key, d)
+            if record is not None:
+                db_cache.set_cached_species(key, record)
+    _apply_fuzzy(derived)
+    return len(rows)
+
+
+def _apply_moves(rows: list[dict], derived: dict) -> int:
+    """Moves: cache by name, normalized name, and id (for lookups from moves_loader, db_move_effects, etc.)"""
+    for d in rows:
+        name = d.get("name")
+        if name:
+            db_cache.set_cached_move(name, d)
+            norm = name.lower().replace(" ", "-").strip()
+            if norm and norm != name:
+                db_cache.set_cached_move(norm, d)
+        if d.get("id") is not None:
+            db_cache.set_cached_move(str(d["id"]), d)
+    _apply_fuzzy(derived)
+    return len(rows)
+
+
+def _apply_items(rows: list[dict], derived: dict) -> int:
+    """Items: cache by id and by name, plus the full table."""
+    for d in rows:
+        item_id = d.get("id")
+        name = d.get("name")
+        if item_id:
+            db_cache.set_cached_item(str(item_id), d)
+        if name and name != item_id:
+            db_cache.set_cached_item(name, d)
+    if rows:
+        db_cache.set_cached_table("items", rows)
+    _apply_fuzzy(derived)
+    return len(rows)
+
+
+def _apply_fuzzy(derived: dict) -> None:
+    """Publish the fuzzy name and autocomplete indexes built by _derive()."""
+    for kind, index in derived["fuzzy"].items():
+        db_cache.set_fuzzy_index(kind, index)
+    for kind, index in derived["completers"].items():
+        db_cache.set_completer(kind, index)
+
+
+# Static tables that loaded empty (or failed) -> when; they are retried once per TTL
+# instead of on every check, since there is no cache entry whose expiry could say so.
+_empty_at: dict[str, float] = {}
+
+
+def _apply_static(name: str, data) -> int:
+    """The new copy replaces the old in one step."""
+    if data:
+        db_cache.set_cached_table(name, data)
+        _empty_at.pop(name, None)
+    else:
+        _empty_at[name] = time.monotonic()
+    return len(data)
+
+
+_APPLY_ROWS = {"pokedex": _apply_pokedex, "moves": _apply_moves, "items": _apply_items}
+
+
+async def _fetch_part(conn, part: str):
+    """Rows for one part. pokedex/moves/items errors propagate; static tables give [] on error."""
+    if part in _APPLY_ROWS:
+        return await _fetch_rows(conn, part)
+    if part == "config":
+        return await _load_config(conn)
+    return await _load_table(conn, part)
+
+
+async def _apply_part(part: str, rows) -> int:
+    apply = _APPLY_ROWS.get(part)
+    if apply is None:
+        return _apply_static(part, rows)
+    return apply(rows, await asyncio.to_thread(_derive, part, rows))
+
+
+async def _warm_rows(conn, part: str) -> int:
+    """Reload pokedex, moves or items; records and indexes are built off the event loop."""
+    return await _apply_part(part, await _fetch_rows(conn, part))
+
+
+async def _warm_static(conn, name: str) -> int:
+    """Full dump of one static table (config as key -> value dict)."""
+    return _apply_static(name, await _fetch_part(conn, name))
+
+
+# Parts kept in the on-disk snapshot (lib/static_snapshot.py). config is always fetched:
+# it is small and holds the version markers.
+SNAPSHOT_PARTS = ["pokedex", "moves", "items"] + STATIC_TABLES
+
+
+# db_cache namespaces filled here (per-owner caches evict on their own during a refresh)
+_WARMED_NAMESPACES = ("pokedex", "species", "moves", "items", "fuzzy", "autocomplete", "static_tables")
+
+
+def _report_evictions(before: dict[str, int], tag: str) -> None:
+    """Warn when loading pushed entries out of a size-capped namespace (CACHE_MAX_<NAME> too small)."""
+    for name, n in db_cache.eviction_counts().items():
+        if name in _WARMED_NAMESPACES and n > before.get(name, 0):
+            print(f"[{tag}] {name}: {n - before.get(name, 0)} entries evicted while loading; "
+                  f"raise CACHE_MAX_{name.upper()} or lookups fall back to SQL")
+
+
+async def _warm_cache() -> dict[str, int]:
+    evictions = db_cache.eviction_counts()
     counts: dict[str, int] = {"pokedex": 0, "moves": 0, "items": 0}
     for t in STATIC_TABLES:
         counts[t] = 0
     counts["config"] = 0
 
     conn = await db.connect()
-
+    snap = None
+    parts: dict[str, tuple[str, list]] = {}
+    fetched: list[str] = []
     try:
-        # Pokedex: cache by id and by name
-        cur = await conn.execute("SELECT * FROM pokedex")
-        rows = await cur.fetchall()
-        await cur.close()
-        for row in rows:
-            d = _row_to_dict(row)
-            if not d:
-                continue
-            db_cache.set_cached_pokedex(str(d["id"]), d)
-            if d.get("name"):
-                db_cache.set_cached_pokedex(d["name"], d)
-            counts["pokedex"] += 1
-
-        # Moves: cache by name, normalized name, and id (for lookups from moves_loader, db_move_effects, etc.)
-        cur = await conn.execute("SELECT * FROM moves")
-        rows = await cur.fetchall()
-        await cur.close()
-        for row in rows:
-            d = _row_to_dict(row)
-            if not d:
-                continue
-            name = d.get("name")
-            if name:
-                db_cache.set_cached_move(name, d)
-                norm = name.lower().replace(" ", "-").strip()
-                if norm and norm != name:
-                    db_cache.set_cached_move(norm, d)
-            if d.get("id") is not None:
-                db_cache.set_cached_move(str(d["id"]), d)
-            counts["moves"] += 1
-
-        # Items: cache by id and by name
-        cur = await conn.execute("SELECT * FROM items")
-        rows = await cur.fetchall()
-        await cur.close()
-        items_table = []
-        for row in rows:
-            d = _row_to_dict(row)
-            if not d:
-                continue
-            items_table.append(d)
-            item_id = d.get("id")
-            name = d.get("name")
-            if item_id:
-                db_cache.set_cached_item(str(item_id), d)
-            if name and name != item_id:
-                db_cache.set_cached_item(name, d)
-            counts["items"] += 1
-        if items_table:
-            db_cache.set_cached_table("items", items_table)
-
-        # Static tables (full dump)
-        for name in STATIC_TABLES:
-            rows = await _load_table(conn, name)
-            if rows:
-                db_cache.set_cached_table(name, rows)
-                counts[name] = len(rows)
-
-        # Config: key -> value dict
         cfg = await _load_config(conn)
-        if cfg:
-            db_cache.set_cached_table("config", cfg)
-            counts["config"] = len(cfg)
-
+        counts["config"] = _apply_static("config", cfg)
+        # Versions come from the primary: a replica's pg_stat counters don't see primary writes
+        with db.read_primary():
+            versions = await static_snapshot.table_versions(conn, SNAPSHOT_PARTS, cfg)
+        snap = static_snapshot.open_snapshot()
+        for part in SNAPSHOT_PARTS:
+            version = versions.get(part, "")
+            rows = None
+            if snap is not None and version and snap.version(part) == version:
+                try:
+                    rows = snap.load(part)
+                except Exception as e:
+                    print(f"[cache_snapshot] {part}: unreadable in snapshot, fetching: {e}")
+            if rows is None:
+                rows = await _fetch_part(conn, part)
+                fetched.append(part)
+            parts[part] = (version, rows)
+            counts[part] = await _apply_part(part, rows)
+            if part in _APPLY_ROWS and counts[part]:
+                _part_versions[part] = version
     finally:
+        if snap is not None:
+            snap.close()
         await conn.close()
 
+    mem = db_cache.table_memory_stats()
+    if mem:
+        before = sum(m["dict_bytes"] for m in mem.values())
+        after = sum(m["columnar_bytes"] for m in mem.values())
+        print(f"[cache_columnar] {len(mem)} table(s) packed: {before // 1024} KiB as dicts -> {after // 1024} KiB columnar")
+
+    _report_evictions(evictions, "cache_warm")
+    now = time.monotonic()
+    for part in ("pokedex", "moves", "items"):
+        _warmed_at[part] = now
+    if static_snapshot.ENABLED:
+        print(f"[cache_snapshot] {len(SNAPSHOT_PARTS) - len(fetched)} table(s) from snapshot, fetched: {', '.join(fetched) or 'none'}")
+        if fetched:
+            try:
+                size = await asyncio.to_thread(static_snapshot.write_snapshot, parts)
+                print(f"[cache_snapshot] wrote {static_snapshot.snapshot_path()} ({size // 1024} KiB)")
+            except Exception as e:
+                print(f"[cache_snapshot] write failed: {e}")
     return counts
 
 
+# ---------- stale-while-revalidate refresh ----------
+# Each part is reloaded in the background shortly before its TTL runs out, and the new
+# copy replaces the old one only once it is fully loaded, so readers keep getting the
+# old copy meanwhile and never see a cold cache after the first warm-up.
+REFRESH_CHECK_S = float(os.getenv("CACHE_REFRESH_CHECK_S", "30"))
+REFRESH_LEAD_S = float(os.getenv("CACHE_REFRESH_LEAD_S", "120"))
+
+# Per-row namespaces: part -> TTL. Static tables use their own entry's expiry.
+_ROW_PARTS = {
+    "pokedex": db_cache.CACHE_TTL_POKEDEX,
+    "moves": db_cache.CACHE_TTL_MOVES,
+    "items": db_cache.CACHE_TTL_ITEMS,
+}
+_warmed_at: dict[str, float] = {}
+# Row part -> static_snapshot version it was last loaded at; unchanged parts are kept, not refetched
+_part_versions: dict[str, str] = {}
+_refresh_stats = {"runs": 0, "reloads": 0, "failures": 0, "kept_stale": 0, "unchanged": 0}
+
+
+def _lead(ttl: float) -> float:
+    # At least two check intervals, so a due part is always caught before it expires
+    return min(max(REFRESH_LEAD_S, 2 * REFRESH_CHECK_S), ttl / 2)
+
+
+def _due_parts() -> list[str]:
+    now = time.monotonic()
+    due = [
+        part for part, ttl in _ROW_PARTS.items()
+        if part not in _warmed_at or now - _warmed_at[part] >= ttl - _lead(ttl)
+    ]
+    for name in STATIC_TABLES + ["config"]:
+        left = db_cache.cached_table_expires_in(name)
+        if left is None:
+            # Never loaded or invalidated after a write -> reload now; empty -> once per TTL
+            if name not in _empty_at or now - _empty_at[name] >= db_cache.CACHE_TTL_STATIC:
+                due.append(name)
+        elif left <= _lead(db_cache.CACHE_TTL_STATIC):
+            due.append(name)
+    return due
+
+
+async def _row_versions(conn, parts: list[str]) -> dict[str, str]:
+    # From the primary: a replica's pg_stat counters don't see primary writes
+    with db.read_primary():
+        return await static_snapshot.table_versions(conn, parts, db_cache.get_cached_config())
+
+
+async def _unchanged_row_parts(conn, parts: list[str]) -> set[str]:
+    """Due row parts whose table version matches the loaded copy (kept instead of refetched)."""
+    known = [p for p in parts if _part_versions.get(p)]
+    if not known:
+        return set()
+    versions = await _row_versions(conn, known)
+    return {p for p in known if versions.get(p) == _part_versions[p]}
+
+
+async def refresh_due() -> list[str]:
+    """Reload every part that is about to expire (or is missing). Returns the parts reloaded."""
+    due = _due_parts()
+    if not due:
+        return []
+    _refresh_stats["runs"] += 1
+    reloaded = []
+    evictions = db_cache.eviction_counts()
+    with db.background():
+        conn = await db.connect()
+        try:
+            try:
+                unchanged = await _unchanged_row_parts(conn, [p for p in due if p in _ROW_PARTS])
+            except Exception as e:
+                print(f"[cache_refresh] version check failed, reloading: {e}")
+                unchanged = set()
+            for part in due:
+                try:
+                    if part in unchanged and db_cache.extend_table_caches(part):
+                        _warmed_at[part] = time.monotonic()
+                        _refresh_stats["unchanged"] += 1
+                        continue
+                    if part in _ROW_PARTS:
+                        # Version read before the rows, so a write in between forces the next reload
+                        version = (await _row_versions(conn, [part])).get(part, "")
+                        n = await _warm_rows(conn, part)
+                        _warmed_at[part] = time.monotonic()
+                        if n and version:
+                            _part_versions[part] = version
+                        else:
+                            _part_versions.pop(part, None)
+                    else:
+                        n = await _warm_static(conn, part)
+                        # Nothing loaded (error or empty table): keep serving the old copy
+                        if not n and db_cache.extend_cached_table(part, REFRESH_LEAD_S):
+                            _refresh_stats["kept_stale"] += 1
+                            continue
+                except Exception as e:
+                    _refresh_stats["failures"] += 1
+                    print(f"[cache_refresh] {part} reload failed: {e}")
+                    if part not in _ROW_PARTS:
+                        db_cache.extend_cached_table(part, REFRESH_LEAD_S)
+                    continue
+                if n:
+                    reloaded.append(part)
+        finally:
+            await conn.close()
+    _report_evictions(evictions, "cache_refresh")
+    _refresh_stats["reloads"] += len(reloaded)
+    return reloaded
+
+
+async def refresh_loop() -> None:
+    """Background task: check every CACHE_REFRESH_CHECK_S and reload what is due."""
+    while True:
+        await asyncio.sleep(REFRESH_CHECK_S)
+        try:
+            await refresh_due()
+        except Exception as e:
+            _refresh_stats["failures"] += 1
+            print(f"[cache_refresh] refresh failed: {e}")
+
+
+def get_refresh_stats() -> dict:
+    return dict(_refresh_stats)
+
+
 async def main() -> None:
     print("Warming db_cache (pokedex, moves, items, static tables)...")
     counts = await warm_cache()
@@ -185,6 +465,12 @@ async def main() -> None:
         n = counts.get(t, 0)
         if n:
             print(f"  {t}: {n}")
+    mem = stats.get("table_memory") or {}
+    if mem:
+        print("  Static table memory (list of dicts -> columnar):")
+        for t, m in sorted(mem.items(), key=lambda kv: -kv[1]["dict_bytes"]):
+            saved = 100 - 100 * m["columnar_bytes"] // max(1, m["dict_bytes"])
+            print(f"    {t}: {m['rows']} rows, {m['dict_bytes'] // 1024} KiB -> {m['columnar_bytes'] // 1024} KiB (-{saved}%)")
     print(f"  Cache totals: {stats['total']} entries (pokedex={stats['pokedex']}, moves={stats['moves']}, items={stats['items']}, static_tables={stats.get('static_tables', 0)})")
     print("Done.")
 
@@ -55,6 +55,15 @@ def _pg_kw(dsn: str) -> dict:
     return {"statement_cache_size": 0} if ":6432" in (dsn or "") else {}
 
 
+async def _notify_bot(pg, events: list) -> None:
+    """Tell running bot processes to drop their cached copies (lib/cache_bus.py)."""
+    try:
+        from lib import cache_bus
+        await cache_bus.notify(pg, events)
+    except Exception as e:
+        print(f"(cache invalidation not sent: {e})")
+
+
 async def _run(dry_run: bool) -> None:
     import asyncpg
 
@@ -110,6 +119,8 @@ async def _run(dry_run: bool) -> None:
             updated += n
             if n:
                 print(f"  gen={gen}: updated {n} row(s)")
+        if updated:
+            await _notify_bot(pg, [("table", "rulesets")])
     finally:
         await pg.close()
 
@@ -60,6 +60,15 @@ def _pg_kw(dsn: str) -> dict:
 
 
 _DEFAULT_TABLES = ["pokedex", "pokedex_forms", "team_presets"]
+
+
+async def _notify_bot(pg, events: list) -> None:
+    """Tell running bot processes to drop their cached copies (lib/cache_bus.py)."""
+    try:
+        from lib import cache_bus
+        await cache_bus.notify(pg, events)
+    except Exception as e:
+        print(f"(cache invalidation not sent: {e})")
 _IGNORE_COLS = {"created_at", "updated_at_utc", "added_at"}
 
 _TABLE_PKS: dict[str, list[str]] = {
@@ -205,6 +214,7 @@ async def _run() -> None:
     pg = await asyncpg.connect(dsn, **_pg_kw(dsn))
 
     total_upd, total_ins, total_del = 0, 0, 0
+    changed: list[str] = []
 
     try:
         for table in sorted(tables_filter):
@@ -300,6 +310,10 @@ async def _run() -> None:
                         await pg.execute(f'DELETE FROM "{table}" WHERE {where_clause}', *args)
                     print(f"[{table}] deleted {del_n} cloud-only row(s)")
                     total_del += del_n
+            if not dry_run and (upd or ins or (not no_delete and only_cloud)):
+                changed.append(table)
+        if changed:
+            await _notify_bot(pg, [("table", t) for t in changed])
     finally:
         local.close()
         await pg.close()